@@ -0,0 +1 @@
+"""Componentes de infraestrutura do scraper Koerich."""
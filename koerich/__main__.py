@@ -0,0 +1,5 @@
+"""`python -m koerich`: roda o scraper (mesmas opções de `python3 scraper.py`)."""
+from koerich.scraper import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Extração pela API de busca do catálogo VTEX: até 50 produtos por requisição, sem baixar a PDP."""
+import re
+from urllib.parse import urlsplit
+
+CAMINHO_BUSCA = "/api/catalog_system/pub/products/search"
+# A API recusa janelas `_from`/`_to` com mais de 50 produtos
+MAX_POR_REQUISICAO = 50
+
+
+def id_produto_da_url(url):
+    """productId no fim da URL da PDP (`/p/<slug>/<id>`); None se o último segmento não for numérico."""
+    ultimo = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return ultimo if ultimo.isdigit() else None
+
+
+def origem(url):
+    """`https://host` da URL: a loja VTEX responde a API no mesmo host das PDPs."""
+    partes = urlsplit(url)
+    return f"{partes.scheme}://{partes.netloc}"
+
+
+def buscar_produtos(sessao, base, ids, timeout=20):
+    """Um GET com um `fq=productId:` por id; devolve `{productId: produto}` com o que a API encontrou."""
+    if len(ids) > MAX_POR_REQUISICAO:
+        raise ValueError(f"no máximo {MAX_POR_REQUISICAO} ids por requisição (recebidos {len(ids)})")
+    params = [("fq", f"productId:{i}") for i in ids] + [("_from", 0), ("_to", len(ids) - 1)]
+    r = sessao.get(base.rstrip("/") + CAMINHO_BUSCA, params=params, timeout=timeout)
+    # A busca responde 206 (Partial Content) quando há mais resultados que a janela
+    r.raise_for_status()
+    return {str(p.get("productId")): p for p in r.json() if isinstance(p, dict)}
+
+
+def _categorias(produto):
+    """(departamento, categoria): primeiro e último nível do caminho mais longo de `categories`."""
+    caminhos = [[n.strip() for n in c.split("/") if n.strip()] for c in produto.get("categories") or []]
+    nomes = max(caminhos, key=len, default=[])
+    if len(nomes) >= 2:
+        return nomes[0], nomes[-1]
+    if len(nomes) == 1:
+        return "", nomes[0]
+    return "", ""
+
+
+def _preco(item):
+    for vendedor in item.get("sellers") or []:
+        oferta = vendedor.get("commertialOffer") or {}
+        preco = oferta.get("Price") or oferta.get("ListPrice")
+        if preco:
+            return f"{float(preco):.2f}"
+    return ""
+
+
+def _variacoes(itens):
+    """Um nome por item (SKU) com valores de variação, ex.: "110V", "220V"."""
+    nomes = []
+    for item in itens:
+        valores = [str(v) for campo in item.get("variations") or [] for v in item.get(campo) or []]
+        if valores:
+            nomes.append(" ".join(valores))
+    return nomes
+
+
+def campos_produto(produto, max_imagens=5):
+    """Campos do `Produto` VTEX a partir do JSON da API, sem limpeza nem ids (ficam com o scraper).
+
+    As imagens são as do primeiro item, como a galeria que a PDP mostra ao
+    abrir; o SKU segue a mesma ordem da PDP (referência antes do itemId).
+    """
+    itens = produto.get("items") or []
+    principal = itens[0] if itens else {}
+    departamento, categoria = _categorias(produto)
+    return {
+        "sku": str(produto.get("productReference") or principal.get("itemId") or produto.get("productId") or ""),
+        "nome": produto.get("productName") or principal.get("name") or "",
+        "descricao": re.sub(r"<[^>]+>", " ", produto.get("description") or ""),
+        "departamento": departamento,
+        "categoria": categoria,
+        "marca": produto.get("brand") or "",
+        "preco": _preco(principal),
+        "imagens": [img["imageUrl"] for img in principal.get("images") or [] if img.get("imageUrl")][:max_imagens],
+        "variacoes": _variacoes(itens),
+    }
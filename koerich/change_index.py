@@ -0,0 +1,128 @@
+"""Índice de mudanças por URL (SQLite): hash dos campos monitorados, histórico e volatilidade."""
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+# O que conta como "mudou" numa PDP: preço, nomes, imagens e categoria de cada SKU
+CAMPOS_MONITORADOS = (
+    "_IDSKU", "_NomeSKU", "_NomeProduto", "_Preço", "_IDDepartamento", "_NomeDepartamento",
+    "_IDCategoria", "_NomeCategoria", "_ImagensURLs",
+)
+
+
+def hash_linhas(linhas):
+    """Hash estável dos campos monitorados de todas as linhas (SKUs) de uma PDP.
+
+    `linhas` é qualquer iterável de dicts, inclusive um `Produto`.
+    """
+    valores = sorted([str(linha.get(c, "")) for c in CAMPOS_MONITORADOS] for linha in linhas)
+    return hashlib.sha1(json.dumps(valores, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class IndiceMudancas:
+    """Estado entre execuções: último hash, primeira/última visita e nº de mudanças por URL.
+
+    A volatilidade de cada URL é estimada como mudanças por hora observada
+    (suavizada por `prior_horas`, para URLs com pouco histórico não parecerem
+    estáticas); `priorizar` ordena pela probabilidade de a PDP ter mudado desde
+    a última visita.
+    """
+
+    def __init__(self, caminho, prior_horas=24.0):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.prior_horas = prior_horas
+        self.estatisticas = Counter()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(caminho, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS produtos (
+                url TEXT PRIMARY KEY,
+                sku TEXT,
+                hash TEXT NOT NULL,
+                primeira_vez REAL NOT NULL,
+                visto_em REAL NOT NULL,
+                mudado_em REAL NOT NULL,
+                verificacoes INTEGER NOT NULL,
+                mudancas INTEGER NOT NULL
+            )"""
+        )
+        self._db.commit()
+
+    def consultar(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sku, hash, primeira_vez, visto_em, mudado_em, verificacoes, mudancas "
+                "FROM produtos WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        campos = ("sku", "hash", "primeira_vez", "visto_em", "mudado_em", "verificacoes", "mudancas")
+        return dict(zip(campos, row))
+
+    def comparar(self, url, linhas):
+        """(hash, mudou, anterior) sem gravar nada; `anterior` é None para URL nova."""
+        h = hash_linhas(linhas)
+        anterior = self.consultar(url)
+        return h, anterior is None or anterior["hash"] != h, anterior
+
+    def registrar(self, url, linhas, agora=None):
+        """Anota uma verificação de `url`; devolve "nova", "mudou" ou "igual"."""
+        agora = agora or time.time()
+        h = hash_linhas(linhas)
+        sku = next(iter(linhas), {}).get("_IDProduto", "")
+        with self._lock:
+            row = self._db.execute("SELECT hash FROM produtos WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                desfecho = "nova"
+                self._db.execute(
+                    "INSERT INTO produtos VALUES (?, ?, ?, ?, ?, ?, 1, 0)", (url, sku, h, agora, agora, agora)
+                )
+            else:
+                desfecho = "mudou" if row[0] != h else "igual"
+                mudou = desfecho == "mudou"
+                self._db.execute(
+                    "UPDATE produtos SET sku = ?, hash = ?, visto_em = ?, verificacoes = verificacoes + 1, "
+                    "mudancas = mudancas + ?, mudado_em = CASE WHEN ? THEN ? ELSE mudado_em END WHERE url = ?",
+                    (sku, h, agora, int(mudou), int(mudou), agora, url),
+                )
+            self._db.commit()
+            self.estatisticas[desfecho] += 1
+        return desfecho
+
+    def _probabilidade(self, primeira_vez, visto_em, mudancas, agora):
+        taxa = (mudancas + 0.5) / ((visto_em - primeira_vez) / 3600 + self.prior_horas)
+        return 1 - math.exp(-taxa * max(0.0, agora - visto_em) / 3600)
+
+    def priorizar(self, urls, limite=None, prob_minima=0.0, agora=None):
+        """`urls` ordenadas pela chance de terem mudado (novas primeiro).
+
+        `prob_minima` descarta as que quase certamente não mudaram; `limite`
+        corta a lista (orçamento de URLs por execução).
+        """
+        agora = agora or time.time()
+        with self._lock:
+            historico = {
+                url: (primeira, visto, mudancas)
+                for url, primeira, visto, mudancas in self._db.execute(
+                    "SELECT url, primeira_vez, visto_em, mudancas FROM produtos"
+                )
+            }
+        pontuadas = []
+        for ordem, url in enumerate(urls):
+            dados = historico.get(url)
+            prob = 1.0 if dados is None else self._probabilidade(*dados, agora)
+            if dados is None or prob >= prob_minima:
+                pontuadas.append((-prob, dados is not None, ordem, url))
+        pontuadas.sort()
+        selecionadas = [url for *_, url in pontuadas]
+        return selecionadas[:limite] if limite else selecionadas
+
+    def fechar(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,122 @@
+"""Saída incremental do CSV VTEX com checkpoint de URLs concluídas (execuções retomáveis)."""
+import csv
+import os
+from collections import deque
+
+
+class EscritorIncremental:
+    """Anexa as linhas de cada URL ao CSV assim que ela termina.
+
+    Depois das linhas, a URL é anotada em `<csv>.checkpoint`; com
+    `retomar=True` o CSV e o checkpoint existentes são mantidos e
+    `concluidas` diz quais URLs pular. A gravação é "pelo menos uma vez": se
+    o processo morrer entre as linhas e o checkpoint, aquela URL é refeita.
+    `ao_concluir(url, linhas)`, se dado, roda depois do checkpoint.
+    """
+
+    def __init__(self, caminho_csv, retomar=False, ao_concluir=None):
+        self.caminho_csv = caminho_csv
+        self.ao_concluir = ao_concluir
+        self.caminho_checkpoint = caminho_csv + ".checkpoint"
+        self.linhas_gravadas = 0
+        self.concluidas = set()
+        self.colunas = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(caminho_csv)), exist_ok=True)
+        if retomar:
+            self.concluidas = self._ler_checkpoint()
+            self.colunas = self._ler_cabecalho()
+        else:
+            for caminho in (self.caminho_csv, self.caminho_checkpoint):
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+
+        # utf-8-sig só num arquivo novo: reabrir em append com ele gravaria outro BOM no meio
+        novo = self.colunas is None
+        self._csv = open(self.caminho_csv, "w" if novo else "a", newline="",
+                         encoding="utf-8-sig" if novo else "utf-8")
+        self._checkpoint = open(self.caminho_checkpoint, "a", encoding="utf-8")
+        self._writer = None if novo else csv.DictWriter(self._csv, fieldnames=self.colunas)
+
+    def _ler_checkpoint(self):
+        if not os.path.exists(self.caminho_checkpoint):
+            return set()
+        with open(self.caminho_checkpoint, encoding="utf-8") as f:
+            return {linha.strip() for linha in f if linha.strip()}
+
+    def _ler_cabecalho(self):
+        if not os.path.exists(self.caminho_csv) or os.path.getsize(self.caminho_csv) == 0:
+            return None
+        with open(self.caminho_csv, newline="", encoding="utf-8-sig") as f:
+            return next(csv.reader(f), None)
+
+    def registrar(self, url, linhas):
+        """Grava as linhas de `url` e marca a URL como concluída."""
+        # `linhas` pode ser um `Produto`: as linhas são expandidas uma a uma aqui
+        gravadas = 0
+        for linha in linhas or ():
+            if self._writer is None:
+                self.colunas = list(linha.keys())
+                self._writer = csv.DictWriter(self._csv, fieldnames=self.colunas)
+                self._writer.writeheader()
+            self._writer.writerow(linha)
+            gravadas += 1
+        if gravadas:
+            self._csv.flush()
+            self.linhas_gravadas += gravadas
+        self._checkpoint.write(url + "\n")
+        self._checkpoint.flush()
+        self.concluidas.add(url)
+        if self.ao_concluir is not None:
+            self.ao_concluir(url, linhas)
+
+    def descarregar(self):
+        """Nada a fazer: cada URL já sai gravada de `registrar` (mesma interface do `EscritorParquet`)."""
+
+    def fechar(self):
+        self._csv.close()
+        self._checkpoint.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class GravacaoOrdenada:
+    """Entrega os produtos ao escritor na ordem de entrada, quando as imagens terminam.
+
+    `adicionar(indice, ...)` aceita resultados fora de ordem (modo async);
+    eles esperam num buffer até os anteriores chegarem. `finalizar(linhas,
+    resultado_do_futuro)` completa as linhas antes da gravação;
+    `ao_falhar(url)`, se dado, recebe as URLs que falharam, na mesma ordem.
+    """
+
+    def __init__(self, escritor, finalizar, ao_falhar=None):
+        self.escritor = escritor
+        self.finalizar = finalizar
+        self.ao_falhar = ao_falhar
+        self._proximo = 0
+        self._fora_de_ordem = {}
+        self._fila = deque()
+
+    def adicionar(self, indice, url, linhas=None, futuro=None):
+        """`linhas=None` registra uma URL que falhou: só libera a ordem, sem checkpoint."""
+        self._fora_de_ordem[indice] = (url, linhas, futuro)
+        while self._proximo in self._fora_de_ordem:
+            self._fila.append(self._fora_de_ordem.pop(self._proximo))
+            self._proximo += 1
+        self.descarregar()
+
+    def descarregar(self, esperar=False):
+        while self._fila:
+            url, linhas, futuro = self._fila[0]
+            if futuro is not None and not futuro.done() and not esperar:
+                break
+            self._fila.popleft()
+            if linhas is not None:
+                resultado = futuro.result() if futuro is not None else None
+                self.escritor.registrar(url, self.finalizar(linhas, resultado))
+            elif self.ao_falhar is not None:
+                self.ao_falhar(url)
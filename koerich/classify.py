@@ -0,0 +1,130 @@
+"""Classificação de categoria/departamento e marca por palavras-chave, num único passe de regex."""
+import bisect
+import json
+import re
+
+SEPARADOR_LOTE = "\n"
+
+
+def _regex_trie(palavras):
+    """Regex de uma trie das palavras: o custo por posição não cresce com o nº de palavras.
+
+    Um `a|b|c|...` comum testa cada alternativa em cada posição; na trie os
+    prefixos comuns são testados uma vez. Os sufixos opcionais são gulosos,
+    então numa mesma posição vence a palavra mais longa.
+    """
+    trie = {}
+    for palavra in palavras:
+        no = trie
+        for ch in palavra:
+            no = no.setdefault(ch, {})
+        no[""] = True
+
+    def montar(no):
+        fim = "" in no
+        ramos = [re.escape(ch) + montar(filho) for ch, filho in sorted(no.items()) if ch]
+        if not ramos:
+            return ""
+        corpo = ramos[0] if len(ramos) == 1 else "(?:" + "|".join(ramos) + ")"
+        if fim:
+            return corpo + "?" if len(ramos) == 1 and len(ramos[0]) == 1 else "(?:" + corpo + ")?"
+        return corpo
+
+    return montar(trie)
+
+
+class _Casador:
+    """Acha, em um passe, a palavra-chave mais longa contida em cada texto (minúsculo)."""
+
+    def __init__(self, palavras):
+        self.palavras = sorted({p.lower() for p in palavras if p})
+        # Lookahead: uma tentativa por posição, inclusive sobrepostas
+        self._regex = re.compile(f"(?=({_regex_trie(self.palavras)}))") if self.palavras else None
+
+    def melhores(self, texto, fronteiras=None):
+        """Palavra mais longa (empate: a primeira) de cada segmento de `texto`.
+
+        `fronteiras` são os inícios de cada segmento (ordenados); sem elas o
+        texto é um segmento só.
+        """
+        fronteiras = fronteiras or [0]
+        melhores = [None] * len(fronteiras)
+        if self._regex is None:
+            return melhores
+        for m in self._regex.finditer(texto):
+            palavra = m.group(1)
+            if not palavra:
+                continue
+            i = bisect.bisect_right(fronteiras, m.start()) - 1
+            if melhores[i] is None or len(palavra) > len(melhores[i]):
+                melhores[i] = palavra
+        return melhores
+
+
+class Classificador:
+    """Mapeamentos VTEX (ids de departamento/categoria/marca) e palavras-chave, compilados uma vez.
+
+    Em geral vem de `config/classificacao.json` via `de_arquivo`. Vale a
+    palavra-chave mais longa encontrada no nome, não a ordem do arquivo.
+    """
+
+    def __init__(self, departamentos, categorias, palavras_categoria, categoria_padrao, marcas,
+                 marca_id_padrao, palavras_marca, marca_padrao):
+        self.departamentos = dict(departamentos)
+        self.categorias = dict(categorias)
+        self.palavras_categoria = {k.lower(): tuple(v) for k, v in palavras_categoria.items()}
+        self.categoria_padrao = tuple(categoria_padrao)
+        self.marcas = {k.upper(): v for k, v in marcas.items()}
+        self.marca_id_padrao = marca_id_padrao
+        self.palavras_marca = {k.lower(): v for k, v in palavras_marca.items()}
+        self.marca_padrao = marca_padrao
+        self._categorias = _Casador(self.palavras_categoria)
+        self._marcas = _Casador(self.palavras_marca)
+
+    @classmethod
+    def de_arquivo(cls, caminho):
+        with open(caminho, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    @staticmethod
+    def _juntar(nomes):
+        textos = [(n or "").lower().replace(SEPARADOR_LOTE, " ") for n in nomes]
+        fronteiras, pos = [], 0
+        for t in textos:
+            fronteiras.append(pos)
+            pos += len(t) + len(SEPARADOR_LOTE)
+        return SEPARADOR_LOTE.join(textos), fronteiras
+
+    def categorias_lote(self, nomes):
+        """(departamento, categoria) de cada nome, com um único passe da regex sobre a coluna inteira."""
+        nomes = list(nomes)
+        if not nomes:
+            return []
+        texto, fronteiras = self._juntar(nomes)
+        return [self.palavras_categoria[p] if p else self.categoria_padrao
+                for p in self._categorias.melhores(texto, fronteiras)]
+
+    def marcas_lote(self, nomes):
+        """Marca reconhecida em cada nome (ou `marca_padrao`), num único passe."""
+        nomes = list(nomes)
+        if not nomes:
+            return []
+        texto, fronteiras = self._juntar(nomes)
+        return [self.palavras_marca[p] if p else self.marca_padrao for p in self._marcas.melhores(texto, fronteiras)]
+
+    def categoria(self, nome):
+        return self.categorias_lote([nome])[0]
+
+    def marca(self, nome):
+        return self.marcas_lote([nome])[0]
+
+    def id_departamento(self, nome):
+        return self.departamentos.get(nome, "")
+
+    def id_categoria(self, nome):
+        return self.categorias.get(nome, "")
+
+    def id_marca(self, marca):
+        if not marca:
+            return self.marca_id_padrao
+        return self.marcas.get(marca.upper().strip(), self.marca_id_padrao)
@@ -0,0 +1,230 @@
+"""Motor de crawl assíncrono: várias PDPs em voo, limites por host e limitador adaptativo."""
+import asyncio
+from collections import Counter
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except Exception:
+    httpx = None
+
+from koerich.page_cache import PaginaForaDoCache
+from koerich.ratelimit import LimitadorAdaptativo, segundos_retry_after
+from koerich.render import PoolRenderizadorAsync
+
+
+class CrawlerAsync:
+    """Busca PDPs concorrentemente e entrega o HTML para `analisar(html, url, pre)`.
+
+    - `concorrencia`: máximo de URLs em processamento ao mesmo tempo
+    - `por_host`: máximo de requisições simultâneas para um mesmo host
+    - `taxa`: requisições/s por host (token bucket; substitui o sleep fixo)
+    - `limitador`: um `LimitadorAdaptativo` compartilhado (no lugar de `taxa`),
+      que ajusta taxa e concorrência de cada host pelas respostas
+
+    `analisar` é síncrona (BeautifulSoup, download de imagens) e roda em
+    threads via `asyncio.to_thread`, sem bloquear o event loop.
+
+    Com `verificar_estatico(html)` o fetch é escalonado: primeiro um GET
+    simples, e o navegador só entra se a verificação devolver None. O que ela
+    devolver é repassado como terceiro argumento de `analisar`. `contadores`
+    soma quantas páginas cada camada resolveu.
+
+    Com `cache` (um `CachePaginas`) o HTML do GET e do render é lido/gravado
+    no disco; com `replay=True` nada sai para a rede nem abre o navegador.
+
+    Com `metricas` (um `Metricas`) o GET e o render entram nas etapas
+    "fetch_estatico" e "render", com latência e bytes por host.
+    """
+
+    def __init__(self, analisar, headers=None, concorrencia=16, por_host=8, taxa=4.0,
+                 render_pool=4, render_max_navegacoes=50, render_bloquear=True, render_espera="pronto",
+                 metricas_render=None, wait_selectors=None, timeout_ms=30000,
+                 verificar_estatico=None, contadores=None, cache=None, replay=False, metricas=None,
+                 limitador=None):
+        if httpx is None:
+            raise RuntimeError("httpx não está disponível (pip install httpx)")
+        self.analisar = analisar
+        self.headers = headers or {}
+        self.concorrencia = max(1, int(concorrencia))
+        self.por_host = max(1, int(por_host))
+        self.limitador = limitador or LimitadorAdaptativo(taxa, concorrencia_max=self.por_host, adaptativo=False)
+        self.wait_selectors = wait_selectors or []
+        self.timeout_ms = timeout_ms
+        self.verificar_estatico = verificar_estatico
+        self.contadores = contadores if contadores is not None else Counter()
+        self.cache = cache
+        self.replay = replay
+        self.metricas = metricas
+        self.renderizador = PoolRenderizadorAsync(
+            render_pool, render_max_navegacoes, bloquear_recursos=render_bloquear,
+            espera=render_espera, metricas=metricas_render,
+        )
+        self.cliente = None
+        self._hosts = {}
+
+    def _semaforo(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.por_host)
+        return self._hosts[host]
+
+    async def _abrir(self):
+        self.cliente = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=20,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concorrencia, max_keepalive_connections=self.concorrencia),
+            transport=httpx.AsyncHTTPTransport(retries=3),
+        )
+        if self.replay:
+            self.renderizador = None
+            return
+        try:
+            await self.renderizador.iniciar()
+        except Exception as e:
+            print(f"⚠️ Playwright indisponível, usando apenas HTTP: {e}")
+            self.renderizador = None
+
+    async def _fechar(self):
+        if self.renderizador is not None:
+            await self.renderizador.fechar()
+        if self.cliente is not None:
+            await self.cliente.aclose()
+
+    def _etapa(self, nome):
+        return self.metricas.etapa(nome) if self.metricas is not None else nullcontext()
+
+    async def _do_cache(self, url, camada):
+        if self.cache is None:
+            return None
+        return await asyncio.to_thread(self.cache.obter, url, camada, self.replay)
+
+    async def _get(self, url):
+        html = await self._do_cache(url, "estatico")
+        if html is not None:
+            return html
+        if self.replay:
+            raise PaginaForaDoCache(url)
+        await self.limitador.adquirir_async(url)
+        try:
+            with self._etapa("fetch_estatico"):
+                r = await self.cliente.get(url)
+        except Exception:
+            self.limitador.liberar(url, erro=True)
+            raise
+        self.limitador.liberar(url, r.status_code, r.elapsed.total_seconds(),
+                               segundos_retry_after(r.headers.get("retry-after")))
+        if self.metricas is not None:
+            host = urlsplit(url).netloc
+            self.metricas.latencia(host, r.elapsed.total_seconds())
+            self.metricas.contar("http_respostas", host=host, status=r.status_code)
+            self.metricas.contar("bytes_recebidos", len(r.content), host=host)
+        r.raise_for_status()
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.gravar, url, "estatico", r.text, r.status_code,
+                                    r.headers.get("content-type"))
+        return r.text
+
+    async def _renderizar(self, url):
+        """DOM renderizado (ou do cache); None se não houver navegador disponível."""
+        html = await self._do_cache(url, "render")
+        if html is not None or self.renderizador is None:
+            return html
+        await self.limitador.adquirir_async(url)
+        try:
+            with self._etapa("render"):
+                html = await self.renderizador.renderizar(url, self.wait_selectors, self.timeout_ms)
+        finally:
+            self.limitador.liberar(url)
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.gravar, url, "render", html)
+        return html
+
+    async def buscar_pagina(self, url):
+        """Devolve (html, pré-análise) seguindo as camadas estático → render → GET."""
+        semaforo = self._semaforo(url)
+        html_estatico = None
+        async with semaforo:
+            if self.verificar_estatico is not None:
+                try:
+                    html_estatico = await self._get(url)
+                except Exception as e:
+                    print(f"⚠️ GET simples falhou para {url}: {e}")
+            if html_estatico is not None:
+                pre = await asyncio.to_thread(self.verificar_estatico, html_estatico)
+                if pre is not None:
+                    self.contadores["estatico"] += 1
+                    return html_estatico, pre
+
+            try:
+                html = await self._renderizar(url)
+                if html is not None:
+                    self.contadores["render"] += 1
+                    return html, None
+            except Exception as e:
+                print(f"⚠️ Erro com Playwright para {url}: {e}")
+                if self.metricas is not None:
+                    self.metricas.contar("playwright_falhas")
+
+            if html_estatico is None:
+                html_estatico = await self._get(url)
+            self.contadores["http_fallback"] += 1
+            return html_estatico, None
+
+    async def _processar(self, url):
+        html, pre = await self.buscar_pagina(url)
+        return await asyncio.to_thread(self.analisar, html, url, pre)
+
+    async def executar(self, urls):
+        """Gera `(indice, url, resultado, erro)` à medida que cada URL termina.
+
+        `urls` pode ser qualquer iterável; ele é consumido aos poucos, então
+        nunca há mais que `concorrencia` URLs em memória esperando vez.
+        """
+        fila = asyncio.Queue(maxsize=self.concorrencia * 2)
+        resultados = asyncio.Queue()
+
+        async def produtor():
+            # O iterável pode fazer I/O (ex.: descoberta por sitemap): avança fora do loop
+            iterador = enumerate(urls)
+            try:
+                while (item := await asyncio.to_thread(next, iterador, None)) is not None:
+                    await fila.put(item)
+            finally:
+                for _ in range(self.concorrencia):
+                    await fila.put(None)
+
+        async def trabalhador():
+            while True:
+                item = await fila.get()
+                if item is None:
+                    return
+                i, url = item
+                try:
+                    await resultados.put((i, url, await self._processar(url), None))
+                except Exception as e:
+                    await resultados.put((i, url, None, e))
+
+        async def finalizar(tarefas):
+            await asyncio.gather(*tarefas, return_exceptions=True)
+            await resultados.put(None)
+
+        await self._abrir()
+        try:
+            tarefas = [asyncio.create_task(produtor())]
+            tarefas += [asyncio.create_task(trabalhador()) for _ in range(self.concorrencia)]
+            fim = asyncio.create_task(finalizar(tarefas))
+            try:
+                while True:
+                    item = await resultados.get()
+                    if item is None:
+                        break
+                    yield item
+            finally:
+                for t in tarefas:
+                    t.cancel()
+                await asyncio.gather(fim, *tarefas, return_exceptions=True)
+        finally:
+            await self._fechar()
@@ -0,0 +1,182 @@
+"""Descoberta de URLs de PDP por sitemaps (XML ou .gz, com índices) e páginas de categoria."""
+import gzip
+import hashlib
+import io
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlsplit
+from urllib.request import url2pathname
+
+from koerich.page_cache import normalizar_url
+from koerich.parsers import criar_arvore
+
+PADRAO_PRODUTO = re.compile(r"^/p/[^/]+/[^/]+/?$")
+
+
+def eh_url_produto(url):
+    """PDPs da Koerich têm o formato /p/<slug>/<id>."""
+    return bool(PADRAO_PRODUTO.match(urlsplit(url).path))
+
+
+class ConjuntoVistos:
+    """Conjunto exato que guarda só um hash de 8 bytes por URL, não a string."""
+
+    def __init__(self):
+        self._hashes = set()
+
+    @staticmethod
+    def _hash(item):
+        return hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest()
+
+    def adicionar(self, item):
+        """True se o item é novo."""
+        h = self._hash(item)
+        if h in self._hashes:
+            return False
+        self._hashes.add(h)
+        return True
+
+    def __contains__(self, item):
+        return self._hash(item) in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+class FiltroBloom:
+    """Filtro de Bloom para catálogos muito grandes: memória fixa, falsos positivos ~`taxa_erro`.
+
+    Um falso positivo faz uma PDP nova ser tratada como repetida (pulada);
+    nunca o contrário.
+    """
+
+    def __init__(self, capacidade=10_000_000, taxa_erro=0.001):
+        self.bits = max(8, int(-capacidade * math.log(taxa_erro) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacidade * math.log(2)))
+        self._vetor = bytearray((self.bits + 7) // 8)
+        self._total = 0
+
+    def _posicoes(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def adicionar(self, item):
+        """True se o item é (provavelmente) novo."""
+        novo = False
+        for p in self._posicoes(item):
+            byte, bit = divmod(p, 8)
+            if not self._vetor[byte] & (1 << bit):
+                self._vetor[byte] |= 1 << bit
+                novo = True
+        self._total += novo
+        return novo
+
+    def __contains__(self, item):
+        return all(self._vetor[p // 8] & (1 << (p % 8)) for p in self._posicoes(item))
+
+    def __len__(self):
+        return self._total
+
+
+def _eh_local(fonte):
+    return urlsplit(fonte).scheme in ("", "file")
+
+
+def _abrir(fonte, sessao=None, timeout=30):
+    """Stream binário de um sitemap local ou remoto, descomprimindo .gz pelo magic number."""
+    if _eh_local(fonte):
+        caminho = url2pathname(urlsplit(fonte).path) if fonte.startswith("file:") else fonte
+        bruto = open(caminho, "rb")
+    else:
+        if sessao is None:
+            import requests
+            sessao = requests.Session()
+        r = sessao.get(fonte, stream=True, timeout=timeout)
+        r.raise_for_status()
+        r.raw.decode_content = True
+        bruto = io.BufferedReader(r.raw)
+    if bruto.peek(2)[:2] == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=bruto)
+    return bruto
+
+
+def _resolver(base, loc):
+    """`loc` relativo a um sitemap local vira caminho; a um remoto, URL absoluta."""
+    if _eh_local(base) and not urlsplit(loc).scheme:
+        return os.path.join(os.path.dirname(base), loc)
+    return urljoin(base, loc)
+
+
+def _tag(elemento):
+    return elemento.tag.rsplit("}", 1)[-1]
+
+
+def iterar_sitemap(fonte, sessao=None, max_profundidade=3, _visitados=None):
+    """Gera os <loc> de um sitemap, seguindo índices, sem carregar o XML inteiro.
+
+    Os elementos são descartados assim que lidos, então a memória não cresce
+    com o tamanho do sitemap.
+    """
+    visitados = _visitados if _visitados is not None else set()
+    if fonte in visitados:
+        return
+    visitados.add(fonte)
+    with _abrir(fonte, sessao) as stream:
+        raiz = None
+        for evento, el in ET.iterparse(stream, events=("start", "end")):
+            if evento == "start":
+                if raiz is None:
+                    raiz = el
+                continue
+            tag = _tag(el)
+            if tag not in ("url", "sitemap"):
+                continue
+            loc = next((f.text.strip() for f in el if _tag(f) == "loc" and f.text), None)
+            raiz.clear()
+            if not loc:
+                continue
+            if tag == "sitemap":
+                if max_profundidade > 0:
+                    yield from iterar_sitemap(_resolver(fonte, loc), sessao, max_profundidade - 1, visitados)
+            else:
+                yield loc
+
+
+def iterar_categoria(url, buscar_html, max_paginas=100, backend=None):
+    """Links de PDP de uma listagem paginada (`?page=N`) até uma página não trazer novidade."""
+    anteriores = set()
+    separador = "&" if "?" in url else "?"
+    for pagina in range(1, max_paginas + 1):
+        endereco = url if pagina == 1 else f"{url}{separador}page={pagina}"
+        arvore = criar_arvore(buscar_html(endereco), backend)
+        links = {urljoin(endereco, a.attr("href")) for a in arvore.select("a[href]")}
+        produtos = {u for u in links if eh_url_produto(u)}
+        if not produtos or produtos <= anteriores:
+            return
+        yield from sorted(produtos - anteriores)
+        anteriores = produtos
+
+
+def descobrir(sitemaps=(), categorias=(), buscar_html=None, vistos=None, sessao=None):
+    """Gera URLs de PDP únicas (normalizadas) a partir de sitemaps e categorias, sob demanda.
+
+    `vistos` pode ser um `ConjuntoVistos` (padrão) ou `FiltroBloom`;
+    `buscar_html(url)` é usado nas categorias.
+    """
+    vistos = vistos if vistos is not None else ConjuntoVistos()
+
+    def fontes():
+        for sitemap in sitemaps:
+            yield from iterar_sitemap(sitemap, sessao)
+        for categoria in categorias:
+            yield from iterar_categoria(categoria, buscar_html)
+
+    for url in fontes():
+        if not eh_url_produto(url):
+            continue
+        url = normalizar_url(url)
+        if vistos.adicionar(url):
+            yield url
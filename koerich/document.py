@@ -0,0 +1,99 @@
+"""Documento de PDP parseado uma vez, com os artefatos de extração memoizados."""
+import json
+from functools import cached_property
+
+from koerich.parsers import criar_arvore
+
+
+def get_jsonld(arvore):
+    for s in arvore.select('script[type="application/ld+json"]'):
+        try:
+            data = json.loads(s.conteudo)
+            seq = data if isinstance(data, list) else [data]
+            for it in seq:
+                if isinstance(it, dict) and it.get("@type") in ("Product", "Offer", "AggregateOffer"):
+                    return it
+        except:
+            continue
+    return None
+
+
+def get_next_data(arvore):
+    tag = arvore.select_one('script#__NEXT_DATA__[type="application/json"]')
+    if tag:
+        try:
+            return json.loads(tag.conteudo)
+        except:
+            pass
+    return None
+
+
+def find_images(obj):
+    """Coleta recursivamente todos os `imageUrl` de um __NEXT_DATA__."""
+    found = []
+    if isinstance(obj, dict):
+        if "imageUrl" in obj and isinstance(obj["imageUrl"], str):
+            found.append(obj["imageUrl"])
+        if "images" in obj and isinstance(obj["images"], list):
+            for it in obj["images"]:
+                if isinstance(it, dict) and "imageUrl" in it and isinstance(it["imageUrl"], str):
+                    found.append(it["imageUrl"])
+        for v in obj.values():
+            found.extend(find_images(v))
+    elif isinstance(obj, list):
+        for v in obj:
+            found.extend(find_images(v))
+    return found
+
+
+class DocumentoPDP:
+    """HTML de uma PDP e tudo que os extratores derivam dele, calculado no máximo uma vez.
+
+    Cada artefato (árvore, JSON-LD, __NEXT_DATA__, produto do __NEXT_DATA__,
+    texto da página, imagens do __NEXT_DATA__) é preguiçoso: só é
+    calculado quando algum extrator pede, e depois fica memoizado.
+
+    `backend` escolhe o parser (ver `koerich.parsers`); os extratores usam
+    apenas `select`/`select_one` e os nós devolvidos, então funcionam com
+    qualquer um deles.
+    """
+
+    def __init__(self, html, backend=None):
+        self.html = html
+        self.backend = backend
+
+    @cached_property
+    def arvore(self):
+        return criar_arvore(self.html, self.backend)
+
+    def select(self, css):
+        return self.arvore.select(css)
+
+    def select_one(self, css):
+        return self.arvore.select_one(css)
+
+    @cached_property
+    def jsonld(self):
+        """Bloco JSON-LD `Product`/`Offer` ou {}."""
+        return get_jsonld(self.arvore) or {}
+
+    @cached_property
+    def next_data(self):
+        """`__NEXT_DATA__` decodificado ou {}."""
+        return get_next_data(self.arvore) or {}
+
+    @cached_property
+    def produto_next_data(self):
+        """`props.pageProps.product` (ou `productData`, usado por algumas lojas) ou {}."""
+        page_props = (self.next_data.get("props") or {}).get("pageProps") or {}
+        prod = page_props.get("product") or page_props.get("productData")
+        return prod if isinstance(prod, dict) else {}
+
+    @cached_property
+    def imagens_next_data(self):
+        return find_images(self.next_data) if self.next_data else []
+
+    @cached_property
+    def texto(self):
+        """Texto visível da página, como `soup.get_text(" ", strip=True)`."""
+        return self.arvore.texto(" ", strip=True)
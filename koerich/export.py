@@ -0,0 +1,117 @@
+"""Exportação colunar: linhas VTEX em lotes Parquet, com o CSV derivado deles."""
+import csv
+import glob
+import os
+import shutil
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = pq = None
+
+
+def _exigir_pyarrow():
+    if pq is None:
+        raise RuntimeError("pyarrow não está disponível (pip install pyarrow)")
+
+
+class EscritorParquet:
+    """Mesma interface do `EscritorIncremental`, gravando um dataset Parquet em lotes.
+
+    As linhas ficam em memória até somarem `tamanho_lote`; cada lote vira um
+    arquivo `parte-NNNNN.parquet` completo (colunas texto com dicionário,
+    compressão `compressao`), gravado atomicamente. Só então as URLs do lote
+    entram no checkpoint, então um processo morto no meio do lote refaz
+    aquelas URLs no `--resume` sem deixar arquivo corrompido. `ao_concluir(url,
+    linhas)` roda para cada URL do lote depois do checkpoint.
+    """
+
+    def __init__(self, diretorio, retomar=False, tamanho_lote=5000, compressao="zstd", ao_concluir=None):
+        _exigir_pyarrow()
+        self.diretorio = diretorio
+        self.ao_concluir = ao_concluir
+        self.caminho_checkpoint = os.path.join(diretorio, "_checkpoint")
+        self.tamanho_lote = max(1, int(tamanho_lote))
+        self.compressao = compressao
+        self.linhas_gravadas = 0
+        self.concluidas = set()
+        self.colunas = None
+        self._linhas_lote = 0
+        self._pendentes = []
+
+        if not retomar and os.path.isdir(diretorio):
+            shutil.rmtree(diretorio)
+        os.makedirs(diretorio, exist_ok=True)
+        if os.path.exists(self.caminho_checkpoint):
+            with open(self.caminho_checkpoint, encoding="utf-8") as f:
+                self.concluidas = {linha.strip() for linha in f if linha.strip()}
+        self._partes = len(glob.glob(os.path.join(diretorio, "parte-*.parquet")))
+        if self._partes:
+            self.colunas = pq.read_schema(self._arquivo(0)).names
+        self._checkpoint = open(self.caminho_checkpoint, "a", encoding="utf-8")
+
+    def _arquivo(self, n):
+        return os.path.join(self.diretorio, f"parte-{n:05d}.parquet")
+
+    def registrar(self, url, linhas):
+        """Acumula as linhas de `url`; a URL só é concluída quando o lote for gravado.
+
+        `linhas` pode ser um `Produto`: ele só é expandido ao gravar o lote.
+        """
+        self._pendentes.append((url, linhas or ()))
+        self._linhas_lote += len(linhas or ())
+        if self._linhas_lote >= self.tamanho_lote:
+            self.descarregar()
+
+    def descarregar(self):
+        lote = [linha for _, linhas in self._pendentes for linha in linhas]
+        if lote:
+            if self.colunas is None:
+                self.colunas = list(lote[0].keys())
+            colunas = {c: ["" if l.get(c) is None else str(l[c]) for l in lote] for c in self.colunas}
+            del lote
+            tabela = pa.table(colunas, schema=pa.schema([(c, pa.string()) for c in self.colunas]))
+            destino = self._arquivo(self._partes)
+            pq.write_table(tabela, destino + ".tmp", compression=self.compressao, use_dictionary=True)
+            os.replace(destino + ".tmp", destino)
+            self._partes += 1
+            self.linhas_gravadas += self._linhas_lote
+        for url, _ in self._pendentes:
+            self._checkpoint.write(url + "\n")
+            self.concluidas.add(url)
+        self._checkpoint.flush()
+        pendentes, self._pendentes, self._linhas_lote = self._pendentes, [], 0
+        if self.ao_concluir is not None:
+            for url, linhas in pendentes:
+                self.ao_concluir(url, linhas)
+
+    def fechar(self):
+        self.descarregar()
+        self._checkpoint.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def parquet_para_csv(diretorio, caminho_csv, linhas_por_lote=10000):
+    """Gera o CSV VTEX (UTF-8 com BOM) a partir do dataset, um lote por vez. Devolve o nº de linhas."""
+    _exigir_pyarrow()
+    partes = sorted(glob.glob(os.path.join(diretorio, "parte-*.parquet")))
+    os.makedirs(os.path.dirname(os.path.abspath(caminho_csv)), exist_ok=True)
+    total = 0
+    with open(caminho_csv, "w", newline="", encoding="utf-8-sig") as f:
+        escritor = None
+        for parte in partes:
+            arquivo = pq.ParquetFile(parte)
+            if escritor is None:
+                escritor = csv.writer(f)
+                escritor.writerow(arquivo.schema_arrow.names)
+            for lote in arquivo.iter_batches(batch_size=linhas_por_lote):
+                colunas = [lote.column(i).to_pylist() for i in range(lote.num_columns)]
+                escritor.writerows(zip(*colunas))
+                total += lote.num_rows
+    return total
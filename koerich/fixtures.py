@@ -0,0 +1,124 @@
+"""PDPs sintéticas no formato da Koerich, para benchmarks e comparações offline."""
+import json
+from html import escape
+
+
+def gerar_pdp_html(sku="4043300", nome="Frigobar Midea 45 Litros MRC06B2 Branco", preco="1299.90",
+                   marca="Midea", base_imagens="https://www.koerich.com.br/img", n_imagens=5,
+                   n_recomendacoes=40, n_paragrafos=60, variacoes=("110V", "220V"),
+                   com_jsonld=True, com_next_data=True):
+    """Monta o HTML de uma PDP com JSON-LD, __NEXT_DATA__, breadcrumb, galeria e variações.
+
+    `n_recomendacoes` e `n_paragrafos` inflam o __NEXT_DATA__ e o texto da
+    página, para simular as PDPs grandes do catálogo. Sem JSON-LD e
+    __NEXT_DATA__ a página simula uma PDP que só fica completa renderizada.
+    """
+    imagens = [f"{base_imagens}/{sku}_{i}.jpg" for i in range(1, n_imagens + 1)]
+    preco_br = f"{float(preco):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    jsonld = {
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": nome,
+        "sku": sku,
+        "description": f"{nome}. Eficiência energética A, garantia de 12 meses.",
+        "brand": {"@type": "Brand", "name": marca},
+        "image": imagens,
+        "offers": {"@type": "Offer", "price": preco, "priceCurrency": "BRL"},
+    }
+    next_data = {
+        "props": {
+            "pageProps": {
+                "product": {
+                    "productId": sku,
+                    "itemId": sku,
+                    "productName": nome,
+                    "brand": marca,
+                    "categoryTree": [{"id": 1, "name": "Eletrodomésticos"}, {"id": 6, "name": "Refrigeração"},
+                                     {"id": 1, "name": "Frigobar"}],
+                    "images": [{"imageUrl": u, "imageLabel": f"{i}"} for i, u in enumerate(imagens, 1)],
+                },
+                "recommendations": [
+                    {
+                        "productId": f"{int(sku) + i}" if sku.isdigit() else f"{sku}-{i}",
+                        "productName": f"Produto relacionado {i}",
+                        "images": [{"imageUrl": f"{base_imagens}/rel_{i}_{j}.jpg"} for j in range(3)],
+                        "specs": {f"spec_{k}": f"valor {k}" for k in range(10)},
+                    }
+                    for i in range(n_recomendacoes)
+                ],
+            }
+        }
+    }
+    galeria = "\n".join(
+        f'<img src="{u}" srcset="{u}?w=500 500w, {u}?w=1000 1000w" alt="{escape(nome)}">' for u in imagens
+    )
+    opcoes = "\n".join(f'<option value="{v}">{v}</option>' for v in variacoes)
+    paragrafos = "\n".join(
+        f"<p>Especificação {i}: capacidade, consumo e dimensões do {escape(nome)}.</p>" for i in range(n_paragrafos)
+    )
+    script_jsonld = script_next_data = ""
+    if com_jsonld:
+        script_jsonld = f'<script type="application/ld+json">{json.dumps(jsonld, ensure_ascii=False)}</script>'
+    if com_next_data:
+        script_next_data = (f'<script id="__NEXT_DATA__" type="application/json">'
+                            f'{json.dumps(next_data, ensure_ascii=False)}</script>')
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{escape(nome)} | Koerich</title>
+<meta itemprop="sku" content="{sku}">
+{script_jsonld}
+</head>
+<body>
+<div class="category"><ul id="breadcrumbTrail">
+<li>Você está em:</li><li><a href="/">Início</a></li>
+<li><a href="/eletrodomesticos">Eletrodomésticos</a></li>
+<li><a href="/refrigeracao">Refrigeração</a></li>
+<li><a href="/frigobar">Frigobar</a></li>
+<li>{escape(nome)}</li>
+</ul></div>
+<div class="product-name"><h1>{escape(nome)}</h1></div>
+<div class="product-price">R$ {preco_br}</div>
+<div class="product-images">{galeria}</div>
+<select name="voltagem"><option>Selecione</option>{opcoes}</select>
+<div class="about-product">{paragrafos}<p>Ref.: {sku}</p></div>
+{script_next_data}
+</body>
+</html>
+"""
+
+
+def gerar_produto_catalogo(sku="4043300", nome="Frigobar Midea 45 Litros MRC06B2 Branco", preco="1299.90",
+                           marca="Midea", base_imagens="https://www.koerich.com.br/img", n_imagens=5,
+                           variacoes=("110V", "220V"), link_texto=None):
+    """O mesmo produto de `gerar_pdp_html` como a API de busca do catálogo VTEX devolve.
+
+    Um item (SKU) por variação, com a variação em `variations`; categorias
+    do nível mais profundo para o mais raso, como na API real.
+    """
+    imagens = [{"imageId": f"{sku}{i}", "imageLabel": f"{i}", "imageUrl": f"{base_imagens}/{sku}_{i}.jpg"}
+               for i in range(1, n_imagens + 1)]
+    oferta = {"Price": float(preco), "ListPrice": float(preco), "AvailableQuantity": 10}
+    itens = [
+        {
+            "itemId": sku if i == 0 else f"{sku}{i}",
+            "name": f"{nome} {v}",
+            "variations": ["Voltagem"],
+            "Voltagem": [v],
+            "images": imagens,
+            "sellers": [{"sellerId": "1", "commertialOffer": dict(oferta)}],
+        }
+        for i, v in enumerate(variacoes)
+    ] or [{"itemId": sku, "name": nome, "images": imagens, "sellers": [{"sellerId": "1", "commertialOffer": oferta}]}]
+    return {
+        "productId": sku,
+        "productName": nome,
+        "productReference": sku,
+        "brand": marca,
+        "linkText": link_texto or sku,
+        "description": f"{nome}. Eficiência energética A, garantia de 12 meses.",
+        "categories": ["/Eletrodomésticos/Refrigeração/Frigobar/", "/Eletrodomésticos/Refrigeração/", "/Eletrodomésticos/"],
+        "categoriesIds": ["/1/6/1/", "/1/6/", "/1/"],
+        "items": itens,
+    }
@@ -0,0 +1,515 @@
+"""Fronteira de crawl compartilhada: URLs com estado, tentativas e lease, para vários workers/hosts.
+
+Cada URL está `pendente`, `em_andamento` (com dono e lease até um instante),
+`concluida` ou `falhou`. Um worker reivindica um lote, renova o lease
+enquanto trabalha (heartbeat) e informa o resultado; leases vencidos (worker
+que morreu ou travou) voltam para `pendente`, contando como tentativa, até
+`max_tentativas`.
+
+Backends com a mesma interface:
+
+- `FronteiraSQLite`: um arquivo SQLite (vários processos na mesma máquina)
+- `FronteiraMemoria`: em memória, substituto local para testes e benchmarks
+- `FronteiraHTTP`: cliente de uma fronteira servida por `servir_fronteira`
+  (workers em outras máquinas)
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.request
+from collections import Counter
+
+ESTADOS = ("pendente", "em_andamento", "concluida", "falhou")
+
+
+def _agora():
+    return time.time()
+
+
+class FronteiraSQLite:
+    """Fronteira num SQLite em WAL; reivindicação e reenfileiramento em transações `IMMEDIATE`.
+
+    Serve a vários processos na mesma máquina (o arquivo não deve ficar em
+    disco de rede: para outros hosts, sirva-o com `servir_fronteira`).
+    """
+
+    def __init__(self, caminho, max_tentativas=3):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.max_tentativas = max_tentativas
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(caminho, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                estado TEXT NOT NULL DEFAULT 'pendente',
+                tentativas INTEGER NOT NULL DEFAULT 0,
+                dono TEXT,
+                lease_ate REAL,
+                erro TEXT,
+                atualizado_em REAL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS urls_estado ON urls (estado, id)")
+
+    def _transacao(self, funcao):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                resultado = funcao(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return resultado
+
+    def adicionar(self, urls, lote=5000):
+        """Enfileira `urls` (iterável, consumido em lotes); as já conhecidas são ignoradas. Devolve quantas entraram."""
+        novas, pendentes = 0, []
+
+        def inserir(db):
+            antes = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO urls (url, atualizado_em) VALUES (?, ?)",
+                           [(u, _agora()) for u in pendentes])
+            return db.total_changes - antes
+
+        for url in urls:
+            pendentes.append(url)
+            if len(pendentes) >= lote:
+                novas += self._transacao(inserir)
+                pendentes = []
+        if pendentes:
+            novas += self._transacao(inserir)
+        return novas
+
+    def _reenfileirar(self, db, agora):
+        cur = db.execute(
+            """UPDATE urls SET estado = CASE WHEN tentativas >= ? THEN 'falhou' ELSE 'pendente' END,
+                   dono = NULL, lease_ate = NULL, erro = 'lease vencido', atualizado_em = ?
+               WHERE estado = 'em_andamento' AND lease_ate < ?""",
+            (self.max_tentativas, agora, agora),
+        )
+        return cur.rowcount
+
+    def reenfileirar_expirados(self):
+        return self._transacao(lambda db: self._reenfileirar(db, _agora()))
+
+    def reivindicar(self, dono, n, lease_s):
+        """Até `n` URLs pendentes passam a `dono` por `lease_s` segundos (antes, os leases vencidos voltam à fila)."""
+        def reivindicar(db):
+            agora = _agora()
+            self._reenfileirar(db, agora)
+            rows = db.execute("SELECT id, url FROM urls WHERE estado = 'pendente' ORDER BY id LIMIT ?", (n,)).fetchall()
+            db.executemany(
+                """UPDATE urls SET estado = 'em_andamento', dono = ?, lease_ate = ?, tentativas = tentativas + 1,
+                       atualizado_em = ? WHERE id = ?""",
+                [(dono, agora + lease_s, agora, id_) for id_, _ in rows],
+            )
+            return [url for _, url in rows]
+        return self._transacao(reivindicar)
+
+    def renovar(self, dono, urls, lease_s):
+        """Heartbeat: estende o lease das `urls` que ainda são de `dono`; devolve as renovadas."""
+        def renovar(db):
+            lease_ate = _agora() + lease_s
+            renovadas = []
+            for url in urls:
+                cur = db.execute("UPDATE urls SET lease_ate = ? WHERE url = ? AND dono = ? AND estado = 'em_andamento'",
+                                 (lease_ate, url, dono))
+                if cur.rowcount:
+                    renovadas.append(url)
+            return renovadas
+        return self._transacao(renovar)
+
+    def concluir(self, dono, resultados):
+        """`resultados`: (url, ok, erro). Só valem para URLs ainda em lease de `dono`; devolve quantas foram aceitas."""
+        def concluir(db):
+            aceitas = 0
+            for url, ok, erro in resultados:
+                if ok:
+                    cur = db.execute(
+                        """UPDATE urls SET estado = 'concluida', dono = NULL, lease_ate = NULL, erro = NULL,
+                               atualizado_em = ? WHERE url = ? AND dono = ? AND estado = 'em_andamento'""",
+                        (_agora(), url, dono))
+                else:
+                    cur = db.execute(
+                        """UPDATE urls SET estado = CASE WHEN tentativas >= ? THEN 'falhou' ELSE 'pendente' END,
+                               dono = NULL, lease_ate = NULL, erro = ?, atualizado_em = ?
+                           WHERE url = ? AND dono = ? AND estado = 'em_andamento'""",
+                        (self.max_tentativas, erro, _agora(), url, dono))
+                aceitas += cur.rowcount
+            return aceitas
+        return self._transacao(concluir)
+
+    def liberar(self, dono, urls):
+        """Devolve à fila URLs reivindicadas e não começadas, sem gastar tentativa."""
+        def liberar(db):
+            cur = db.executemany(
+                """UPDATE urls SET estado = 'pendente', dono = NULL, lease_ate = NULL, tentativas = tentativas - 1
+                   WHERE url = ? AND dono = ? AND estado = 'em_andamento'""",
+                [(url, dono) for url in urls])
+            return cur.rowcount
+        return self._transacao(liberar)
+
+    def resumo(self):
+        with self._lock:
+            contagem = dict(self._db.execute("SELECT estado, COUNT(*) FROM urls GROUP BY estado"))
+        return {estado: contagem.get(estado, 0) for estado in ESTADOS}
+
+    def fechar(self):
+        with self._lock:
+            self._db.close()
+
+
+class _Item:
+    __slots__ = ("estado", "tentativas", "dono", "lease_ate", "erro")
+
+    def __init__(self):
+        self.estado = "pendente"
+        self.tentativas = 0
+        self.dono = None
+        self.lease_ate = None
+        self.erro = None
+
+
+class FronteiraMemoria:
+    """Mesma semântica da `FronteiraSQLite`, em memória (um processo; testes e benchmarks)."""
+
+    def __init__(self, max_tentativas=3):
+        self.max_tentativas = max_tentativas
+        self._lock = threading.Lock()
+        self._itens = {}
+
+    def adicionar(self, urls, lote=None):
+        with self._lock:
+            antes = len(self._itens)
+            for url in urls:
+                self._itens.setdefault(url, _Item())
+            return len(self._itens) - antes
+
+    def _devolver(self, item, erro):
+        item.estado = "falhou" if item.tentativas >= self.max_tentativas else "pendente"
+        item.dono = item.lease_ate = None
+        item.erro = erro
+
+    def _reenfileirar(self, agora):
+        vencidos = [i for i in self._itens.values() if i.estado == "em_andamento" and i.lease_ate < agora]
+        for item in vencidos:
+            self._devolver(item, "lease vencido")
+        return len(vencidos)
+
+    def reenfileirar_expirados(self):
+        with self._lock:
+            return self._reenfileirar(_agora())
+
+    def reivindicar(self, dono, n, lease_s):
+        with self._lock:
+            agora = _agora()
+            self._reenfileirar(agora)
+            urls = []
+            for url, item in self._itens.items():
+                if len(urls) >= n:
+                    break
+                if item.estado == "pendente":
+                    item.estado, item.dono, item.lease_ate = "em_andamento", dono, agora + lease_s
+                    item.tentativas += 1
+                    urls.append(url)
+            return urls
+
+    def _do_dono(self, url, dono):
+        item = self._itens.get(url)
+        return item if item is not None and item.dono == dono and item.estado == "em_andamento" else None
+
+    def renovar(self, dono, urls, lease_s):
+        with self._lock:
+            renovadas = []
+            for url in urls:
+                item = self._do_dono(url, dono)
+                if item is not None:
+                    item.lease_ate = _agora() + lease_s
+                    renovadas.append(url)
+            return renovadas
+
+    def concluir(self, dono, resultados):
+        with self._lock:
+            aceitas = 0
+            for url, ok, erro in resultados:
+                item = self._do_dono(url, dono)
+                if item is None:
+                    continue
+                if ok:
+                    item.estado, item.dono, item.lease_ate, item.erro = "concluida", None, None, None
+                else:
+                    self._devolver(item, erro)
+                aceitas += 1
+            return aceitas
+
+    def liberar(self, dono, urls):
+        with self._lock:
+            liberadas = 0
+            for url in urls:
+                item = self._do_dono(url, dono)
+                if item is not None:
+                    item.estado, item.dono, item.lease_ate = "pendente", None, None
+                    item.tentativas -= 1
+                    liberadas += 1
+            return liberadas
+
+    def resumo(self):
+        with self._lock:
+            contagem = Counter(i.estado for i in self._itens.values())
+        return {estado: contagem.get(estado, 0) for estado in ESTADOS}
+
+    def fechar(self):
+        pass
+
+
+class FronteiraHTTP:
+    """Cliente JSON (só stdlib) de uma fronteira exposta por `servir_fronteira` em outra máquina."""
+
+    def __init__(self, base, timeout=30):
+        self.base = base.rstrip("/")
+        self.timeout = timeout
+
+    def _chamar(self, operacao, **dados):
+        req = urllib.request.Request(f"{self.base}/{operacao}", data=json.dumps(dados).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read())["resultado"]
+
+    def adicionar(self, urls, lote=5000):
+        novas, pendentes = 0, []
+        for url in urls:
+            pendentes.append(url)
+            if len(pendentes) >= lote:
+                novas += self._chamar("adicionar", urls=pendentes)
+                pendentes = []
+        if pendentes:
+            novas += self._chamar("adicionar", urls=pendentes)
+        return novas
+
+    def reenfileirar_expirados(self):
+        return self._chamar("reenfileirar_expirados")
+
+    def reivindicar(self, dono, n, lease_s):
+        return self._chamar("reivindicar", dono=dono, n=n, lease_s=lease_s)
+
+    def renovar(self, dono, urls, lease_s):
+        return self._chamar("renovar", dono=dono, urls=list(urls), lease_s=lease_s)
+
+    def concluir(self, dono, resultados):
+        return self._chamar("concluir", dono=dono, resultados=[list(r) for r in resultados])
+
+    def liberar(self, dono, urls):
+        return self._chamar("liberar", dono=dono, urls=list(urls))
+
+    def resumo(self):
+        return self._chamar("resumo")
+
+    def fechar(self):
+        pass
+
+
+OPERACOES = ("adicionar", "reenfileirar_expirados", "reivindicar", "renovar", "concluir", "liberar", "resumo")
+
+
+def servir_fronteira(fronteira, porta, endereco="127.0.0.1"):
+    """Expõe `fronteira` por HTTP (POST /<operação> com JSON) num thread daemon; devolve o servidor.
+
+    Não há autenticação: qualquer um que alcance a porta altera a fila. Por
+    isso o padrão é só localhost; outras máquinas exigem `endereco` explícito
+    (ex.: "0.0.0.0") numa rede confiável.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def _responder(self, status, dados):
+            corpo = json.dumps(dados).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_POST(self):
+            operacao = self.path.strip("/")
+            if operacao not in OPERACOES:
+                return self._responder(404, {"erro": f"operação desconhecida: {operacao}"})
+            try:
+                tamanho = int(self.headers.get("Content-Length") or 0)
+                dados = json.loads(self.rfile.read(tamanho) or b"{}")
+                if not isinstance(dados, dict):
+                    raise ValueError("o corpo deve ser um objeto JSON com os argumentos da operação")
+                resultado = getattr(fronteira, operacao)(**dados)
+            except (TypeError, ValueError) as e:
+                return self._responder(400, {"erro": str(e)})
+            except Exception as e:
+                # Erro do backend (ex.: sqlite3.Error): responde em vez de deixar o worker esperar o timeout
+                return self._responder(500, {"erro": f"{type(e).__name__}: {e}"})
+            self._responder(200, {"resultado": resultado})
+
+        def do_GET(self):
+            if self.path.strip("/") != "resumo":
+                return self._responder(404, {"erro": "use GET /resumo ou POST /<operação>"})
+            try:
+                resultado = fronteira.resumo()
+            except Exception as e:
+                return self._responder(500, {"erro": f"{type(e).__name__}: {e}"})
+            self._responder(200, {"resultado": resultado})
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((endereco, porta), Handler)
+    threading.Thread(target=servidor.serve_forever, name="fronteira-http", daemon=True).start()
+    return servidor
+
+
+def abrir_fronteira(destino, max_tentativas=3):
+    """`http(s)://...` → `FronteiraHTTP`; `:memoria:` → `FronteiraMemoria`; qualquer outro valor é um SQLite."""
+    if destino.startswith(("http://", "https://")):
+        return FronteiraHTTP(destino)
+    if destino == ":memoria:":
+        return FronteiraMemoria(max_tentativas)
+    return FronteiraSQLite(destino, max_tentativas)
+
+
+def id_worker():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class TrabalhadorFronteira:
+    """Lado do worker: reivindica lotes sob demanda, mantém os leases vivos e informa os resultados.
+
+    `urls()` é um gerador que o loop do scraper consome como qualquer lista
+    de URLs; um novo lote só é pedido quando o anterior acaba, e ele termina
+    quando a fila está vazia (nunca bloqueia esperando outros workers: o
+    consumidor pode ser o event loop do modo async). Um thread de heartbeat
+    renova, a cada `heartbeat_s`, o lease de tudo que foi reivindicado e
+    ainda não teve resultado, e envia os resultados acumulados
+    (`concluir`/`falhar`) em lote. Depois que a rodada terminou e todos os
+    resultados saíram, `aguardar_mais()` espera os outros workers: se algum
+    deles morrer, os leases vencidos voltam e este worker faz outra rodada.
+    """
+
+    def __init__(self, fronteira, dono=None, lote=50, lease_s=300, heartbeat_s=None, aguardar_outros=True):
+        self.fronteira = fronteira
+        self.dono = dono or id_worker()
+        self.lote = lote
+        self.lease_s = lease_s
+        self.heartbeat_s = heartbeat_s or max(1.0, lease_s / 3)
+        self.aguardar_outros = aguardar_outros
+        self.estatisticas = Counter()
+        self._lock = threading.Lock()
+        self._em_voo = set()
+        self._resultados = []
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat, name="fronteira-heartbeat", daemon=True)
+        self._thread.start()
+
+    def urls(self):
+        while not self._parar.is_set():
+            self._enviar_resultados()
+            lote = self.fronteira.reivindicar(self.dono, self.lote, self.lease_s)
+            if not lote:
+                return
+            with self._lock:
+                self._em_voo.update(lote)
+            self._contar("reivindicadas", len(lote))
+            for i, url in enumerate(lote):
+                if self._parar.is_set():
+                    # Fechado no meio do lote: o resto volta para a fila sem gastar tentativa
+                    self._liberar(lote[i:])
+                    return
+                yield url
+
+    def aguardar_mais(self):
+        """Fim de rodada (saída já descarregada): espera enquanto outros workers têm URLs em andamento.
+
+        Devolve True se voltou trabalho para a fila (leases vencidos de um
+        worker que morreu, falhas a tentar de novo) e False quando a
+        fronteira acabou.
+        """
+        self._enviar_resultados()
+        while not self._parar.is_set():
+            self.fronteira.reenfileirar_expirados()
+            resumo = self.fronteira.resumo()
+            if resumo["pendente"]:
+                return True
+            # Leases ainda com este worker não são de outro que possa morrer: esperar por eles travaria
+            with self._lock:
+                proprios = len(self._em_voo)
+            if not self.aguardar_outros or resumo["em_andamento"] <= proprios:
+                return False
+            self._parar.wait(min(self.heartbeat_s, 5.0))
+        return False
+
+    def _contar(self, chave, n=1):
+        # Chamado do heartbeat e das threads do scraper: o += do Counter não é atômico
+        with self._lock:
+            self.estatisticas[chave] += n
+
+    def _liberar(self, urls):
+        with self._lock:
+            urls = [u for u in urls if u in self._em_voo]
+            self._em_voo.difference_update(urls)
+        if urls:
+            self._contar("liberadas", self.fronteira.liberar(self.dono, urls))
+
+    def concluir(self, url):
+        self._resultado(url, True, None)
+
+    def falhar(self, url, erro="falha na extração"):
+        self._resultado(url, False, erro)
+
+    def _resultado(self, url, ok, erro):
+        with self._lock:
+            if url not in self._em_voo:
+                return
+            self._em_voo.discard(url)
+            self._resultados.append((url, ok, erro))
+            cheio = len(self._resultados) >= self.lote
+        if cheio:
+            self._enviar_resultados()
+
+    def _enviar_resultados(self):
+        with self._lock:
+            resultados, self._resultados = self._resultados, []
+        if not resultados:
+            return
+        aceitas = self.fronteira.concluir(self.dono, resultados)
+        ok = sum(1 for _, sucesso, _ in resultados if sucesso)
+        self._contar("concluidas", ok)
+        self._contar("falhas", len(resultados) - ok)
+        # Lease perdido (venceu e outro worker pegou): o resultado deste worker não conta
+        self._contar("rejeitadas", len(resultados) - aceitas)
+
+    def _heartbeat(self):
+        while not self._parar.wait(self.heartbeat_s):
+            try:
+                with self._lock:
+                    em_voo = list(self._em_voo)
+                if em_voo:
+                    renovadas = set(self.fronteira.renovar(self.dono, em_voo, self.lease_s))
+                    perdidas = [u for u in em_voo if u not in renovadas]
+                    if perdidas:
+                        with self._lock:
+                            self._em_voo.difference_update(perdidas)
+                        self._contar("leases_perdidos", len(perdidas))
+                        print(f"⚠️ Fronteira: {len(perdidas)} leases perdidos (vencidos e repassados)")
+                self._enviar_resultados()
+            except Exception as e:
+                print(f"⚠️ Heartbeat da fronteira falhou: {e}")
+
+    def fechar(self):
+        """Envia os resultados pendentes e devolve à fila o que foi reivindicado e não terminou."""
+        self._parar.set()
+        self._thread.join()
+        self._enviar_resultados()
+        with self._lock:
+            restantes = list(self._em_voo)
+        self._liberar(restantes)
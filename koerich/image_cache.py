@@ -0,0 +1,213 @@
+"""Cache persistente de imagens: índice por URL + objetos endereçados pelo conteúdo."""
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+def sha256_arquivo(caminho):
+    """SHA-256 dos bytes de `caminho`, a mesma chave dos objetos do cache."""
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 16), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+class CacheImagens:
+    """Lembra ETag/Last-Modified e o SHA-256 de cada imagem baixada.
+
+    Os bytes ficam uma única vez em `objetos/<sha[:2]>/<sha>` e os arquivos
+    de saída (`{sku}_{i}.jpg`) são hardlinks para eles, então SKUs que
+    compartilham a mesma foto ocupam o espaço de uma só. Quem for alterar um
+    arquivo de saída deve gravar outro e substituí-lo (`os.replace`), nunca
+    escrever por cima, para não corromper o objeto do cache.
+
+    A tabela `pos_processadas` guarda, por SHA-256 dos bytes baixados e
+    parâmetros do pós-processamento, o resultado dele (saída e derivadas
+    também como objetos): uma imagem que voltou com 304 não é reprocessada.
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self.objetos = os.path.join(diretorio, "objetos")
+        os.makedirs(self.objetos, exist_ok=True)
+        self.estatisticas = Counter()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(diretorio, "indice.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS imagens (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                sha256 TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                content_type TEXT,
+                atualizado_em REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS pos_processadas (
+                origem TEXT NOT NULL,
+                parametros TEXT NOT NULL,
+                resultado TEXT NOT NULL,
+                atualizado_em REAL NOT NULL,
+                PRIMARY KEY (origem, parametros)
+            )"""
+        )
+        self._db.commit()
+
+    def caminho_objeto(self, sha):
+        return os.path.join(self.objetos, sha[:2], sha)
+
+    def consultar(self, url):
+        """Entrada do índice para `url` (dict) se o objeto ainda existir no disco."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, sha256, tamanho, content_type FROM imagens WHERE url = ?", (url,)
+            ).fetchone()
+        if not row or not os.path.exists(self.caminho_objeto(row[2])):
+            return None
+        return dict(zip(("etag", "last_modified", "sha256", "tamanho", "content_type"), row))
+
+    def registrar(self, url, sha, tamanho, etag=None, last_modified=None, content_type=None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO imagens VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, sha, tamanho, content_type, time.time()),
+            )
+            self._db.commit()
+
+    def contar(self, chave):
+        # Chamado das threads de download: o += do Counter não é atômico
+        with self._lock:
+            self.estatisticas[chave] += 1
+
+    def headers_condicionais(self, entrada):
+        headers = {}
+        if entrada:
+            if entrada.get("etag"):
+                headers["If-None-Match"] = entrada["etag"]
+            if entrada.get("last_modified"):
+                headers["If-Modified-Since"] = entrada["last_modified"]
+        return headers
+
+    def armazenar(self, chunks):
+        """Grava os chunks como objeto endereçado pelo conteúdo; devolve (sha, tamanho)."""
+        sha = hashlib.sha256()
+        tamanho = 0
+        fd, tmp = tempfile.mkstemp(dir=self.objetos, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    if chunk:
+                        sha.update(chunk)
+                        tamanho += len(chunk)
+                        f.write(chunk)
+            digest = sha.hexdigest()
+            destino = self.caminho_objeto(digest)
+            if os.path.exists(destino):
+                self.contar("deduplicadas")
+                os.unlink(tmp)
+            else:
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                os.replace(tmp, destino)
+            return digest, tamanho
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def materializar(self, sha, destino):
+        """Coloca o objeto `sha` em `destino` por hardlink (cópia se o link falhar)."""
+        origem = self.caminho_objeto(sha)
+        if os.path.exists(destino) and os.path.samefile(origem, destino):
+            return
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        tmp = f"{destino}.{threading.get_ident()}.tmp"
+        try:
+            os.link(origem, tmp)
+        except OSError:
+            with open(origem, "rb") as src, open(tmp, "wb") as dst:
+                dst.write(src.read())
+        os.replace(tmp, destino)
+
+    def guardar_arquivo(self, caminho):
+        """Guarda `caminho` como objeto (hardlink, sem copiar os bytes se der) e devolve o SHA-256."""
+        digest = sha256_arquivo(caminho)
+        destino = self.caminho_objeto(digest)
+        if not os.path.exists(destino):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            tmp = f"{destino}.{threading.get_ident()}.tmp"
+            try:
+                os.link(caminho, tmp)
+            except OSError:
+                shutil.copyfile(caminho, tmp)
+            os.replace(tmp, destino)
+        return digest
+
+    def consultar_pos(self, origem, parametros):
+        """Resultado do pós-processamento de `origem` com `parametros`, se os objetos dele ainda existirem."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT resultado FROM pos_processadas WHERE origem = ? AND parametros = ?", (origem, parametros)
+            ).fetchone()
+        if not row:
+            return None
+        resultado = json.loads(row[0])
+        objetos = [resultado.get("objeto"), *resultado.get("derivadas", {}).values()]
+        if not all(os.path.exists(self.caminho_objeto(sha)) for sha in objetos if sha):
+            return None
+        return resultado
+
+    def registrar_pos(self, origem, parametros, resultado):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pos_processadas VALUES (?, ?, ?, ?)",
+                (origem, parametros, json.dumps(resultado), time.time()),
+            )
+            self._db.commit()
+
+    def fechar(self):
+        with self._lock:
+            self._db.close()
+
+
+def baixar_imagem_com_cache(session, cache, url_img, destino):
+    """Como `baixar_imagem`, mas com requisição condicional e objetos deduplicados.
+
+    Se o servidor responder 304, o arquivo é refeito a partir do cache sem
+    transferir os bytes de novo.
+    """
+    try:
+        entrada = cache.consultar(url_img)
+        headers = cache.headers_condicionais(entrada)
+        with session.get(url_img, headers=headers, stream=True, timeout=30) as resp:
+            if resp.status_code == 304 and entrada:
+                cache.contar("nao_modificadas")
+                cache.materializar(entrada["sha256"], destino)
+                return entrada["tamanho"] >= 1024
+            resp.raise_for_status()
+
+            content_type = resp.headers.get('content-type', '')
+            if not content_type.startswith('image/'):
+                return False
+
+            sha, tamanho = cache.armazenar(resp.iter_content(8192))
+            cache.registrar(
+                url_img, sha, tamanho,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+                content_type=content_type,
+            )
+        cache.contar("baixadas")
+        cache.materializar(sha, destino)
+        return tamanho >= 1024
+    except Exception:
+        return False
@@ -0,0 +1,149 @@
+"""Manifesto SKU → imagens gravado pelo scraper, com o id VTEX de cada SKU persistido entre execuções."""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# SKUs com letras não são aceitos como _IDSKU na VTEX: recebem um número a partir daqui, decrescente
+PRIMEIRO_NUMERO = 9999999
+MAPEAMENTOS_FIXOS = {"09025": "9999999"}
+PADRAO_ARQUIVO = re.compile(r"([a-zA-Z0-9]+)_(\d+)\.(jpg|jpeg|png|webp)$", re.IGNORECASE)
+ROTULOS = ("primeira", "segunda", "terceira", "quarta", "quinta")
+COLUNAS_CSV = ("_IDSKU", "IsMain", "Label", "Name", "url")
+
+
+def rotulo(posicao):
+    return ROTULOS[posicao] if posicao < len(ROTULOS) else f"{posicao + 1}ª"
+
+
+def linhas_csv(sku_vtex, arquivos, base_url):
+    """Linhas do CSV de imagens VTEX de um SKU; a primeira imagem é a principal."""
+    return [[sku_vtex, str(i == 0), rotulo(i), rotulo(i), f"{base_url}{arquivo}"] for i, arquivo in enumerate(arquivos)]
+
+
+class ManifestoImagens:
+    """Galeria final (arquivos em ordem) de cada SKU e o `_IDSKU` VTEX que ele usa.
+
+    O id de SKUs alfanuméricos é atribuído uma vez, na ordem em que aparecem,
+    e fica gravado: o mesmo SKU tem o mesmo id em todas as execuções, não
+    importa a ordem do diretório. `exportado_hash` marca até onde o CSV de
+    imagens já foi gerado, para a próxima geração só acrescentar o que é novo.
+    """
+
+    def __init__(self, caminho):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(caminho, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS mapeamento (
+                original TEXT PRIMARY KEY,
+                numero TEXT NOT NULL UNIQUE
+            )"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS skus (
+                sku TEXT PRIMARY KEY,
+                sku_vtex TEXT NOT NULL,
+                arquivos TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                exportado_hash TEXT,
+                atualizado_em REAL NOT NULL
+            )"""
+        )
+        self._db.executemany("INSERT OR IGNORE INTO mapeamento VALUES (?, ?)", MAPEAMENTOS_FIXOS.items())
+        self._db.commit()
+
+    def _sku_vtex(self, sku):
+        """Id VTEX de `sku` (chamar com o lock): o próprio SKU se for numérico, senão o mapeamento persistido."""
+        row = self._db.execute("SELECT numero FROM mapeamento WHERE original = ?", (sku,)).fetchone()
+        if row:
+            return row[0]
+        if sku.isdigit():
+            return sku
+        menor = self._db.execute("SELECT MIN(CAST(numero AS INTEGER)) FROM mapeamento").fetchone()[0]
+        numero = str(min(menor or PRIMEIRO_NUMERO + 1, PRIMEIRO_NUMERO + 1) - 1)
+        self._db.execute("INSERT INTO mapeamento VALUES (?, ?)", (sku, numero))
+        return numero
+
+    def registrar(self, sku, arquivos, substituir=True, commit=True):
+        """Grava a galeria de `sku`; com `substituir=False` não mexe em SKUs já registrados."""
+        if not sku or not arquivos:
+            return
+        juntos = ";".join(arquivos)
+        h = hashlib.sha1(juntos.encode("utf-8")).hexdigest()
+        with self._lock:
+            existente = self._db.execute("SELECT hash FROM skus WHERE sku = ?", (sku,)).fetchone()
+            if existente and (existente[0] == h or not substituir):
+                return
+            if existente:
+                self._db.execute("UPDATE skus SET arquivos = ?, hash = ?, atualizado_em = ? WHERE sku = ?",
+                                 (juntos, h, time.time(), sku))
+            else:
+                self._db.execute("INSERT INTO skus VALUES (?, ?, ?, ?, NULL, ?)",
+                                 (sku, self._sku_vtex(sku), juntos, h, time.time()))
+            if commit:
+                self._db.commit()
+
+    def importar_pasta(self, pasta):
+        """Registra SKUs que só existem na pasta (imagens de antes do manifesto), num passe de `os.scandir`.
+
+        Devolve quantos SKUs novos entraram; os já registrados pelo scraper
+        não são alterados.
+        """
+        galerias = {}
+        with os.scandir(pasta) as entradas:
+            for entrada in entradas:
+                m = PADRAO_ARQUIVO.match(entrada.name)
+                if m and entrada.is_file():
+                    galerias.setdefault(m.group(1), []).append((int(m.group(2)), entrada.name))
+        with self._lock:
+            conhecidos = {sku for (sku,) in self._db.execute("SELECT sku FROM skus")}
+        novos = 0
+        # Ordem determinística para os ids atribuídos aqui
+        for sku in sorted(set(galerias) - conhecidos):
+            self.registrar(sku, [nome for _, nome in sorted(galerias[sku])], substituir=False, commit=False)
+            novos += 1
+        with self._lock:
+            self._db.commit()
+        return novos
+
+    def pendentes(self):
+        """(novos, alterados): SKUs nunca exportados e SKUs cuja galeria mudou desde a exportação."""
+        with self._lock:
+            novos = self._db.execute("SELECT COUNT(*) FROM skus WHERE exportado_hash IS NULL").fetchone()[0]
+            alterados = self._db.execute(
+                "SELECT COUNT(*) FROM skus WHERE exportado_hash IS NOT NULL AND exportado_hash != hash"
+            ).fetchone()[0]
+        return novos, alterados
+
+    def iterar(self, so_novos=False, lote=5000):
+        """(sku, sku_vtex, [arquivos]) na ordem de registro, em lotes (sem carregar tudo na memória)."""
+        filtro = "WHERE exportado_hash IS NULL AND rowid > ?" if so_novos else "WHERE rowid > ?"
+        ultimo = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT rowid, sku, sku_vtex, arquivos FROM skus {filtro} ORDER BY rowid LIMIT ?", (ultimo, lote)
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, sku, sku_vtex, arquivos in rows:
+                yield sku, sku_vtex, arquivos.split(";")
+            ultimo = rows[-1][0]
+
+    def marcar_exportados(self):
+        with self._lock:
+            self._db.execute("UPDATE skus SET exportado_hash = hash")
+            self._db.commit()
+
+    def mapeamentos(self):
+        with self._lock:
+            return dict(self._db.execute("SELECT original, numero FROM mapeamento ORDER BY CAST(numero AS INTEGER) DESC"))
+
+    def fechar(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
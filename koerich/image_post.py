@@ -0,0 +1,298 @@
+"""Pós-processamento das imagens baixadas: formato real, JPEG normalizado, derivadas e duplicatas."""
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from koerich.image_cache import sha256_arquivo
+
+try:
+    from PIL import Image
+except Exception:
+    Image = None
+
+# Assinaturas (offset, bytes) dos formatos que aparecem nas galerias
+ASSINATURAS = (
+    ("jpeg", 0, b"\xff\xd8\xff"),
+    ("png", 0, b"\x89PNG\r\n\x1a\n"),
+    ("gif", 0, b"GIF87a"),
+    ("gif", 0, b"GIF89a"),
+    ("bmp", 0, b"BM"),
+)
+EXTENSOES = {"jpeg": ".jpg", "png": ".png", "webp": ".webp", "gif": ".gif", "avif": ".avif", "bmp": ".bmp"}
+
+# Tamanhos VTEX (lado maior, px) gerados em <pasta>/derivadas/<nome>/
+DERIVADOS_VTEX = {"media": 500, "miniatura": 150}
+
+
+def detectar_formato(cabecalho):
+    """Formato real pelos magic bytes (não pelo content-type nem pela extensão); None se desconhecido."""
+    for formato, offset, magia in ASSINATURAS:
+        if cabecalho[offset:offset + len(magia)] == magia:
+            return formato
+    if cabecalho[:4] == b"RIFF" and cabecalho[8:12] == b"WEBP":
+        return "webp"
+    if cabecalho[4:8] == b"ftyp" and cabecalho[8:12] in (b"avif", b"avis"):
+        return "avif"
+    return None
+
+
+def dhash(imagem, lado=8):
+    """Hash perceptual por diferença (64 bits): fotos iguais em outro tamanho/qualidade ficam a poucos bits."""
+    cinza = imagem.convert("L").resize((lado + 1, lado), Image.LANCZOS)
+    pixels = list(cinza.getdata())
+    valor = 0
+    for linha in range(lado):
+        for coluna in range(lado):
+            esquerda = pixels[linha * (lado + 1) + coluna]
+            valor = (valor << 1) | (esquerda > pixels[linha * (lado + 1) + coluna + 1])
+    return valor
+
+
+def distancia(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _substituir(imagem, destino, qualidade):
+    """Grava JPEG num temporário e troca (o arquivo pode ser hardlink para o cache de imagens)."""
+    tmp = f"{destino}.{os.getpid()}.tmp"
+    imagem.save(tmp, "JPEG", quality=qualidade, optimize=True, progressive=True)
+    os.replace(tmp, destino)
+
+
+def _rgb(imagem):
+    """RGB sem transparência (fundo branco), que é o que o JPEG e a VTEX esperam."""
+    if imagem.mode in ("RGBA", "LA") or (imagem.mode == "P" and "transparency" in imagem.info):
+        rgba = imagem.convert("RGBA")
+        fundo = Image.new("RGB", rgba.size, (255, 255, 255))
+        fundo.paste(rgba, mask=rgba.getchannel("A"))
+        return fundo
+    return imagem.convert("RGB") if imagem.mode != "RGB" else imagem
+
+
+def processar_imagem(pasta, fname, normalizar_jpeg=True, derivados=None, qualidade=85):
+    """Roda num processo do pool; devolve um dict com o arquivo final (ou None) e o que foi feito.
+
+    Sem Pillow só corrige a extensão e usa o hash exato dos bytes como
+    assinatura; com Pillow converte para JPEG o que não for JPEG RGB, gera as
+    derivadas que faltarem e calcula o dHash.
+    """
+    caminho = os.path.join(pasta, fname)
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    formato = detectar_formato(dados[:32])
+    resultado = {"arquivo": None, "formato": formato, "acao": None, "bytes_antes": len(dados),
+                 "bytes_depois": 0, "dhash": None, "sha": hashlib.blake2b(dados, digest_size=16).hexdigest(),
+                 "derivadas": 0}
+    if formato is None:
+        os.unlink(caminho)
+        resultado["acao"] = "invalida"
+        return resultado
+
+    base = os.path.splitext(fname)[0]
+    if Image is not None:
+        try:
+            with Image.open(caminho) as imagem:
+                imagem.load()
+                if normalizar_jpeg and (formato != "jpeg" or imagem.mode != "RGB"):
+                    imagem = _rgb(imagem)
+                    novo = base + ".jpg"
+                    _substituir(imagem, os.path.join(pasta, novo), qualidade)
+                    if novo != fname:
+                        os.unlink(caminho)
+                    fname, formato, resultado["acao"] = novo, "jpeg", "convertida"
+                resultado["dhash"] = dhash(imagem)
+                resultado["derivadas"] = _derivar(imagem, pasta, fname, derivados or {}, qualidade)
+        except (OSError, SyntaxError, ValueError):
+            # Cabeçalho válido mas conteúdo truncado/corrompido
+            if os.path.exists(caminho):
+                os.unlink(caminho)
+            resultado["acao"] = "invalida"
+            return resultado
+
+    correto = base + EXTENSOES[formato]
+    if fname != correto:
+        os.replace(os.path.join(pasta, fname), os.path.join(pasta, correto))
+        fname, resultado["acao"] = correto, resultado["acao"] or "renomeada"
+    resultado["arquivo"] = fname
+    resultado["bytes_depois"] = os.path.getsize(os.path.join(pasta, fname))
+    return resultado
+
+
+def _derivar(imagem, pasta, fname, derivados, qualidade):
+    """Gera as derivadas que não existem ou são mais antigas que a original; devolve quantas gerou."""
+    geradas = 0
+    mtime = os.path.getmtime(os.path.join(pasta, fname))
+    for nome, lado in derivados.items():
+        destino = os.path.join(pasta, "derivadas", nome, os.path.splitext(fname)[0] + ".jpg")
+        if os.path.exists(destino) and os.path.getmtime(destino) >= mtime:
+            continue
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        copia = _rgb(imagem).copy()
+        copia.thumbnail((lado, lado), Image.LANCZOS)
+        _substituir(copia, destino, qualidade)
+        geradas += 1
+    return geradas
+
+
+class PosProcessadorImagens:
+    """Pool de processos que trata as imagens de cada produto depois do download.
+
+    `enviar(arquivos)` devolve um Future com os arquivos finais da galeria,
+    na mesma ordem: inválidos saem, extensões são corrigidas e imagens a até
+    `limiar_dhash` bits de uma anterior (quase duplicatas, como a mesma foto
+    em duas resoluções) são apagadas. Sem Pillow só duplicatas exatas saem.
+
+    Com `cache` (um `CacheImagens`) o resultado de cada imagem fica guardado
+    pelo SHA-256 dos bytes baixados: quando a mesma imagem volta (304 ou
+    outro SKU com a mesma foto), saída e derivadas são refeitas por hardlink
+    a partir do cache, sem passar pelo pool ("reaproveitada").
+    """
+
+    def __init__(self, pasta, workers=None, normalizar_jpeg=True, derivados=None, limiar_dhash=4,
+                 qualidade=85, metricas=None, cache=None):
+        self.pasta = pasta
+        self.normalizar_jpeg = normalizar_jpeg
+        self.derivados = dict(DERIVADOS_VTEX if derivados is None else derivados)
+        self.limiar_dhash = limiar_dhash
+        self.qualidade = qualidade
+        self.metricas = metricas
+        self.cache = cache
+        # O mesmo arquivo de origem dá outra saída se estes parâmetros mudarem
+        self._parametros = (f"jpeg={int(normalizar_jpeg)};q={qualidade};pillow={int(Image is not None)};"
+                            + ",".join(f"{nome}:{lado}" for nome, lado in sorted(self.derivados.items())))
+        self.estatisticas = Counter()
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(workers or os.cpu_count(),
+                                             mp_context=multiprocessing.get_context("spawn"))
+
+    def enviar(self, arquivos):
+        arquivos = list(arquivos)
+        agregado = Future()
+        if not arquivos:
+            agregado.set_result([])
+            return agregado
+        resultados = [None] * len(arquivos)
+        restantes = [len(arquivos)]
+
+        def concluido(i, fname, origem, fut):
+            try:
+                resultados[i] = fut.result()
+            except Exception:
+                # Falha do pool (não da imagem): fica o arquivo como foi baixado
+                resultados[i] = {"arquivo": fname, "acao": "erro", "dhash": None, "sha": None,
+                                 "bytes_antes": 0, "bytes_depois": 0, "derivadas": 0}
+            else:
+                self._memorizar(origem, resultados[i])
+            with self._lock:
+                restantes[0] -= 1
+                fim = restantes[0] == 0
+            if fim:
+                agregado.set_result(self._galeria(resultados))
+
+        for i, fname in enumerate(arquivos):
+            origem, reaproveitado = self._reaproveitar(fname)
+            if reaproveitado is not None:
+                fut = Future()
+                fut.set_result(reaproveitado)
+            else:
+                fut = self._executor.submit(processar_imagem, self.pasta, fname, self.normalizar_jpeg,
+                                            self.derivados, self.qualidade)
+            fut.add_done_callback(lambda f, i=i, fname=fname, origem=origem: concluido(i, fname, origem, f))
+        return agregado
+
+    def _reaproveitar(self, fname):
+        """`(sha da origem, resultado)`; o resultado só vem se a mesma origem já foi processada.
+
+        Qualquer problema (sem cache, arquivo sumiu, objeto apagado) devolve
+        None no resultado e a imagem vai para o pool como sempre.
+        """
+        if self.cache is None:
+            return None, None
+        try:
+            caminho = os.path.join(self.pasta, fname)
+            origem = sha256_arquivo(caminho)
+            memo = self.cache.consultar_pos(origem, self._parametros)
+            if memo is None:
+                return origem, None
+            base = os.path.splitext(fname)[0]
+            resultado = {"arquivo": None, "formato": memo["formato"], "acao": "invalida", "dhash": memo["dhash"],
+                         "sha": memo["sha"], "bytes_antes": memo["bytes_antes"], "bytes_depois": memo["bytes_depois"],
+                         "derivadas": 0}
+            if memo["extensao"] is None:
+                os.unlink(caminho)
+                return origem, resultado
+            final = base + memo["extensao"]
+            self.cache.materializar(memo["objeto"], os.path.join(self.pasta, final))
+            if final != fname:
+                os.unlink(caminho)
+            for nome, sha in memo["derivadas"].items():
+                self.cache.materializar(sha, os.path.join(self.pasta, "derivadas", nome, base + ".jpg"))
+            resultado.update(arquivo=final, acao="reaproveitada")
+            return origem, resultado
+        except Exception:
+            return None, None
+
+    def _memorizar(self, origem, resultado):
+        """Guarda saída e derivadas de `resultado` no cache, chaveadas pela origem."""
+        if self.cache is None or origem is None:
+            return
+        try:
+            memo = {k: resultado[k] for k in ("formato", "dhash", "sha", "bytes_antes", "bytes_depois")}
+            memo.update(extensao=None, objeto=None, derivadas={})
+            if resultado["arquivo"]:
+                base, extensao = os.path.splitext(resultado["arquivo"])
+                derivadas = {nome: os.path.join(self.pasta, "derivadas", nome, base + ".jpg") for nome in self.derivados}
+                if not all(os.path.exists(c) for c in derivadas.values()):
+                    # Sem Pillow não há derivadas: nada a reaproveitar além do que já é barato
+                    return
+                memo.update(extensao=extensao,
+                            objeto=self.cache.guardar_arquivo(os.path.join(self.pasta, resultado["arquivo"])),
+                            derivadas={nome: self.cache.guardar_arquivo(c) for nome, c in derivadas.items()})
+            self.cache.registrar_pos(origem, self._parametros, memo)
+        except Exception:
+            pass
+
+    def _galeria(self, resultados):
+        """Arquivos finais da galeria, sem as quase duplicatas (mantém a primeira ocorrência)."""
+        mantidos, vistos = [], []
+        for r in resultados:
+            if r["acao"]:
+                self._contar(r["acao"])
+            if not r["arquivo"]:
+                continue
+            duplicata = any(
+                (r["dhash"] is not None and d is not None and distancia(r["dhash"], d) <= self.limiar_dhash)
+                or (r["sha"] is not None and r["sha"] == s)
+                for d, s in vistos
+            )
+            if duplicata:
+                self._apagar(r["arquivo"])
+                self._contar("duplicada")
+                continue
+            vistos.append((r["dhash"], r["sha"]))
+            mantidos.append(r["arquivo"])
+            self._contar("bytes_antes", r["bytes_antes"])
+            self._contar("bytes_depois", r["bytes_depois"])
+            self._contar("derivadas", r["derivadas"])
+        return mantidos
+
+    def _apagar(self, fname):
+        for caminho in [os.path.join(self.pasta, fname)] + [
+            os.path.join(self.pasta, "derivadas", nome, os.path.splitext(fname)[0] + ".jpg") for nome in self.derivados
+        ]:
+            if os.path.exists(caminho):
+                os.unlink(caminho)
+
+    def _contar(self, chave, n=1):
+        if not n:
+            return
+        with self._lock:
+            self.estatisticas[chave] += n
+        if self.metricas is not None and not chave.startswith("bytes"):
+            self.metricas.contar("imagens_pos", n, acao=chave)
+
+    def fechar(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,159 @@
+"""Estágio de download de imagens: fila de (url, arquivo) drenada por um pool de threads."""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from koerich.image_cache import baixar_imagem_com_cache
+from koerich.ratelimit import criar_retry
+
+HEADERS_IMAGEM = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'identity',
+    'Referer': 'https://www.spicy.com.br/',
+}
+
+
+def criar_sessao_imagens(pool_conexoes=16, metricas=None):
+    """Sessão própria para imagens, com pool de conexões do tamanho do estágio."""
+    session = requests.Session()
+    session.headers.update(HEADERS_IMAGEM)
+    if metricas is not None:
+        metricas.instrumentar_sessao(session)
+    adapter = HTTPAdapter(
+        pool_connections=pool_conexoes,
+        pool_maxsize=pool_conexoes,
+        max_retries=criar_retry(metricas, total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def baixar_imagem(session, url_img, destino):
+    """Baixa uma imagem para `destino`; True se gravou um arquivo de pelo menos 1 KB."""
+    try:
+        with session.get(url_img, stream=True, timeout=30) as resp:
+            resp.raise_for_status()
+
+            content_type = resp.headers.get('content-type', '')
+            if not content_type.startswith('image/'):
+                return False
+
+            with open(destino, "wb") as f:
+                for chunk in resp.iter_content(8192):
+                    if chunk:
+                        f.write(chunk)
+
+        return os.path.exists(destino) and os.path.getsize(destino) >= 1024
+    except Exception:
+        return False
+
+
+class EstagioImagens:
+    """Pool limitado de threads que drena os downloads de imagens dos produtos.
+
+    A extração só enfileira `(url, arquivo)` com `enviar` e segue para a
+    próxima página; o Future devolvido resolve para os arquivos salvos. No
+    máximo `max_pendentes` downloads ficam na fila; acima disso `enviar`
+    espera, para a memória não crescer se a rede for mais lenta que o parse.
+
+    Com um `CacheImagens` os downloads viram requisições condicionais e
+    imagens idênticas são gravadas uma vez só (hardlinks). Com `metricas`,
+    cada download entra na etapa "imagens_download". Com `pos` (um
+    `PosProcessadorImagens`) os arquivos de cada produto passam por ele antes
+    de o Future resolver, e o resultado são os arquivos finais.
+    """
+
+    def __init__(self, pasta, workers=8, pool_conexoes=None, max_pendentes=None, cache=None, metricas=None,
+                 pos=None):
+        self.pasta = pasta
+        self.cache = cache
+        self.metricas = metricas
+        self.pos = pos
+        self.workers = max(1, int(workers))
+        self.session = criar_sessao_imagens(pool_conexoes or self.workers, metricas)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="imagens")
+        self._vagas = threading.BoundedSemaphore(max_pendentes or self.workers * 8)
+
+    def _baixar(self, url_img, fname):
+        destino = os.path.join(self.pasta, fname)
+        with self.metricas.etapa("imagens_download") if self.metricas is not None else nullcontext():
+            if self.cache is not None:
+                ok = baixar_imagem_com_cache(self.session, self.cache, url_img, destino)
+            else:
+                ok = baixar_imagem(self.session, url_img, destino)
+        if self.metricas is not None:
+            self.metricas.contar("imagens", resultado="ok" if ok else "falha")
+        return ok
+
+    def enviar(self, jobs):
+        """Enfileira os downloads de um produto; o Future devolve os arquivos salvos, em ordem."""
+        jobs = list(jobs)
+        agregado = Future()
+        if not jobs:
+            agregado.set_result([])
+            return agregado
+
+        salvos = [None] * len(jobs)
+        restantes = [len(jobs)]
+        lock = threading.Lock()
+
+        def concluido(i, fname, fut):
+            self._vagas.release()
+            try:
+                if fut.result():
+                    salvos[i] = fname
+            except Exception:
+                pass
+            with lock:
+                restantes[0] -= 1
+                fim = restantes[0] == 0
+            if not fim:
+                return
+            arquivos = [f for f in salvos if f]
+            if self.pos is None:
+                agregado.set_result(arquivos)
+                return
+
+            def pos_concluido(f):
+                # Pós-processamento falhou: ficam os arquivos como vieram (mesma política do image_post)
+                try:
+                    agregado.set_result(f.result())
+                except Exception:
+                    agregado.set_result(arquivos)
+
+            # Erro aqui some no callback do executor e deixaria `agregado` pendente para sempre
+            try:
+                self.pos.enviar(arquivos).add_done_callback(pos_concluido)
+            except Exception:
+                agregado.set_result(arquivos)
+
+        for i, (url_img, fname) in enumerate(jobs):
+            self._vagas.acquire()
+            fut = self._executor.submit(self._baixar, url_img, fname)
+            fut.add_done_callback(lambda f, i=i, fname=fname: concluido(i, fname, f))
+        return agregado
+
+    def baixar(self, jobs):
+        """Versão bloqueante de `enviar`."""
+        return self.enviar(jobs).result()
+
+    def fechar(self):
+        self._executor.shutdown(wait=True)
+        if self.pos is not None:
+            self.pos.fechar()
+        self.session.close()
+        if self.cache is not None:
+            self.cache.fechar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
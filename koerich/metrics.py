@@ -0,0 +1,203 @@
+"""Métricas da execução: tempo por etapa, contadores, bytes, retries e latência por host."""
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+PREFIXO = "koerich"
+QUANTIS = (0.5, 0.9, 0.99)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Serie:
+    """Contagem, soma e máximo exatos; quantis sobre uma amostra de reservatório limitada."""
+    __slots__ = ("contagem", "soma", "maximo", "amostras")
+
+    def __init__(self):
+        self.contagem = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+        self.amostras = []
+
+    def adicionar(self, valor, limite, rng):
+        self.contagem += 1
+        self.soma += valor
+        self.maximo = max(self.maximo, valor)
+        if len(self.amostras) < limite:
+            self.amostras.append(valor)
+        else:
+            i = rng.randrange(self.contagem)
+            if i < limite:
+                self.amostras[i] = valor
+
+    def quantil(self, q):
+        if not self.amostras:
+            return 0.0
+        ordenadas = sorted(self.amostras)
+        return ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))]
+
+    def resumo(self):
+        return {
+            "contagem": self.contagem,
+            "soma_s": round(self.soma, 6),
+            "media_ms": round(self.soma / self.contagem * 1000, 3) if self.contagem else 0.0,
+            "max_ms": round(self.maximo * 1000, 3),
+            **{f"p{int(q * 100)}_ms": round(self.quantil(q) * 1000, 3) for q in QUANTIS},
+        }
+
+
+class Metricas:
+    """Registro thread-safe de tempos (`etapa`), contadores (`contar`) e latência por host.
+
+    Processos filhos (modo pipeline) registram no próprio `Metricas` e
+    devolvem `extrair()` junto com o resultado; o processo principal chama
+    `mesclar` com ele.
+    """
+
+    def __init__(self, max_amostras=4096):
+        self.max_amostras = max_amostras
+        self.inicio = time.time()
+        self._etapas = {}
+        self._hosts = {}
+        self._contadores = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar_tempo(nome, time.perf_counter() - inicio)
+
+    def registrar_tempo(self, nome, segundos):
+        with self._lock:
+            self._etapas.setdefault(nome, _Serie()).adicionar(segundos, self.max_amostras, self._rng)
+
+    def latencia(self, host, segundos):
+        with self._lock:
+            self._hosts.setdefault(host, _Serie()).adicionar(segundos, self.max_amostras, self._rng)
+
+    def contar(self, nome, n=1, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + n
+
+    def gancho_resposta(self, resp, *args, **kwargs):
+        """Hook de `requests`: status, latência até os headers e bytes (Content-Length) por host."""
+        host = urlsplit(resp.url).netloc
+        self.latencia(host, resp.elapsed.total_seconds())
+        self.contar("http_respostas", host=host, status=resp.status_code)
+        tamanho = resp.headers.get("Content-Length")
+        if tamanho and tamanho.isdigit():
+            self.contar("bytes_recebidos", int(tamanho), host=host)
+        return resp
+
+    def instrumentar_sessao(self, session):
+        session.hooks.setdefault("response", []).append(self.gancho_resposta)
+        return session
+
+    def extrair(self):
+        """Copia e zera o que foi registrado (para mandar de um processo filho ao principal)."""
+        with self._lock:
+            dados = {"etapas": self._etapas, "hosts": self._hosts, "contadores": self._contadores}
+            self._etapas, self._hosts, self._contadores = {}, {}, {}
+        return dados
+
+    def mesclar(self, dados):
+        with self._lock:
+            for campo, destino in (("etapas", self._etapas), ("hosts", self._hosts)):
+                for nome, serie in dados[campo].items():
+                    atual = destino.setdefault(nome, _Serie())
+                    for v in serie.amostras:
+                        atual.adicionar(v, self.max_amostras, self._rng)
+                    # A amostra pode ser menor que a série: contagem/soma/máximo vêm exatos
+                    atual.contagem += serie.contagem - len(serie.amostras)
+                    atual.soma += serie.soma - sum(serie.amostras)
+                    atual.maximo = max(atual.maximo, serie.maximo)
+            for chave, n in dados["contadores"].items():
+                self._contadores[chave] = self._contadores.get(chave, 0) + n
+
+    def relatorio(self, extra=None):
+        """Dicionário serializável com tudo o que foi registrado (mais `extra`)."""
+        with self._lock:
+            contadores = {}
+            for (nome, rotulos), n in sorted(self._contadores.items(), key=lambda kv: (kv[0][0], str(kv[0][1]))):
+                contadores.setdefault(nome, []).append({**dict(rotulos), "valor": n})
+            dados = {
+                "inicio": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.inicio)),
+                "duracao_s": round(time.time() - self.inicio, 3),
+                "etapas": {nome: s.resumo() for nome, s in sorted(self._etapas.items())},
+                "latencia_por_host": {host: s.resumo() for host, s in sorted(self._hosts.items())},
+                "contadores": contadores,
+            }
+        if extra:
+            dados.update(extra)
+        return dados
+
+    def salvar_json(self, caminho, extra=None):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.relatorio(extra), f, ensure_ascii=False, indent=2)
+
+    def prometheus(self):
+        """Texto no formato de exposição do Prometheus."""
+        def rotulos(**kv):
+            return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in kv.items()) + "}"
+
+        linhas = []
+        with self._lock:
+            for metrica, rotulo, series in (("etapa_segundos", "etapa", self._etapas),
+                                            ("host_latencia_segundos", "host", self._hosts)):
+                linhas.append(f"# TYPE {PREFIXO}_{metrica} summary")
+                for nome, s in sorted(series.items()):
+                    for q in QUANTIS:
+                        linhas.append(f"{PREFIXO}_{metrica}{rotulos(**{rotulo: nome, 'quantile': q})} {s.quantil(q):.6f}")
+                    linhas.append(f"{PREFIXO}_{metrica}_sum{rotulos(**{rotulo: nome})} {s.soma:.6f}")
+                    linhas.append(f"{PREFIXO}_{metrica}_count{rotulos(**{rotulo: nome})} {s.contagem}")
+            vistos = set()
+            for (nome, rot), n in sorted(self._contadores.items(), key=lambda kv: (kv[0][0], str(kv[0][1]))):
+                if nome not in vistos:
+                    linhas.append(f"# TYPE {PREFIXO}_{nome}_total counter")
+                    vistos.add(nome)
+                linhas.append(f"{PREFIXO}_{nome}_total{rotulos(**dict(rot)) if rot else ''} {n}")
+        return "\n".join(linhas) + "\n"
+
+    def salvar_prometheus(self, caminho):
+        """Grava para o textfile collector do node_exporter (troca atômica)."""
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(caminho + ".tmp", caminho)
+
+    def servir_prometheus(self, porta, endereco="127.0.0.1"):
+        """Expõe `/metrics` num thread daemon; devolve o servidor (use `shutdown()` para parar).
+
+        Só localhost por padrão; outro `endereco` (ex.: "0.0.0.0") expõe as métricas à rede.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metricas = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                corpo = metricas.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer((endereco, porta), Handler)
+        threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+        return servidor
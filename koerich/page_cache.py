@@ -0,0 +1,139 @@
+"""Cache em disco das PDPs buscadas (GET simples e Playwright), com TTL e despejo LRU."""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+PARAMS_RASTREAMENTO = ("utm_", "gclid", "fbclid", "gad_source", "srsltid")
+
+
+def normalizar_url(url):
+    """Chave canônica: esquema/host minúsculos, sem fragmento, porta padrão,
+    parâmetros de rastreamento nem barra final; query ordenada."""
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+    host = (partes.hostname or "").lower()
+    if partes.port and not ((esquema == "http" and partes.port == 80) or (esquema == "https" and partes.port == 443)):
+        host = f"{host}:{partes.port}"
+    caminho = partes.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True)
+        if not k.lower().startswith(PARAMS_RASTREAMENTO)
+    )
+    return urlunsplit((esquema, host, caminho, urlencode(query), ""))
+
+
+class PaginaForaDoCache(LookupError):
+    """Modo replay pediu uma página que não está no cache."""
+
+
+class CachePaginas:
+    """HTML comprimido (zlib) + metadados do fetch, por URL normalizada e camada.
+
+    `camada` separa o HTML do GET simples ("estatico") do DOM renderizado
+    ("render"). Entradas mais velhas que `ttl_s` não são servidas (exceto com
+    `ignorar_ttl`, usado no replay). Quando o total comprimido passa de
+    `max_bytes`, as entradas menos acessadas recentemente são apagadas.
+    """
+
+    def __init__(self, diretorio, ttl_s=6 * 3600, max_bytes=2 * 1024 ** 3):
+        os.makedirs(diretorio, exist_ok=True)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.estatisticas = Counter()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(diretorio, "paginas.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS paginas (
+                chave TEXT NOT NULL,
+                camada TEXT NOT NULL,
+                url TEXT NOT NULL,
+                html BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                status INTEGER,
+                content_type TEXT,
+                buscado_em REAL NOT NULL,
+                acessado_em REAL NOT NULL,
+                PRIMARY KEY (chave, camada)
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_paginas_acesso ON paginas (acessado_em)")
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(tamanho), 0) FROM paginas").fetchone()[0]
+
+    def obter(self, url, camada, ignorar_ttl=False):
+        """HTML da página ou None se ausente/expirada."""
+        chave = normalizar_url(url)
+        agora = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT html, buscado_em FROM paginas WHERE chave = ? AND camada = ?", (chave, camada)
+            ).fetchone()
+            if not row or (not ignorar_ttl and self.ttl_s and agora - row[1] > self.ttl_s):
+                self.estatisticas["misses"] += 1
+                return None
+            self._db.execute(
+                "UPDATE paginas SET acessado_em = ? WHERE chave = ? AND camada = ?", (agora, chave, camada)
+            )
+            self._db.commit()
+            self.estatisticas["hits"] += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def gravar(self, url, camada, html, status=200, content_type=None):
+        chave = normalizar_url(url)
+        dados = zlib.compress(html.encode("utf-8"), 6)
+        agora = time.time()
+        with self._lock:
+            antigo = self._db.execute(
+                "SELECT tamanho FROM paginas WHERE chave = ? AND camada = ?", (chave, camada)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO paginas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (chave, camada, url, dados, len(dados), status, content_type, agora, agora),
+            )
+            self._total += len(dados) - (antigo[0] if antigo else 0)
+            self.estatisticas["gravacoes"] += 1
+            if self.max_bytes and self._total > self.max_bytes:
+                self._despejar()
+            self._db.commit()
+
+    def _despejar(self):
+        """Apaga as entradas menos usadas até ficar em 90% de `max_bytes`."""
+        alvo = int(self.max_bytes * 0.9)
+        cursor = self._db.execute("SELECT chave, camada, tamanho FROM paginas ORDER BY acessado_em ASC")
+        remover = []
+        for chave, camada, tamanho in cursor:
+            if self._total <= alvo:
+                break
+            remover.append((chave, camada))
+            self._total -= tamanho
+        self._db.executemany("DELETE FROM paginas WHERE chave = ? AND camada = ?", remover)
+        self.estatisticas["despejos"] += len(remover)
+
+    def entradas(self, camada=None, lote=100):
+        """Itera (url, camada, html) de todas as páginas guardadas, sem tocar no LRU.
+
+        Lê `lote` linhas por vez (keyset por rowid, lock só durante cada
+        consulta): o cache inteiro nunca fica na memória.
+        """
+        filtro, params = ("AND camada = ?", (camada,)) if camada else ("", ())
+        ultimo = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT rowid, url, camada, html FROM paginas WHERE rowid > ? {filtro} ORDER BY rowid LIMIT ?",
+                    (ultimo, *params, lote),
+                ).fetchall()
+            if not rows:
+                return
+            ultimo = rows[-1][0]
+            for _, url, cam, dados in rows:
+                yield url, cam, zlib.decompress(dados).decode("utf-8")
+
+    def fechar(self):
+        with self._lock:
+            self._db.close()
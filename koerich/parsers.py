@@ -0,0 +1,125 @@
+"""Backends de parse HTML atrás da mesma interface mínima usada pelos extratores.
+
+Os extratores só usam `select`, `select_one`, `texto`, `attr` e `conteudo`;
+cada backend embrulha seus nós nessa interface:
+
+- `html.parser`: BeautifulSoup com o parser puro-Python (o mais lento)
+- `lxml`: BeautifulSoup com lxml (mesma árvore, parse bem mais rápido)
+- `selectolax`: Lexbor via selectolax, sem BeautifulSoup (o mais rápido)
+
+As bibliotecas só são importadas no primeiro parse com o backend: processos
+que não parseiam (ou usam só o selectolax) não pagam o import do BeautifulSoup.
+"""
+from importlib.util import find_spec
+
+BACKENDS = ("html.parser", "lxml", "selectolax")
+
+# Conteúdo que o get_text do BeautifulSoup não considera texto da página
+TAGS_SEM_TEXTO = ("script", "style", "template")
+
+
+class NoBS:
+    """Nó BeautifulSoup (backends `html.parser` e `lxml`)."""
+    __slots__ = ("_tag",)
+
+    def __init__(self, tag):
+        self._tag = tag
+
+    def select(self, css):
+        return [NoBS(t) for t in self._tag.select(css)]
+
+    def select_one(self, css):
+        t = self._tag.select_one(css)
+        return NoBS(t) if t is not None else None
+
+    def texto(self, sep="", strip=False):
+        return self._tag.get_text(sep, strip=strip)
+
+    def attr(self, nome, padrao=None):
+        v = self._tag.get(nome, padrao)
+        return " ".join(v) if isinstance(v, list) else v
+
+    @property
+    def conteudo(self):
+        """Conteúdo bruto do elemento (ex.: o JSON dentro de um <script>)."""
+        return self._tag.string
+
+
+class NoSelectolax:
+    """Nó selectolax/Lexbor."""
+    __slots__ = ("_no",)
+
+    def __init__(self, no):
+        self._no = no
+
+    def select(self, css):
+        return [NoSelectolax(n) for n in self._no.css(css)]
+
+    def select_one(self, css):
+        n = self._no.css_first(css)
+        return NoSelectolax(n) if n is not None else None
+
+    def texto(self, sep="", strip=False):
+        # Mesmo critério do BeautifulSoup: ignora o conteúdo de <script>/<style>
+        partes = []
+        for n in self._no.traverse(include_text=True):
+            if n.tag != "-text" or (n.parent is not None and n.parent.tag in TAGS_SEM_TEXTO):
+                continue
+            t = n.text(deep=False)
+            if strip:
+                t = t.strip()
+                if not t:
+                    continue
+            partes.append(t)
+        return sep.join(partes)
+
+    def attr(self, nome, padrao=None):
+        v = self._no.attributes.get(nome)
+        return padrao if v is None else v
+
+    @property
+    def conteudo(self):
+        return self._no.text(deep=True)
+
+
+def _instalado(modulo):
+    try:
+        return find_spec(modulo) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def backend_padrao():
+    """O backend mais rápido entre os do requirements.txt que estiverem instalados."""
+    return "lxml" if _instalado("lxml") else "html.parser"
+
+
+def criar_arvore(html, backend=None):
+    """Parseia `html` com o backend pedido e devolve o nó raiz."""
+    backend = backend or backend_padrao()
+    if backend in ("html.parser", "lxml"):
+        try:
+            from bs4 import BeautifulSoup
+        except Exception:
+            raise RuntimeError("beautifulsoup4 não está disponível")
+        if backend == "lxml" and not _instalado("lxml"):
+            raise RuntimeError("lxml não está disponível (pip install lxml)")
+        return NoBS(BeautifulSoup(html, backend))
+    if backend == "selectolax":
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except Exception:
+            raise RuntimeError("selectolax não está disponível (pip install selectolax)")
+        return NoSelectolax(LexborHTMLParser(html).root)
+    raise ValueError(f"Backend de parse desconhecido: {backend} (opções: {', '.join(BACKENDS)})")
+
+
+def backends_disponiveis():
+    disponiveis = []
+    for backend in BACKENDS:
+        try:
+            criar_arvore("<html></html>", backend)
+        except Exception:
+            continue
+        disponiveis.append(backend)
+    return disponiveis
@@ -0,0 +1,85 @@
+"""Pipeline com fetch em threads e parse em processos (o parse é CPU e disputa o GIL)."""
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+_FIM = object()
+
+
+class PipelineProcessos:
+    """Busca PDPs em `workers_fetch` threads e parseia em `workers_parse` processos.
+
+    - `buscar(url, fase)` roda nos threads e devolve `(html, ultima)`. A fase
+      começa em 0; se `ultima` for False, o parse pode recusar a página e ela
+      volta para `buscar(url, fase + 1)` (ex.: GET simples → navegador).
+    - `analisar(html, url, ultima)` roda num processo do pool, precisa ser
+      picklável (função de módulo ou `functools.partial` dela) e devolve o
+      resultado, ou None para pedir a próxima fase.
+
+    No máximo `max_em_voo` URLs ficam entre fetch e parse ao mesmo tempo, então
+    o HTML bruto em memória é limitado mesmo que o parse fique para trás.
+    """
+
+    def __init__(self, buscar, analisar, workers_fetch=8, workers_parse=None, max_em_voo=None):
+        self.buscar = buscar
+        self.analisar = analisar
+        self.workers_fetch = max(1, int(workers_fetch))
+        self.workers_parse = max(1, int(workers_parse or os.cpu_count() or 1))
+        self.max_em_voo = max_em_voo or (self.workers_fetch + self.workers_parse) * 2
+
+    def executar(self, urls):
+        """Gera `(indice, url, resultado, erro)` à medida que cada URL termina."""
+        resultados = queue.Queue()
+        vagas = threading.BoundedSemaphore(self.max_em_voo)
+        # spawn: os processos não herdam locks dos threads de fetch/imagens já em uso
+        contexto = multiprocessing.get_context("spawn")
+
+        with ThreadPoolExecutor(self.workers_fetch, thread_name_prefix="fetch") as threads, \
+                ProcessPoolExecutor(self.workers_parse, mp_context=contexto) as processos:
+
+            def entregar(i, url, resultado, erro):
+                resultados.put((i, url, resultado, erro))
+                vagas.release()
+
+            def buscar(i, url, fase):
+                try:
+                    html, ultima = self.buscar(url, fase)
+                    futuro = processos.submit(self.analisar, html, url, ultima)
+                except Exception as e:
+                    entregar(i, url, None, e)
+                    return
+                futuro.add_done_callback(lambda f: analisado(i, url, fase, ultima, f))
+
+            def analisado(i, url, fase, ultima, futuro):
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    entregar(i, url, None, e)
+                    return
+                if resultado is None and not ultima:
+                    threads.submit(buscar, i, url, fase + 1)
+                else:
+                    entregar(i, url, resultado, None)
+
+            def produtor():
+                total = 0
+                try:
+                    for i, url in enumerate(urls):
+                        vagas.acquire()
+                        threads.submit(buscar, i, url, 0)
+                        total += 1
+                finally:
+                    resultados.put((_FIM, total))
+
+            threading.Thread(target=produtor, name="pipeline-produtor", daemon=True).start()
+
+            total, recebidos = None, 0
+            while total is None or recebidos < total:
+                item = resultados.get()
+                if item[0] is _FIM:
+                    total = item[1]
+                    continue
+                recebidos += 1
+                yield item
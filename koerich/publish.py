@@ -0,0 +1,317 @@
+"""Publicação incremental das imagens: manifesto de hashes publicados e destinos git, S3 ou pasta."""
+import hashlib
+import mimetypes
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import boto3
+except Exception:
+    boto3 = None
+
+EXTENSOES_IMAGEM = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def sha256_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class ManifestoPublicacao:
+    """O que já foi publicado em cada destino (arquivo → SHA-256), em SQLite.
+
+    Guarda também (mtime, tamanho, sha) de cada arquivo local, como o índice
+    do git: só arquivos cujo stat mudou são lidos de novo para o hash.
+    """
+
+    def __init__(self, caminho):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(caminho, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS locais (
+                caminho TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                tamanho INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            )"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS publicados (
+                destino TEXT NOT NULL,
+                arquivo TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                publicado_em REAL NOT NULL,
+                PRIMARY KEY (destino, arquivo)
+            )"""
+        )
+        self._db.commit()
+
+    def hash_local(self, caminho, stat=None):
+        """SHA-256 de `caminho`, reaproveitado enquanto mtime e tamanho não mudarem."""
+        stat = stat or os.stat(caminho)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT mtime_ns, tamanho, sha256 FROM locais WHERE caminho = ?", (caminho,)
+            ).fetchone()
+        if row and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            return row[2]
+        sha = sha256_arquivo(caminho)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO locais VALUES (?, ?, ?, ?)",
+                             (caminho, stat.st_mtime_ns, stat.st_size, sha))
+        return sha
+
+    def publicados(self, destino):
+        with self._lock:
+            return dict(self._db.execute("SELECT arquivo, sha256 FROM publicados WHERE destino = ?", (destino,)))
+
+    def marcar(self, destino, itens):
+        """Registra `(arquivo, sha)` como publicados; sha None remove o arquivo do manifesto."""
+        agora = time.time()
+        with self._lock:
+            for arquivo, sha in itens:
+                if sha is None:
+                    self._db.execute("DELETE FROM publicados WHERE destino = ? AND arquivo = ?", (destino, arquivo))
+                else:
+                    self._db.execute("INSERT OR REPLACE INTO publicados VALUES (?, ?, ?, ?)",
+                                     (destino, arquivo, sha, agora))
+            self._db.commit()
+
+    def salvar(self):
+        with self._lock:
+            self._db.commit()
+
+    def fechar(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+
+def listar_imagens(pasta, extensoes=EXTENSOES_IMAGEM):
+    """(arquivo relativo com '/', os.stat_result) de cada imagem sob `pasta`, derivadas inclusive."""
+    pilha = [pasta]
+    while pilha:
+        atual = pilha.pop()
+        with os.scandir(atual) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    pilha.append(entrada.path)
+                elif entrada.name.lower().endswith(extensoes):
+                    yield os.path.relpath(entrada.path, pasta).replace(os.sep, "/"), entrada.stat()
+
+
+def planejar(pasta, manifesto, destino):
+    """(enviar, remover): arquivos novos/alterados como (arquivo, sha) e publicados que sumiram da pasta."""
+    publicados = manifesto.publicados(destino)
+    enviar, locais = [], set()
+    for arquivo, stat in listar_imagens(pasta):
+        locais.add(arquivo)
+        sha = manifesto.hash_local(os.path.join(pasta, arquivo), stat)
+        if publicados.get(arquivo) != sha:
+            enviar.append((arquivo, sha))
+    manifesto.salvar()
+    remover = sorted(set(publicados) - locais)
+    return sorted(enviar), remover
+
+
+def publicar(pasta, destino, manifesto, tamanho_lote=500, remover_ausentes=False, simular=False):
+    """Publica só o que mudou desde o manifesto, em lotes; cada lote concluído é marcado na hora.
+
+    Se a execução cair no meio, a próxima retoma do primeiro lote não marcado.
+    """
+    enviar, remover = planejar(pasta, manifesto, destino.identificador)
+    stats = Counter(novos=len(enviar), ausentes=len(remover))
+    if simular or not (enviar or (remover_ausentes and remover)):
+        return stats
+    destino.preparar()
+    try:
+        lotes = [enviar[i:i + tamanho_lote] for i in range(0, len(enviar), tamanho_lote)]
+        for n, lote in enumerate(lotes, 1):
+            destino.enviar([(os.path.join(pasta, arquivo), arquivo) for arquivo, _ in lote])
+            destino.concluir(f"Publica {len(lote)} imagens (lote {n}/{len(lotes)})")
+            manifesto.marcar(destino.identificador, lote)
+            stats["enviados"] += len(lote)
+            stats["bytes"] += sum(os.path.getsize(os.path.join(pasta, arquivo)) for arquivo, _ in lote)
+            print(f"📤 Lote {n}/{len(lotes)}: {len(lote)} imagens")
+        if remover_ausentes and remover:
+            for i in range(0, len(remover), tamanho_lote):
+                lote = remover[i:i + tamanho_lote]
+                destino.remover(lote)
+                destino.concluir(f"Remove {len(lote)} imagens")
+                manifesto.marcar(destino.identificador, [(arquivo, None) for arquivo in lote])
+                stats["removidos"] += len(lote)
+    finally:
+        destino.fechar()
+    return stats
+
+
+class DestinoPasta:
+    """Destino num diretório com a semântica de um object store (chave → arquivo, troca atômica).
+
+    Serve de dublê local do S3 para testar a publicação, ou para publicar num
+    volume montado.
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = os.path.abspath(diretorio)
+        self.identificador = f"pasta:{self.diretorio}"
+
+    def preparar(self):
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def enviar(self, itens):
+        for origem, chave in itens:
+            destino = os.path.join(self.diretorio, *chave.split("/"))
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            tmp = f"{destino}.{os.getpid()}.tmp"
+            shutil.copyfile(origem, tmp)
+            os.replace(tmp, destino)
+
+    def remover(self, chaves):
+        for chave in chaves:
+            caminho = os.path.join(self.diretorio, *chave.split("/"))
+            if os.path.exists(caminho):
+                os.unlink(caminho)
+
+    def concluir(self, mensagem):
+        pass
+
+    def fechar(self):
+        pass
+
+
+class DestinoS3:
+    """Bucket S3 (ou compatível: MinIO, R2, LocalStack via `endpoint_url`), uploads em paralelo."""
+
+    def __init__(self, bucket, prefixo="", endpoint_url=None, workers=8, cache_control="public, max-age=86400"):
+        if boto3 is None:
+            raise RuntimeError("boto3 não está disponível (pip install boto3)")
+        self.bucket = bucket
+        self.prefixo = prefixo.strip("/")
+        self.endpoint_url = endpoint_url
+        self.workers = workers
+        self.cache_control = cache_control
+        self.identificador = f"s3:{endpoint_url or 'aws'}/{bucket}/{self.prefixo}"
+        self._cliente = None
+
+    def _chave(self, arquivo):
+        return f"{self.prefixo}/{arquivo}" if self.prefixo else arquivo
+
+    def preparar(self):
+        self._cliente = boto3.client("s3", endpoint_url=self.endpoint_url)
+
+    def _enviar_um(self, item):
+        origem, arquivo = item
+        tipo = mimetypes.guess_type(arquivo)[0] or "application/octet-stream"
+        self._cliente.upload_file(origem, self.bucket, self._chave(arquivo),
+                                  ExtraArgs={"ContentType": tipo, "CacheControl": self.cache_control})
+
+    def enviar(self, itens):
+        with ThreadPoolExecutor(self.workers) as executor:
+            list(executor.map(self._enviar_um, itens))
+
+    def remover(self, arquivos):
+        # delete_objects aceita até 1000 chaves por chamada
+        for i in range(0, len(arquivos), 1000):
+            self._cliente.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": self._chave(a)} for a in arquivos[i:i + 1000]], "Quiet": True},
+            )
+
+    def concluir(self, mensagem):
+        pass
+
+    def fechar(self):
+        self._cliente = None
+
+
+class DestinoGit:
+    """Repositório git de imagens com uma cópia de trabalho persistente, rasa e esparsa.
+
+    A cópia (`copia`) é criada uma vez com `--depth 1` e `--filter=blob:none`
+    e o sparse-checkout não materializa nenhum arquivo do repositório: cada
+    publicação só busca o último commit, copia os arquivos do lote, faz um
+    commit por lote e push. O custo não depende do tamanho do histórico nem
+    do catálogo já publicado.
+    """
+
+    # Padrão sem correspondência: a cópia de trabalho fica vazia
+    PADRAO_ESPARSO = "/.publicacao-vazia"
+
+    def __init__(self, repo_url, copia, branch="main", subpasta="", autor=None):
+        self.repo_url = repo_url
+        self.copia = os.path.abspath(copia)
+        self.branch = branch
+        self.subpasta = subpasta.strip("/")
+        self.autor = autor
+        self.identificador = f"git:{repo_url}#{branch}/{self.subpasta}"
+        self._pendentes = []
+
+    def _git(self, *args, verificar=True):
+        return subprocess.run(["git", "-C", self.copia, *args], check=verificar, capture_output=True, text=True)
+
+    def _caminho(self, arquivo):
+        return f"{self.subpasta}/{arquivo}" if self.subpasta else arquivo
+
+    def preparar(self):
+        if not os.path.isdir(os.path.join(self.copia, ".git")):
+            os.makedirs(self.copia, exist_ok=True)
+            self._git("init", "-q")
+            self._git("remote", "add", "origin", self.repo_url)
+            self._git("sparse-checkout", "set", "--no-cone", self.PADRAO_ESPARSO)
+            if self.autor:
+                nome, _, email = self.autor.partition("<")
+                self._git("config", "user.name", nome.strip())
+                self._git("config", "user.email", email.rstrip(">").strip())
+        busca = self._git("fetch", "-q", "--depth", "1", "--filter=blob:none", "origin", self.branch, verificar=False)
+        if busca.returncode == 0:
+            self._git("checkout", "-q", "-B", self.branch, "FETCH_HEAD")
+            self._git("reset", "-q", "--hard", "FETCH_HEAD")
+        else:
+            # Repositório vazio ou branch nova: o primeiro lote cria o branch
+            self._git("checkout", "-q", "--orphan", self.branch, verificar=False)
+
+    def enviar(self, itens):
+        for origem, arquivo in itens:
+            destino = os.path.join(self.copia, *self._caminho(arquivo).split("/"))
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            shutil.copyfile(origem, destino)
+            self._pendentes.append(self._caminho(arquivo))
+
+    def remover(self, arquivos):
+        caminhos = [self._caminho(a) for a in arquivos]
+        self._git("rm", "-q", "--cached", "--sparse", "--ignore-unmatch", "--", *caminhos)
+
+    def concluir(self, mensagem):
+        if self._pendentes:
+            self._git("add", "--sparse", "-f", "--", *self._pendentes)
+        if self._git("diff", "--cached", "--quiet", verificar=False).returncode == 0:
+            self._limpar()
+            return
+        self._git("commit", "-q", "-m", mensagem)
+        self._git("push", "-q", "origin", f"HEAD:refs/heads/{self.branch}")
+        self._limpar()
+
+    def _limpar(self):
+        """Tira os arquivos do lote do disco: o sparse-checkout não os mantém materializados."""
+        if os.path.isdir(os.path.join(self.copia, ".git")):
+            self._git("sparse-checkout", "reapply", verificar=False)
+        for caminho in self._pendentes:
+            local = os.path.join(self.copia, *caminho.split("/"))
+            if os.path.exists(local):
+                os.unlink(local)
+        self._pendentes = []
+
+    def fechar(self):
+        self._limpar()
@@ -0,0 +1,325 @@
+"""Limitadores de taxa compartilhados entre o loop síncrono e o crawler assíncrono."""
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Intervalo de nova tentativa quando a janela de concorrência do host está cheia
+ESPERA_VAGA = 0.02
+
+
+class TokenBucket:
+    """Token bucket: `taxa` requisições por segundo com rajadas de até `capacidade`.
+
+    Thread-safe; `adquirir` bloqueia o thread e `adquirir_async` só suspende a
+    corrotina. Com `taxa <= 0` o limitador fica desligado.
+    """
+
+    def __init__(self, taxa, capacidade=None):
+        self.taxa = float(taxa or 0)
+        self.capacidade = float(capacidade or max(1.0, self.taxa))
+        self._tokens = self.capacidade
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reservar(self):
+        """Consome um token e devolve quantos segundos faltam até ele existir."""
+        if self.taxa <= 0:
+            return 0.0
+        with self._lock:
+            agora = time.monotonic()
+            self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.taxa
+
+    def ajustar(self, taxa):
+        with self._lock:
+            self.taxa = float(taxa or 0)
+            self.capacidade = max(1.0, self.taxa)
+            self._tokens = min(self._tokens, self.capacidade)
+
+    def adquirir(self):
+        espera = self._reservar()
+        if espera > 0:
+            time.sleep(espera)
+
+    async def adquirir_async(self):
+        espera = self._reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+def segundos_retry_after(valor):
+    """Segundos pedidos por um header `Retry-After` (número ou data HTTP); None se ausente/inválido."""
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Host:
+    """Estado do limitador para um host."""
+    __slots__ = ("bucket", "janela", "em_voo", "latencia", "latencia_base", "pausa_ate", "ultimo_corte",
+                 "falhas", "circuito", "aberto_ate", "pausa_circuito", "sonda")
+
+    def __init__(self, taxa, janela, pausa_circuito):
+        self.bucket = TokenBucket(taxa)
+        self.janela = float(janela)
+        self.em_voo = 0
+        self.latencia = None
+        self.latencia_base = None
+        self.pausa_ate = 0.0
+        self.ultimo_corte = 0.0
+        self.falhas = 0
+        self.circuito = "fechado"
+        self.aberto_ate = 0.0
+        self.pausa_circuito = pausa_circuito
+        self.sonda = False
+
+
+class LimitadorAdaptativo:
+    """Taxa e concorrência por host ajustadas pelas respostas (AIMD), com Retry-After e circuit breaker.
+
+    - Aumento aditivo: cada resposta boa soma `aumento / taxa` à taxa (cerca
+      de `aumento` req/s a mais por segundo) e `1 / janela` à janela de
+      requisições simultâneas, até `taxa_max` e `concorrencia_max`
+    - Corte multiplicativo: 429, 5xx e erros de rede multiplicam taxa e janela
+      por `fator_corte`; latência média acima de `fator_latencia` vezes a de
+      base corta por `fator_corte_latencia`. No máximo um corte por
+      `intervalo_corte` s, para uma rajada de erros não zerar o host
+    - `Retry-After` pausa o host inteiro (todos os threads/corrotinas)
+    - `limiar_falhas` falhas seguidas abrem o circuito por `pausa_circuito` s
+      (dobrando a cada reabertura, até `pausa_circuito_max`); depois uma única
+      requisição de sonda decide se ele fecha
+
+    Com `adaptativo=False` taxa e janela ficam fixas (`taxa_inicial`,
+    `concorrencia_max`), mas Retry-After e o circuito continuam valendo. Com
+    `taxa_inicial <= 0` só a concorrência é limitada. Os parâmetros podem ser
+    trocados enquanto nenhum host foi usado.
+    """
+
+    def __init__(self, taxa_inicial=2.0, taxa_min=0.2, taxa_max=20.0, concorrencia_max=8, concorrencia_inicial=2,
+                 adaptativo=True, aumento=1.0, fator_corte=0.5, fator_corte_latencia=0.8, fator_latencia=2.0,
+                 intervalo_corte=1.0, limiar_falhas=5, pausa_circuito=30.0, pausa_circuito_max=300.0, metricas=None):
+        self.taxa_inicial = taxa_inicial
+        self.taxa_min = taxa_min
+        self.taxa_max = taxa_max
+        self.concorrencia_max = concorrencia_max
+        self.concorrencia_inicial = concorrencia_inicial
+        self.adaptativo = adaptativo
+        self.aumento = aumento
+        self.fator_corte = fator_corte
+        self.fator_corte_latencia = fator_corte_latencia
+        self.fator_latencia = fator_latencia
+        self.intervalo_corte = intervalo_corte
+        self.limiar_falhas = limiar_falhas
+        self.pausa_circuito = pausa_circuito
+        self.pausa_circuito_max = pausa_circuito_max
+        self.metricas = metricas
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _chave(url):
+        return urlsplit(url).hostname or url
+
+    def _host(self, chave):
+        h = self._hosts.get(chave)
+        if h is None:
+            janela = min(self.concorrencia_inicial, self.concorrencia_max) if self.adaptativo else self.concorrencia_max
+            h = self._hosts[chave] = _Host(self.taxa_inicial, max(1, janela), self.pausa_circuito)
+        return h
+
+    def _contar(self, nome, **rotulos):
+        if self.metricas is not None:
+            self.metricas.contar(nome, **rotulos)
+
+    def _tentar(self, chave):
+        """Ocupa uma vaga do host e devolve (0, bucket); ou (segundos a esperar, None)."""
+        agora = time.monotonic()
+        with self._lock:
+            h = self._host(chave)
+            if h.circuito == "aberto":
+                if agora < h.aberto_ate:
+                    return h.aberto_ate - agora, None
+                h.circuito, h.sonda = "meio_aberto", False
+            if agora < h.pausa_ate:
+                return h.pausa_ate - agora, None
+            if h.circuito == "meio_aberto":
+                if h.sonda:
+                    return ESPERA_VAGA, None
+                h.sonda = True
+            elif h.em_voo >= int(h.janela):
+                return ESPERA_VAGA, None
+            h.em_voo += 1
+            return 0.0, h.bucket
+
+    def adquirir(self, url):
+        """Bloqueia até poder mandar uma requisição a `url`; toda chamada pede um `liberar` depois."""
+        chave = self._chave(url)
+        while True:
+            espera, bucket = self._tentar(chave)
+            if bucket is not None:
+                bucket.adquirir()
+                return
+            time.sleep(espera)
+
+    async def adquirir_async(self, url):
+        chave = self._chave(url)
+        while True:
+            espera, bucket = self._tentar(chave)
+            if bucket is not None:
+                await bucket.adquirir_async()
+                return
+            await asyncio.sleep(espera)
+
+    def liberar(self, url, status=None, latencia=None, retry_after=None, erro=False):
+        """Devolve a vaga de `url` e registra o desfecho (sem status nem erro, só devolve)."""
+        chave = self._chave(url)
+        with self._lock:
+            h = self._host(chave)
+            h.em_voo = max(0, h.em_voo - 1)
+            if h.circuito == "meio_aberto":
+                h.sonda = False
+        self.registrar(url, status, latencia, retry_after, erro)
+
+    def registrar(self, url, status=None, latencia=None, retry_after=None, erro=False):
+        """Só o desfecho de uma resposta (ex.: tentativas intermediárias do urllib3)."""
+        chave = self._chave(url)
+        agora = time.monotonic()
+        with self._lock:
+            h = self._host(chave)
+            if retry_after:
+                h.pausa_ate = max(h.pausa_ate, agora + retry_after)
+            if erro or status == 429 or (status is not None and status >= 500):
+                self._falha(chave, h, agora, "erro" if status is None else f"status_{status}")
+            elif status is not None:
+                self._sucesso(chave, h, latencia, agora)
+
+    def _sucesso(self, chave, h, latencia, agora):
+        h.falhas = 0
+        if h.circuito == "meio_aberto":
+            h.circuito, h.pausa_circuito = "fechado", self.pausa_circuito
+            print(f"🔌 Circuito fechado para {chave}")
+        if latencia is not None:
+            h.latencia = latencia if h.latencia is None else 0.8 * h.latencia + 0.2 * latencia
+            # A base segue a menor média vista, mas sobe devagar se o host ficar mais lento de vez
+            h.latencia_base = h.latencia if h.latencia_base is None else min(h.latencia, h.latencia_base * 1.01)
+        if not self.adaptativo:
+            return
+        if h.latencia is not None and h.latencia > h.latencia_base * self.fator_latencia:
+            self._cortar(chave, h, agora, self.fator_corte_latencia, "latencia")
+            return
+        h.janela = min(float(self.concorrencia_max), h.janela + 1 / h.janela)
+        if h.bucket.taxa > 0:
+            h.bucket.ajustar(min(self.taxa_max, h.bucket.taxa + self.aumento / max(1.0, h.bucket.taxa)))
+
+    def _falha(self, chave, h, agora, motivo):
+        h.falhas += 1
+        if self.adaptativo:
+            self._cortar(chave, h, agora, self.fator_corte, motivo)
+        if h.circuito == "meio_aberto" or h.falhas >= self.limiar_falhas:
+            h.circuito, h.aberto_ate, h.falhas = "aberto", agora + h.pausa_circuito, 0
+            print(f"🔌 Circuito aberto para {chave}: pausa de {h.pausa_circuito:.0f}s ({motivo})")
+            h.pausa_circuito = min(self.pausa_circuito_max, h.pausa_circuito * 2)
+            self._contar("circuito_aberto", host=chave)
+
+    def _cortar(self, chave, h, agora, fator, motivo):
+        if agora - h.ultimo_corte < self.intervalo_corte:
+            return
+        h.ultimo_corte = agora
+        h.janela = max(1.0, h.janela * fator)
+        if h.bucket.taxa > 0:
+            h.bucket.ajustar(max(self.taxa_min, h.bucket.taxa * fator))
+        self._contar("limitador_cortes", host=chave, motivo=motivo)
+
+    def resumo(self):
+        """Estado atual por host (para o relatório da execução)."""
+        with self._lock:
+            return {
+                chave: {
+                    "taxa": round(h.bucket.taxa, 2),
+                    "janela": round(h.janela, 2),
+                    "latencia_ms": round(h.latencia * 1000, 1) if h.latencia is not None else None,
+                    "latencia_base_ms": round(h.latencia_base * 1000, 1) if h.latencia_base is not None else None,
+                    "circuito": h.circuito,
+                }
+                for chave, h in sorted(self._hosts.items())
+            }
+
+
+class AdaptadorLimitado(HTTPAdapter):
+    """`HTTPAdapter` do requests que passa cada requisição pelo `LimitadorAdaptativo`.
+
+    As tentativas que o urllib3 refaz por conta própria chegam ao limitador
+    pelo `Retry` de `criar_retry(limitador=...)`.
+    """
+
+    def __init__(self, limitador, **kwargs):
+        self.limitador = limitador
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.limitador.adquirir(request.url)
+        try:
+            resp = super().send(request, **kwargs)
+        except Exception:
+            # O Retry do urllib3 já informou cada tentativa que falhou
+            ja_informado = getattr(self.max_retries, "limitador", None) is self.limitador
+            self.limitador.liberar(request.url, erro=not ja_informado)
+            raise
+        self.limitador.liberar(request.url, resp.status_code, resp.elapsed.total_seconds(),
+                               segundos_retry_after(resp.headers.get("Retry-After")))
+        return resp
+
+
+class RetryContado(Retry):
+    """`Retry` do urllib3 que conta cada nova tentativa em `metricas` (por host e motivo).
+
+    Com `limitador` (um `LimitadorAdaptativo`) cada resposta que leva a uma
+    nova tentativa também é informada a ele, com o Retry-After.
+    """
+
+    metricas = None
+    limitador = None
+
+    def new(self, **kw):
+        novo = super().new(**kw)
+        novo.metricas = self.metricas
+        novo.limitador = self.limitador
+        return novo
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if self.metricas is not None:
+            if response is not None and response.status:
+                motivo = f"status_{response.status}"
+            else:
+                motivo = type(error).__name__ if error else "desconhecido"
+            self.metricas.contar("http_retries", host=getattr(_pool, "host", "") or "", motivo=motivo)
+        if self.limitador is not None and _pool is not None:
+            origem = f"{_pool.scheme}://{_pool.host}/"
+            if response is not None and response.status:
+                self.limitador.registrar(origem, response.status,
+                                         retry_after=segundos_retry_after(response.headers.get("Retry-After")))
+            else:
+                self.limitador.registrar(origem, erro=True)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def criar_retry(metricas=None, limitador=None, **kwargs):
+    retry = RetryContado(**kwargs)
+    retry.metricas = metricas
+    retry.limitador = limitador
+    return retry
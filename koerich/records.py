@@ -0,0 +1,127 @@
+"""Registros compactos de produto/variação, expandidos em linhas VTEX só na gravação."""
+
+# Colunas que não dependem do produto: compartilhadas por todas as linhas
+COLUNAS_FIXAS = {
+    "_AtivarSKUSePossível": "SIM",
+    "_SKUAtivo": "SIM",
+    "_EANSKU": "",
+    "_Altura": "", "_AlturaReal": "",
+    "_Largura": "", "_LarguraReal": "",
+    "_Comprimento": "", "_ComprimentoReal": "",
+    "_Peso": "", "_PesoReal": "",
+    "_UnidadeMedida": "un",
+    "_MultiplicadorUnidade": "1,000000",
+    "_ValorFidelidade": "",
+    "_DataPrevisaoChegada": "",
+    "_CodigoFabricante": "",
+    "_ProdutoAtivo": "SIM",
+    "_MostrarNoSite": "SIM",
+    "_PalavrasChave": "",
+    "_IDFornecedor": "",
+    "_MostrarSemEstoque": "SIM",
+    "_Kit": "",
+    "_PesoCubico": "",
+}
+
+# Ordem das colunas da planilha VTEX
+COLUNAS_VTEX = (
+    "_IDSKU", "_NomeSKU", "_AtivarSKUSePossível", "_SKUAtivo", "_EANSKU",
+    "_Altura", "_AlturaReal", "_Largura", "_LarguraReal", "_Comprimento", "_ComprimentoReal",
+    "_Peso", "_PesoReal", "_UnidadeMedida", "_MultiplicadorUnidade", "_CodigoReferenciaSKU",
+    "_ValorFidelidade", "_DataPrevisaoChegada", "_CodigoFabricante", "_IDProduto", "_NomeProduto",
+    "_BreveDescricaoProduto", "_ProdutoAtivo", "_CodigoReferenciaProduto", "_MostrarNoSite",
+    "_LinkTexto", "_DescricaoProduto", "_DataLancamentoProduto", "_PalavrasChave", "_TituloSite",
+    "_DescricaoMetaTag", "_IDFornecedor", "_MostrarSemEstoque", "_Kit", "_IDDepartamento",
+    "_NomeDepartamento", "_IDCategoria", "_NomeCategoria", "_IDMarca", "_Marca", "_PesoCubico",
+    "_Preço", "_BaseUrlImagens", "_ImagensSalvas", "_ImagensURLs",
+)
+
+TAMANHO_UNICO = "ÚNICO"
+
+
+class Variacao:
+    """Só o que muda entre as linhas de um produto: a variação (voltagem, cor, tamanho)."""
+    __slots__ = ("tamanho",)
+
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+
+    def __eq__(self, outro):
+        return isinstance(outro, Variacao) and self.tamanho == outro.tamanho
+
+    def __repr__(self):
+        return f"Variacao({self.tamanho!r})"
+
+
+class Produto:
+    """Campos comuns de uma PDP guardados uma vez; cada `Variacao` vira uma linha VTEX.
+
+    Iterar devolve as linhas (dicts novos a cada vez, na ordem de
+    `COLUNAS_VTEX`); `len()` é o número de linhas. `imagens_salvas` e
+    `data_lancamento` podem ser ajustados depois da extração.
+    """
+    __slots__ = (
+        "sku", "nome", "descricao", "link_texto", "data_lancamento", "id_departamento", "departamento",
+        "id_categoria", "categoria", "id_marca", "marca", "preco", "base_url_imagens", "imagens",
+        "imagens_salvas", "variacoes",
+    )
+
+    def __init__(self, sku, nome, descricao, link_texto, data_lancamento, id_departamento, departamento,
+                 id_categoria, categoria, id_marca, marca, preco, base_url_imagens, imagens, variacoes,
+                 imagens_salvas=""):
+        self.sku = sku
+        self.nome = nome
+        self.descricao = descricao or ""
+        self.link_texto = link_texto
+        self.data_lancamento = data_lancamento
+        self.id_departamento = id_departamento
+        self.departamento = departamento
+        self.id_categoria = id_categoria
+        self.categoria = categoria
+        self.id_marca = id_marca
+        self.marca = marca
+        self.preco = preco
+        self.base_url_imagens = base_url_imagens
+        self.imagens = tuple(imagens)
+        self.imagens_salvas = imagens_salvas
+        self.variacoes = tuple(v if isinstance(v, Variacao) else Variacao(v) for v in variacoes)
+
+    def __len__(self):
+        return len(self.variacoes)
+
+    def __iter__(self):
+        # dict.update mantém a ordem das chaves já existentes: a de COLUNAS_VTEX
+        modelo = {c: COLUNAS_FIXAS.get(c, "") for c in COLUNAS_VTEX}
+        modelo.update({
+            "_IDProduto": self.sku,
+            "_NomeProduto": self.nome,
+            "_BreveDescricaoProduto": self.descricao[:200],
+            "_CodigoReferenciaProduto": self.sku,
+            "_LinkTexto": self.link_texto,
+            "_DescricaoProduto": self.descricao,
+            "_DataLancamentoProduto": self.data_lancamento,
+            "_TituloSite": self.nome,
+            "_DescricaoMetaTag": self.descricao[:160],
+            "_IDDepartamento": self.id_departamento,
+            "_NomeDepartamento": self.departamento,
+            "_IDCategoria": self.id_categoria,
+            "_NomeCategoria": self.categoria,
+            "_IDMarca": self.id_marca,
+            "_Marca": self.marca,
+            "_Preço": self.preco,
+            "_BaseUrlImagens": self.base_url_imagens,
+            "_ImagensSalvas": self.imagens_salvas,
+            "_ImagensURLs": ";".join(self.imagens),
+        })
+        for variacao in self.variacoes:
+            unico = variacao.tamanho == TAMANHO_UNICO
+            linha = dict(modelo)
+            linha["_IDSKU"] = linha["_CodigoReferenciaSKU"] = self.sku if unico else f"{self.sku}_{variacao.tamanho}"
+            linha["_NomeSKU"] = self.nome if unico else f"{self.nome} - {variacao.tamanho}"
+            yield linha
+
+    def __eq__(self, outro):
+        return isinstance(outro, Produto) and all(getattr(self, a) == getattr(outro, a) for a in self.__slots__)
+
+    def __repr__(self):
+        return f"Produto({self.sku!r}, {self.nome!r}, {len(self)} variações)"
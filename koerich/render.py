@@ -0,0 +1,298 @@
+"""Pool de renderização Playwright: um Chromium por execução, páginas reutilizáveis."""
+import asyncio
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+# Só o DOM interessa: as imagens são baixadas depois pelo EstagioImagens
+TIPOS_BLOQUEADOS = frozenset({"image", "media", "font"})
+HOSTS_BLOQUEADOS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googleadservices.com",
+    "facebook.net", "facebook.com", "hotjar.com", "clarity.ms", "tiktok.com", "criteo.com",
+    "criteo.net", "rtbhouse.com", "smartsupp.com", "zendesk.com", "newrelic.com", "nr-data.net",
+)
+
+# Pronto = JSON-LD Product com preço, ou nó de preço anexado e título preenchido
+SELETORES_PRECO = (".product-price", "[itemprop='price']", "[class*='price']", "[class*='Price']")
+SCRIPT_PRONTO = """(seletores) => {
+    for (const s of document.querySelectorAll('script[type="application/ld+json"]')) {
+        if (/"@type"\\s*:\\s*"Product"/.test(s.textContent) && /"price"/.test(s.textContent)) return true;
+    }
+    const h1 = document.querySelector("h1");
+    return !!(h1 && h1.textContent.trim() && seletores.some((sel) => document.querySelector(sel)));
+}"""
+
+
+def host_bloqueado(url):
+    host = (urlsplit(url).hostname or "").lower()
+    return any(host == h or host.endswith("." + h) for h in HOSTS_BLOQUEADOS)
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class MetricasRender:
+    """Tempos por página renderizada e requisições bloqueadas, thread-safe."""
+
+    def __init__(self):
+        self.bloqueadas = Counter()
+        self.paginas = Counter()
+        self.tempos = {"navegacao": [], "pronto": [], "total": []}
+        self._lock = threading.Lock()
+
+    def bloquear(self, tipo):
+        with self._lock:
+            self.bloqueadas[tipo] += 1
+
+    def registrar(self, navegacao_s, pronto_s, total_s, pronto):
+        with self._lock:
+            self.paginas["prontas" if pronto else "sem_pronto"] += 1
+            self.tempos["navegacao"].append(navegacao_s)
+            self.tempos["pronto"].append(pronto_s)
+            self.tempos["total"].append(total_s)
+
+    def resumo(self):
+        """Médias e p95 em ms por fase, páginas por desfecho e bloqueios por tipo."""
+        with self._lock:
+            fases = {
+                fase: {"media_ms": sum(v) / len(v) * 1000 if v else 0.0, "p95_ms": _percentil(v, 95) * 1000}
+                for fase, v in self.tempos.items()
+            }
+            return {"paginas": dict(self.paginas), "fases": fases, "bloqueadas": dict(self.bloqueadas)}
+
+
+class _Slot:
+    """Um contexto + página do pool e quantas navegações já fez."""
+    __slots__ = ("context", "page", "navegacoes", "geracao")
+
+    def __init__(self):
+        self.context = None
+        self.page = None
+        self.navegacoes = 0
+        self.geracao = -1
+
+
+class PoolRenderizadorAsync:
+    """Mantém um Chromium aberto e distribui `tamanho` contextos/páginas reutilizáveis.
+
+    Cada contexto é reciclado após `max_navegacoes` navegações ou quando a
+    renderização falha; se o navegador cair, ele é relançado na próxima aquisição.
+
+    Com `bloquear_recursos`, imagens, mídia, fontes e scripts de analytics são
+    abortados via `route`. `espera="pronto"` devolve o DOM assim que o
+    `SCRIPT_PRONTO` for verdadeiro; `espera="networkidle"` mantém a espera antiga.
+    """
+
+    def __init__(self, tamanho=4, max_navegacoes=50, headless=True, bloquear_recursos=True,
+                 espera="pronto", metricas=None):
+        self.tamanho = max(1, int(tamanho))
+        self.max_navegacoes = max_navegacoes
+        self.headless = headless
+        self.bloquear_recursos = bloquear_recursos
+        self.espera = espera
+        self.metricas = metricas if metricas is not None else MetricasRender()
+        self.reciclagens = 0
+        self.relancamentos = 0
+        self._playwright = None
+        self._browser = None
+        self._geracao = 0
+        self._livres = None
+        self._lock = None
+
+    async def iniciar(self):
+        if self._playwright is not None:
+            return self
+        # Só quem de fato renderiza paga o import do Playwright
+        try:
+            from playwright.async_api import async_playwright
+        except Exception:
+            raise RuntimeError("Playwright não está disponível")
+        self._playwright = await async_playwright().start()
+        self._lock = asyncio.Lock()
+        self._livres = asyncio.Queue()
+        for _ in range(self.tamanho):
+            self._livres.put_nowait(_Slot())
+        try:
+            await self._lancar_browser()
+        except Exception:
+            await self.fechar()
+            raise
+        return self
+
+    async def _lancar_browser(self):
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._geracao += 1
+
+    async def _garantir_browser(self):
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._browser is not None:
+                    self.relancamentos += 1
+                    try:
+                        await self._browser.close()
+                    except Exception:
+                        pass
+                await self._lancar_browser()
+
+    async def _descartar(self, slot):
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        slot.context = slot.page = None
+        slot.navegacoes = 0
+
+    async def _preparar(self, slot):
+        await self._garantir_browser()
+        if slot.page is not None:
+            esgotado = self.max_navegacoes and slot.navegacoes >= self.max_navegacoes
+            if esgotado or slot.geracao != self._geracao or slot.page.is_closed():
+                await self._descartar(slot)
+                self.reciclagens += 1
+        if slot.page is None:
+            slot.context = await self._browser.new_context()
+            if self.bloquear_recursos:
+                await slot.context.route("**/*", self._filtrar)
+            slot.page = await slot.context.new_page()
+            slot.geracao = self._geracao
+
+    @asynccontextmanager
+    async def pagina(self):
+        """Empresta uma página do pool; em caso de erro o contexto é descartado."""
+        if self._livres is None:
+            await self.iniciar()
+        slot = await self._livres.get()
+        try:
+            await self._preparar(slot)
+            slot.navegacoes += 1
+            yield slot.page
+        except BaseException:
+            await self._descartar(slot)
+            raise
+        finally:
+            self._livres.put_nowait(slot)
+
+    async def _filtrar(self, route):
+        request = route.request
+        tipo = request.resource_type
+        if tipo in TIPOS_BLOQUEADOS or host_bloqueado(request.url):
+            self.metricas.bloquear(tipo if tipo in TIPOS_BLOQUEADOS else "analytics")
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def renderizar(self, url, wait_selectors=None, timeout_ms=15000):
+        async with self.pagina() as page:
+            page.set_default_timeout(timeout_ms)
+            inicio = time.perf_counter()
+            await page.goto(url, wait_until="domcontentloaded")
+            navegado = time.perf_counter()
+
+            pronto = False
+            if self.espera == "pronto":
+                try:
+                    await page.wait_for_function(SCRIPT_PRONTO, arg=list(SELETORES_PRECO), timeout=timeout_ms)
+                    pronto = True
+                except Exception:
+                    pass
+            else:
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+                    pronto = True
+                except Exception:
+                    pass
+
+            if not pronto:
+                for sel in wait_selectors or []:
+                    try:
+                        await page.wait_for_selector(sel, state="attached", timeout=4000)
+                        break
+                    except Exception:
+                        continue
+            html = await page.content()
+            fim = time.perf_counter()
+            self.metricas.registrar(navegado - inicio, fim - navegado, fim - inicio, pronto)
+            return html
+
+    async def fechar(self):
+        if self._livres is not None:
+            while not self._livres.empty():
+                await self._descartar(self._livres.get_nowait())
+            self._livres = None
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+class PoolRenderizador:
+    """Fachada síncrona e thread-safe para o `PoolRenderizadorAsync`.
+
+    O pool roda num event loop em thread dedicado; qualquer thread pode chamar
+    `renderizar`, e até `tamanho` páginas são renderizadas em paralelo.
+    """
+
+    def __init__(self, tamanho=4, max_navegacoes=50, headless=True, bloquear_recursos=True,
+                 espera="pronto", metricas=None):
+        self.pool = PoolRenderizadorAsync(tamanho, max_navegacoes, headless, bloquear_recursos, espera, metricas)
+        self.metricas = self.pool.metricas
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        with self._lock:
+            if self._loop is not None:
+                return self
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="renderizador", daemon=True)
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self.pool.iniciar(), loop).result()
+            except Exception:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            self._loop, self._thread = loop, thread
+        return self
+
+    def renderizar(self, url, wait_selectors=None, timeout_ms=15000):
+        self.iniciar()
+        coro = self.pool.renderizar(url, wait_selectors, timeout_ms)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def fechar(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self.pool.fechar(), self._loop).result(timeout=30)
+            except Exception:
+                pass
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                self._loop.close()
+                self._loop = self._thread = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.fechar()
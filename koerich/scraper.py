@@ -0,0 +1,1209 @@
+"""Scraper de PDPs Koerich para a planilha VTEX (`python -m koerich` ou `python3 scraper.py`).
+
+Importar este módulo não faz I/O nem carrega dependências pesadas: pandas,
+requests, Playwright, pyarrow, Pillow e tqdm só são importados nos caminhos
+que os usam, e sessão, classificador, renderizador e caches são criados sob
+demanda (`obter_*`). Assim os processos de parse do modo pipeline sobem em
+milissegundos e só carregam o que o parse precisa.
+"""
+import os, re
+import argparse
+import threading
+from functools import partial
+from itertools import islice
+from urllib.parse import urljoin, urlsplit
+from collections import Counter, deque
+from datetime import datetime
+
+from koerich.change_index import IndiceMudancas
+from koerich.checkpoint import EscritorIncremental, GravacaoOrdenada
+from koerich.classify import Classificador
+from koerich.document import DocumentoPDP
+from koerich.image_manifest import ManifestoImagens
+from koerich.metrics import Metricas
+from koerich.page_cache import CachePaginas, PaginaForaDoCache
+from koerich.parsers import BACKENDS, backend_padrao
+from koerich.records import TAMANHO_UNICO, Produto
+
+def tqdm(iterable=None, total=None, desc=None):
+    """Barra do tqdm, importado só quando há URLs a processar; sem tqdm devolve o iterável."""
+    try:
+        from tqdm import tqdm as barra
+    except Exception:
+        return iterable if iterable is not None else []
+    return barra(iterable, total=total, desc=desc)
+
+# === Configurações ===
+# Raiz do repositório (este módulo fica em koerich/)
+current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+input_csv = os.path.join(current_dir, "data", "csv", "produtos_link.csv")
+output_csv = os.path.join(current_dir, "data", "exports", "produtos_vtex.csv")
+output_folder = os.path.join(current_dir, "data", "exports", "imagens_produtos")
+output_parquet = os.path.join(current_dir, "data", "exports", "produtos_vtex.parquet")
+cache_imagens_dir = os.path.join(current_dir, "data", "cache", "imagens")
+cache_paginas_dir = os.path.join(current_dir, "data", "cache", "paginas")
+indice_mudancas_path = os.path.join(current_dir, "data", "estado", "mudancas.sqlite")
+manifesto_imagens_path = os.path.join(current_dir, "data", "estado", "imagens.sqlite")
+relatorio_path = os.path.join(current_dir, "data", "exports", "relatorio_execucao.json")
+classificacao_path = os.path.join(current_dir, "config", "classificacao.json")
+
+def usar_dir_dados(dados):
+    """Aponta o CSV de entrada, as saídas, os caches e o estado para outra pasta no formato de `data/`."""
+    global input_csv, output_csv, output_folder, output_parquet, cache_imagens_dir, cache_paginas_dir
+    global indice_mudancas_path, manifesto_imagens_path, relatorio_path
+    input_csv = os.path.join(dados, "csv", "produtos_link.csv")
+    output_csv = os.path.join(dados, "exports", "produtos_vtex.csv")
+    output_folder = os.path.join(dados, "exports", "imagens_produtos")
+    output_parquet = os.path.join(dados, "exports", "produtos_vtex.parquet")
+    cache_imagens_dir = os.path.join(dados, "cache", "imagens")
+    cache_paginas_dir = os.path.join(dados, "cache", "paginas")
+    indice_mudancas_path = os.path.join(dados, "estado", "mudancas.sqlite")
+    manifesto_imagens_path = os.path.join(dados, "estado", "imagens.sqlite")
+    relatorio_path = os.path.join(dados, "exports", "relatorio_execucao.json")
+
+# Renderização: um Chromium por execução, com N páginas recicladas a cada X navegações
+render_pool_size = 4
+render_max_navegacoes = 50
+
+# Crawl: URLs em voo, requisições simultâneas por host e requisições/s por host
+concorrencia = 16
+concorrencia_por_host = 8
+taxa_por_host = 2.0
+
+# Limitador adaptativo (AIMD): a taxa parte de taxa_por_host e sobe até taxa_max_por_host
+# enquanto o site responde bem; 429/5xx/latência alta cortam, Retry-After pausa o host
+limite_adaptativo = True
+taxa_max_por_host = 20.0
+
+# Pipeline: threads de fetch alimentam processos de parse (None = um por núcleo)
+workers_fetch = 8
+workers_parse = None
+
+# Fetch: "escalonado" tenta GET simples e só renderiza o que faltar; "render" sempre usa o Playwright
+modo_fetch = "escalonado"
+
+# Imagens: downloads em paralelo num estágio próprio, com pool de conexões dedicado
+workers_imagens = 8
+pool_conexoes_imagens = 16
+usar_cache_imagens = True
+
+# Pós-processamento das imagens num pool de processos: formato real pelos magic bytes,
+# JPEG normalizado, derivadas nos tamanhos VTEX e quase duplicatas (dHash) removidas da galeria
+pos_processar_imagens = True
+workers_pos_imagens = None
+normalizar_jpeg = True
+derivados_imagens = None  # None = DERIVADOS_VTEX (koerich/image_post.py)
+limiar_dhash = 4
+
+# Cache de páginas: HTML do GET e do render reaproveitado entre execuções; replay = só cache, sem rede
+usar_cache_paginas = True
+ttl_cache_paginas_h = 6
+max_cache_paginas_mb = 2048
+modo_replay = False
+
+# Fronteira compartilhada (--fronteira): URLs reivindicadas em lotes com lease renovado por heartbeat;
+# leases vencidos (worker que morreu) voltam para a fila. Ver koerich/frontier.py
+lote_fronteira = 50
+lease_fronteira_s = 300
+
+# Extração: "html" (PDP, GET/Playwright) ou "api" (API de busca do catálogo VTEX, 50 produtos por GET;
+# a PDP só é baixada para URLs sem productId ou que a API não devolveu). Ver koerich/catalog_api.py
+modo_extracao = "html"
+api_catalogo_base = None  # None = o host de cada URL
+workers_api = 4
+
+# Incremental: só grava PDPs cujo preço/nome/imagens/categoria mudou; cache de páginas mais curto
+modo_incremental = False
+ttl_cache_paginas_incremental_h = 0.5
+
+# Parquet: dataset em lotes (colunas com dicionário + zstd) e o CSV VTEX derivado dele no fim
+exportar_parquet = False
+tamanho_lote_parquet = 5000
+
+# Parser HTML: "lxml" (padrão se instalado), "html.parser" ou "selectolax" (ver koerich/parsers.py)
+parser_html = backend_padrao()
+
+wait_selectors_pdp = ["h1", ".product-name", ".product-price", ".product-images"]
+
+# Render enxuto: sem imagens/fontes/analytics e DOM lido assim que a PDP estiver pronta
+render_bloquear_recursos = True
+render_espera = "pronto"
+metricas_render = None
+
+def obter_metricas_render():
+    global metricas_render
+    if metricas_render is None:
+        from koerich.render import MetricasRender
+        metricas_render = MetricasRender()
+    return metricas_render
+
+# === Sessão HTTP ===
+UA = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+    "Accept-Encoding": "identity",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1"
+}
+# Métricas da execução (etapas, bytes, retries, latência por host); ver koerich/metrics.py
+metricas = Metricas()
+# Sessão requests e limitador por host (criados sob demanda: o parse não precisa deles)
+session = None
+limitador = None
+_lock_sessao = threading.Lock()
+
+def obter_limitador():
+    """Taxa e concorrência por host ajustadas pelas respostas; ver koerich/ratelimit.py"""
+    global limitador
+    with _lock_sessao:
+        if limitador is None:
+            from koerich.ratelimit import LimitadorAdaptativo
+            limitador = LimitadorAdaptativo(taxa_por_host, taxa_max=taxa_max_por_host,
+                                            concorrencia_max=concorrencia_por_host,
+                                            adaptativo=limite_adaptativo, metricas=metricas)
+    return limitador
+
+def obter_sessao():
+    global session
+    limitador = obter_limitador()
+    with _lock_sessao:
+        if session is None:
+            import requests
+            from koerich.ratelimit import AdaptadorLimitado, criar_retry
+
+            sessao = requests.Session()
+            sessao.headers.update(UA)
+            metricas.instrumentar_sessao(sessao)
+            adaptador = AdaptadorLimitado(limitador, max_retries=criar_retry(
+                metricas, limitador, total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]))
+            sessao.mount("https://", adaptador)
+            sessao.mount("http://", adaptador)
+            session = sessao
+    return session
+
+# === Mapeamentos VTEX ===
+# Ids de departamento/categoria/marca e palavras-chave vêm de config/classificacao.json (lido no primeiro uso)
+classificador = None
+
+def obter_classificador():
+    global classificador
+    if classificador is None:
+        classificador = Classificador.de_arquivo(classificacao_path)
+    return classificador
+
+# === Funções Utilitárias ===
+def limpar(texto):
+    return re.sub(r"\s+", " ", (texto or "").strip())
+
+def get_marca_id(marca_nome):
+    return obter_classificador().id_marca(marca_nome)
+
+def parse_preco(texto):
+    m = re.search(r"R\$\s*([\d\.\s]+,\d{2})", texto)
+    if not m:
+        return ""
+    try:
+        br = m.group(1).replace(".", "").replace(" ", "").replace(",", ".")
+        return f"{float(br):.2f}"
+    except:
+        return ""
+
+def pagina_completa(doc):
+    """Verifica se o HTML estático já traz nome, preço, SKU e imagens.
+
+    Só olha os dados estruturados (JSON-LD `Product` e `__NEXT_DATA__`); se
+    algum faltar, a página precisa passar pelo navegador.
+    """
+    jsonld, prod_nd = doc.jsonld, doc.produto_next_data
+    nome = jsonld.get("name") or prod_nd.get("productName") or prod_nd.get("name")
+    offers = jsonld.get("offers")
+    preco = isinstance(offers, dict) and offers.get("price")
+    sku = jsonld.get("sku") or any(prod_nd.get(k) for k in ("itemId", "sku", "id", "productId"))
+    imagens = jsonld.get("image") or doc.imagens_next_data
+    return bool(nome and preco and sku and imagens)
+
+def parse_srcset(srcset):
+    if not srcset:
+        return ""
+    
+    parts = srcset.split(",")
+    best_url = ""
+    best_density = 0
+    
+    for part in parts:
+        part = part.strip()
+        if ' ' in part:
+            url_part, density_part = part.rsplit(' ', 1)
+            try:
+                density = float(density_part.replace('x', '').replace('w', ''))
+                if density > best_density:
+                    best_density = density
+                    best_url = url_part.strip()
+            except:
+                if not best_url:
+                    best_url = url_part.strip()
+    
+    return best_url if best_url else parts[0].strip().split(" ")[0].strip()
+
+def criar_renderizador(tamanho=render_pool_size):
+    # O Chromium (e o import do Playwright) só sobe na primeira renderização
+    from koerich.render import PoolRenderizador
+
+    return PoolRenderizador(tamanho=tamanho, max_navegacoes=render_max_navegacoes,
+                            bloquear_recursos=render_bloquear_recursos, espera=render_espera,
+                            metricas=obter_metricas_render())
+
+renderizador = None
+_lock_renderizador = threading.Lock()
+
+def renderizar_html(url, wait_selectors=None, timeout_ms=15000):
+    global renderizador
+    with _lock_renderizador:
+        if renderizador is None:
+            renderizador = criar_renderizador()
+    return renderizador.renderizar(url, wait_selectors, timeout_ms)
+
+def fechar_renderizador():
+    if renderizador is not None:
+        renderizador.fechar()
+
+def gerar_base_url_produto(sku, nome):
+    nome_limpo = re.sub(r'[^a-zA-Z0-9\s-]', '', nome).strip()
+    nome_limpo = re.sub(r'\s+', '-', nome_limpo).lower()
+    return f"images-leadPOC-{sku}-{nome_limpo}"
+
+def detectar_categoria_departamento(nome):
+    """Detecta categoria e departamento pela palavra-chave mais longa no nome do produto"""
+    return obter_classificador().categoria(nome)
+
+def extrair_breadcrumb(doc):
+    """Extrai departamento e categoria do breadcrumb"""
+    category_div = doc.select_one("div.category")
+    if not category_div:
+        return "", ""
+    
+    breadcrumb_ul = category_div.select_one("ul#breadcrumbTrail")
+    if not breadcrumb_ul:
+        return "", ""
+    
+    breadcrumb_items = breadcrumb_ul.select("li")
+    breadcrumb_names = []
+    
+    for item in breadcrumb_items:
+        link = item.select_one("a")
+        if link:
+            text = limpar(link.texto())
+            if text:
+                breadcrumb_names.append(text)
+        else:
+            text = limpar(item.texto())
+            if text and text.lower() not in ("você está em:", "you are in:"):
+                breadcrumb_names.append(text)
+    
+    # Filtrar breadcrumbs válidos
+    breadcrumb_names = [name for name in breadcrumb_names 
+                       if name and name.lower() not in ("início", "inicio", "home", "página inicial")]
+    
+    if len(breadcrumb_names) >= 3:
+        return breadcrumb_names[-3], breadcrumb_names[-2]
+    elif len(breadcrumb_names) == 2:
+        return breadcrumb_names[0], breadcrumb_names[1]
+    elif len(breadcrumb_names) == 1:
+        return "", breadcrumb_names[0]
+    
+    return "", ""
+
+def extrair_imagens(doc, url, sku):
+    """Extrai URLs de imagens do produto"""
+    imgs = []
+    
+    # JSON-LD
+    jsonld = doc.jsonld
+    if jsonld.get("image"):
+        if isinstance(jsonld["image"], list):
+            imgs.extend([img for img in jsonld["image"] if isinstance(img, str)])
+        elif isinstance(jsonld["image"], str):
+            imgs.append(jsonld["image"])
+    
+    # __NEXT_DATA__
+    imgs.extend(doc.imagens_next_data)
+    
+    # HTML - imagens
+    for img in doc.select("img"):
+        src = img.attr("src") or img.attr("data-src") or img.attr("data-lazy-src") or parse_srcset(img.attr("srcset"))
+        if src and "data:image" not in src and "blank" not in src.lower():
+            if any(ext in src.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']):
+                clean_src = src.split('&')[0] if '&' in src else src
+                imgs.append(clean_src)
+    
+    # HTML - source srcset
+    for source in doc.select("source"):
+        srcset = source.attr("srcset")
+        if srcset:
+            srcset_parts = srcset.split(',')
+            best_url = ""
+            best_width = 0
+            
+            for part in srcset_parts:
+                part = part.strip()
+                if ' ' in part:
+                    url_part, width_part = part.rsplit(' ', 1)
+                    try:
+                        width = int(width_part.replace('w', ''))
+                        if width > best_width:
+                            best_width = width
+                            best_url = url_part.strip()
+                    except:
+                        pass
+            
+            if best_url and "data:image" not in best_url:
+                if any(ext in best_url.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']):
+                    clean_url = best_url.split('&')[0] if '&' in best_url else best_url
+                    imgs.append(clean_url)
+    
+    # Dedup e normalizar URLs
+    seen, ordered = set(), []
+    for u in imgs:
+        u_abs = urljoin(url, u)
+        if u_abs not in seen:
+            seen.add(u_abs)
+            ordered.append(u_abs)
+    
+    # Filtrar imagens do produto
+    imgs_produto = [img for img in ordered if sku in img or any(sku_part in img for sku_part in sku.split('-')[:2])]
+    
+    return imgs_produto[:5] if imgs_produto else ordered[:5]
+
+# Quantas páginas cada camada resolveu: api, estatico, render, http_fallback
+contadores_fetch = Counter()
+_lock_contadores = threading.Lock()
+
+def contar(camada, n=1):
+    with _lock_contadores:
+        contadores_fetch[camada] += n
+
+# Cache de páginas compartilhado pela execução (criado sob demanda)
+cache_paginas = None
+
+def obter_cache_paginas():
+    global cache_paginas
+    if cache_paginas is None and (usar_cache_paginas or modo_replay):
+        cache_paginas = CachePaginas(cache_paginas_dir, ttl_cache_paginas_h * 3600, max_cache_paginas_mb * 1024 * 1024)
+    return cache_paginas
+
+def buscar_estatico(url):
+    """GET simples da PDP, passando pelo cache de páginas."""
+    cache = obter_cache_paginas()
+    if cache is not None:
+        html = cache.obter(url, "estatico", ignorar_ttl=modo_replay)
+        if html is not None:
+            return html
+    if modo_replay:
+        raise PaginaForaDoCache(url)
+    with metricas.etapa("fetch_estatico"):
+        r = obter_sessao().get(url, timeout=20)
+        r.raise_for_status()
+    if not r.headers.get("Content-Length"):
+        metricas.contar("bytes_recebidos", len(r.content), host=urlsplit(url).netloc)
+    if cache is not None:
+        cache.gravar(url, "estatico", r.text, r.status_code, r.headers.get("content-type"))
+    return r.text
+
+def buscar_renderizado(url):
+    """DOM renderizado pelo Playwright, passando pelo cache de páginas."""
+    cache = obter_cache_paginas()
+    if cache is not None:
+        html = cache.obter(url, "render", ignorar_ttl=modo_replay)
+        if html is not None:
+            return html
+    if modo_replay:
+        raise PaginaForaDoCache(url)
+    limitador = obter_limitador()
+    limitador.adquirir(url)
+    try:
+        with metricas.etapa("render"):
+            html = renderizar_html(url, wait_selectors_pdp, 30000)
+    finally:
+        limitador.liberar(url)
+    if cache is not None:
+        cache.gravar(url, "render", html)
+    return html
+
+def medir_documento(doc):
+    """Parse e dados estruturados (JSON-LD/__NEXT_DATA__) do doc, cronometrados na primeira vez."""
+    if "arvore" not in vars(doc):
+        with metricas.etapa("parse"):
+            doc.arvore
+    if "produto_next_data" not in vars(doc):
+        with metricas.etapa("dados_estruturados"):
+            doc.jsonld
+            doc.produto_next_data
+    return doc
+
+def obter_pagina(url):
+    """Obtém (html, doc) da PDP conforme `modo_fetch`.
+
+    No modo escalonado o GET simples vem primeiro e a página só vai ao
+    Playwright se `pagina_completa` reprovar; o `DocumentoPDP` do GET é
+    devolvido para não parsear de novo. `doc` é None quando o HTML veio do
+    navegador.
+    """
+    html_estatico = None
+    if modo_fetch == "escalonado":
+        try:
+            html_estatico = buscar_estatico(url)
+            doc = medir_documento(DocumentoPDP(html_estatico, parser_html))
+            if pagina_completa(doc):
+                contar("estatico")
+                return html_estatico, doc
+        except Exception as e:
+            print(f"⚠️ GET simples falhou para {url}: {e}")
+
+    try:
+        html = buscar_renderizado(url)
+        contar("render")
+        return html, None
+    except Exception as e:
+        metricas.contar("playwright_falhas")
+        print(f"⚠️ Erro com Playwright para {url}: {e}")
+
+    if html_estatico is None:
+        html_estatico = buscar_estatico(url)
+    contar("http_fallback")
+    return html_estatico, None
+
+# Estágio de download de imagens compartilhado pela execução (criado sob demanda)
+estagio_imagens = None
+
+def obter_estagio_imagens():
+    global estagio_imagens
+    if estagio_imagens is None:
+        from koerich.image_cache import CacheImagens
+        from koerich.image_post import PosProcessadorImagens
+        from koerich.images import EstagioImagens
+
+        os.makedirs(output_folder, exist_ok=True)
+        cache = CacheImagens(cache_imagens_dir) if usar_cache_imagens else None
+        pos = None
+        if pos_processar_imagens:
+            pos = PosProcessadorImagens(output_folder, workers_pos_imagens, normalizar_jpeg, derivados_imagens,
+                                        limiar_dhash, metricas=metricas, cache=cache)
+        estagio_imagens = EstagioImagens(output_folder, workers_imagens, pool_conexoes_imagens, cache=cache,
+                                         metricas=metricas, pos=pos)
+    return estagio_imagens
+
+def extrair_produto(url):
+    """Extrai dados de produto de uma PDP VTEX (Spicy)."""
+    html, doc = obter_pagina(url)
+    linhas, jobs = analisar_html(html, url, doc)
+    return preencher_imagens_salvas(linhas, obter_estagio_imagens().baixar(jobs))
+
+def analisar_html(html, url, doc=None):
+    """Gera o `Produto` VTEX e os downloads de imagem pendentes a partir do HTML da PDP.
+
+    Não faz I/O: devolve `(produto, jobs)`, onde `jobs` são pares
+    `(url_imagem, arquivo)` e `_ImagensSalvas` fica vazio até o estágio de
+    imagens terminar (ver `preencher_imagens_salvas`). O produto vira linhas
+    (uma por variação) ao ser iterado.
+    """
+    if doc is None:
+        doc = DocumentoPDP(html, parser_html)
+    medir_documento(doc)
+
+    # --- Extrair dados básicos ---
+    jsonld = doc.jsonld
+    nome = limpar(jsonld.get("name", ""))
+    descricao = limpar(jsonld.get("description", ""))
+    preco = ""
+    
+    # Preço do JSON-LD
+    if isinstance(jsonld, dict) and jsonld.get("offers"):
+        offers = jsonld["offers"]
+        if isinstance(offers, dict) and offers.get("price"):
+            try:
+                preco = f"{float(str(offers['price']).replace(',', '.')):.2f}"
+            except:
+                pass
+    
+    # Fallback para nome
+    if not nome:
+        for sel in [".product-name h1", "h1.product-name", "h1", ".product-title"]:
+            tag = doc.select_one(sel)
+            if tag and tag.texto(strip=True):
+                nome = limpar(tag.texto(strip=True))
+                break
+        if not nome:
+            nome = "Sem Nome"
+    
+    # Fallback para preço
+    if not preco:
+        preco = parse_preco(doc.texto)
+    
+    # Fallback para descrição
+    if not descricao:
+        for sel in [".about-product", ".specifications", ".product-description", ".description"]:
+            tag = doc.select_one(sel)
+            if tag and tag.texto(strip=True):
+                descricao = limpar(tag.texto(" ", strip=True))
+                break
+    
+    # --- Categoria e Departamento ---
+    NomeDepartamento, NomeCategoria = "", ""
+    # 1) Tentar via __NEXT_DATA__ (VTEX: props.pageProps.product ou productData)
+    prod_nd = doc.produto_next_data
+    if prod_nd:
+        try:
+            # categoryTree: lista de níveis com {id, name, href}
+            cat_tree = prod_nd.get("categoryTree") or prod_nd.get("categories") or prod_nd.get("category")
+            if isinstance(cat_tree, list) and len(cat_tree) > 0:
+                nomes = [limpar((c.get("name") if isinstance(c, dict) else str(c)) or "") for c in cat_tree]
+                nomes = [n for n in nomes if n]
+                if len(nomes) >= 2:
+                    NomeDepartamento, NomeCategoria = nomes[0], nomes[-1]
+                elif len(nomes) == 1:
+                    NomeCategoria = nomes[0]
+        except:
+            pass
+    # 2) Fallback: breadcrumb no HTML
+    if not NomeDepartamento or not NomeCategoria:
+        NomeDepartamento, NomeCategoria = extrair_breadcrumb(doc)
+    # 3) Fallback: heurística pelo nome
+    if not NomeDepartamento or not NomeCategoria:
+        NomeDepartamento, NomeCategoria = detectar_categoria_departamento(nome)
+    
+    # --- SKU ---
+    sku_candidates = []
+    if isinstance(jsonld, dict) and jsonld.get("sku"):
+        sku_candidates.append(str(jsonld["sku"]))
+    
+    for key in ("itemId", "sku", "id", "productId"):
+        v = prod_nd.get(key)
+        if v:
+            sku_candidates.append(str(v))
+    
+    meta_sku = doc.select_one('meta[itemprop="sku"]')
+    if meta_sku and meta_sku.attr("content"):
+        sku_candidates.append(meta_sku.attr("content").strip())
+    
+    sku_candidates.append(url.rstrip("/").split("/")[-1])
+    
+    # Buscar por referência no texto
+    try:
+        mref = re.search(r"(?:Ref\.?|Refer[eê]ncia)[:\s]+([A-Z0-9\-\.\/]+)", doc.texto, flags=re.I)
+        if mref:
+            sku_candidates.insert(0, mref.group(1))
+    except:
+        pass
+    
+    sku = next((x for x in sku_candidates if x), "")
+    
+    # --- Marca ---
+    Marca = ""
+    if isinstance(jsonld, dict) and jsonld.get("brand"):
+        b = jsonld["brand"]
+        if isinstance(b, dict) and b.get("name"): 
+            Marca = limpar(b["name"])
+        elif isinstance(b, str): 
+            Marca = limpar(b)
+    
+    if not Marca:
+        Marca = obter_classificador().marca(nome)
+    
+    # --- Variações ---
+    tamanhos_disponiveis = []
+    variacao_selectors = [
+        "select[name*='cor'] option", "select[name*='voltagem'] option",
+        "input[name*='cor'][type='radio']", "input[name*='voltagem'][type='radio']"
+    ]
+    
+    for selector in variacao_selectors:
+        options = doc.select(selector)
+        if options:
+            for opt in options:
+                variacao = opt.texto(strip=True) or opt.attr("value", "")
+                if variacao and variacao.lower() not in ("selecione", "select", "cor", "voltagem", "-"):
+                    tamanhos_disponiveis.append(variacao)
+            break
+    
+    if not tamanhos_disponiveis:
+        tamanhos_disponiveis = [TAMANHO_UNICO]
+    
+    # --- Imagens ---
+    with metricas.etapa("imagens_extracao"):
+        imgs = extrair_imagens(doc, url, sku)
+    
+    return montar_produto(url, sku, nome, descricao, NomeDepartamento, NomeCategoria, Marca, preco, imgs,
+                          tamanhos_disponiveis)
+
+def montar_produto(url, sku, nome, descricao, NomeDepartamento, NomeCategoria, Marca, preco, imgs, tamanhos_disponiveis):
+    """`(produto, jobs)` a partir dos campos já extraídos, venham do HTML ou da API de catálogo."""
+    # --- Downloads de imagens (executados pelo EstagioImagens) ---
+    base_url_produto = gerar_base_url_produto(sku, nome)
+    jobs_imagens = [(u, f"{sku}_{i}.jpg") for i, u in enumerate(imgs, 1)]
+    
+    # --- IDs VTEX ---
+    _IDDepartamento = obter_classificador().id_departamento(NomeDepartamento)
+    _IDCategoria = obter_classificador().id_categoria(NomeCategoria)
+    _IDMarca = get_marca_id(Marca)
+    
+    # --- Produto: campos comuns uma vez, uma Variacao por linha VTEX ---
+    with metricas.etapa("linhas"):
+        produto = Produto(
+            sku=sku, nome=nome, descricao=descricao, link_texto=url.rstrip("/").split("/")[-1],
+            data_lancamento=datetime.today().strftime("%d/%m/%Y"),
+            id_departamento=_IDDepartamento, departamento=NomeDepartamento,
+            id_categoria=_IDCategoria, categoria=NomeCategoria, id_marca=_IDMarca, marca=Marca,
+            preco=preco, base_url_imagens=base_url_produto, imagens=imgs, variacoes=tamanhos_disponiveis,
+        )
+    return produto, jobs_imagens
+
+def analisar_api(dados, url):
+    """`(produto, jobs)` a partir do JSON da API de catálogo; mesmo esquema de `analisar_html`."""
+    from koerich.catalog_api import campos_produto
+
+    campos = campos_produto(dados)
+    nome = limpar(campos["nome"]) or "Sem Nome"
+    NomeDepartamento, NomeCategoria = limpar(campos["departamento"]), limpar(campos["categoria"])
+    if not NomeDepartamento or not NomeCategoria:
+        NomeDepartamento, NomeCategoria = detectar_categoria_departamento(nome)
+    Marca = limpar(campos["marca"]) or obter_classificador().marca(nome)
+    sku = campos["sku"] or url.rstrip("/").split("/")[-1]
+    return montar_produto(url, sku, nome, limpar(campos["descricao"]), NomeDepartamento, NomeCategoria, Marca,
+                          campos["preco"], campos["imagens"], campos["variacoes"] or [TAMANHO_UNICO])
+
+def preencher_imagens_salvas(produto, salvas):
+    produto.imagens_salvas = ";".join(salvas)
+    return produto
+
+# === Loop principal ===
+def ler_urls(caminho):
+    import pandas as pd
+
+    df_links = pd.read_csv(caminho)
+    if "url" not in df_links.columns:
+        raise Exception("❌ A planilha precisa ter uma coluna chamada 'url'.")
+    urls = [str(u).strip() for u in df_links["url"].dropna()]
+    return [u for u in urls if u]
+
+# Índice de mudanças entre execuções (data de lançamento, modo incremental, prioridade)
+indice_mudancas = None
+
+def obter_indice_mudancas():
+    global indice_mudancas
+    if indice_mudancas is None:
+        indice_mudancas = IndiceMudancas(indice_mudancas_path)
+    return indice_mudancas
+
+def filtrar_mudancas(url, produto, jobs):
+    """Mantém a data de lançamento da primeira visita e, no incremental, descarta PDPs iguais.
+
+    Uma PDP sem mudança é anotada no índice na hora (não há linha a gravar);
+    as que mudaram só são anotadas depois de concluídas na saída (`registrar_gravacao`).
+    """
+    indice = obter_indice_mudancas()
+    _, mudou, anterior = indice.comparar(url, produto)
+    if anterior is not None:
+        produto.data_lancamento = datetime.fromtimestamp(anterior["primeira_vez"]).strftime("%d/%m/%Y")
+    if modo_incremental and not mudou:
+        indice.registrar(url, produto)
+        return [], []
+    return produto, jobs
+
+def registrar_gravacao(url, linhas):
+    if linhas:
+        obter_indice_mudancas().registrar(url, linhas)
+    if trabalho_fronteira is not None:
+        trabalho_fronteira.concluir(url)
+
+def registrar_falha(url):
+    if trabalho_fronteira is not None:
+        trabalho_fronteira.falhar(url)
+
+# Lado deste worker na fronteira compartilhada (só com --fronteira)
+trabalho_fronteira = None
+
+def urls_da_fronteira(concluidas):
+    """URLs reivindicadas na fronteira; as que já estão no checkpoint local (--resume) são só confirmadas."""
+    for url in trabalho_fronteira.urls():
+        if url in concluidas:
+            trabalho_fronteira.concluir(url)
+            continue
+        yield url
+
+# Galeria final de cada SKU, lida por scripts/generate_image_csv_updated.py
+manifesto_imagens = None
+
+def obter_manifesto_imagens():
+    global manifesto_imagens
+    if manifesto_imagens is None:
+        manifesto_imagens = ManifestoImagens(manifesto_imagens_path)
+    return manifesto_imagens
+
+# Linhas por marca já gravadas, para o resumo final (sem manter as linhas em memória)
+marcas_gravadas = Counter()
+
+def fontes_urls(args, concluidas):
+    """URLs a processar, sob demanda: da fronteira, descobertas por sitemap/categoria ou lidas do CSV."""
+    if trabalho_fronteira is not None:
+        return urls_da_fronteira(concluidas)
+    if not (args.sitemap or args.categoria):
+        return [u for u in ler_urls(input_csv) if u not in concluidas]
+    from koerich.discovery import ConjuntoVistos, FiltroBloom, descobrir
+
+    vistos = FiltroBloom(args.bloom) if args.bloom else ConjuntoVistos()
+    urls = descobrir(args.sitemap, args.categoria, buscar_estatico, vistos, obter_sessao())
+    return (u for u in urls if u not in concluidas)
+
+def finalizar_linhas(produto, salvas):
+    # PDP sem mudança no incremental chega vazia: só vai para o checkpoint
+    if produto:
+        preencher_imagens_salvas(produto, salvas)
+        obter_manifesto_imagens().registrar(produto.sku, salvas)
+        marcas_gravadas[produto.marca] += len(produto)
+    return produto
+
+def processar_sequencial(urls, saida):
+    # O parse segue para a próxima URL enquanto as imagens baixam no estágio;
+    # o ritmo por host fica com o limitador da sessão
+    estagio = obter_estagio_imagens()
+    try:
+        for i, url in enumerate(tqdm(urls, desc="Processando URLs")):
+            try:
+                html, doc = obter_pagina(url)
+                linhas, jobs = filtrar_mudancas(url, *analisar_html(html, url, doc))
+                saida.adicionar(i, url, linhas, estagio.enviar(jobs))
+            except Exception as e:
+                print(f"❌ Erro ao processar {url}: {e}")
+                saida.adicionar(i, url)
+    finally:
+        fechar_renderizador()
+
+def buscar_lote_api(lote):
+    """{url: produto JSON} dos pares `(i, url)` do lote que a API de catálogo devolveu."""
+    from koerich.catalog_api import buscar_produtos, id_produto_da_url, origem
+
+    por_base = {}
+    for _, url in lote:
+        pid = id_produto_da_url(url)
+        if pid:
+            por_base.setdefault(api_catalogo_base or origem(url), {})[url] = pid
+    encontrados = {}
+    for base, ids in por_base.items():
+        with metricas.etapa("fetch_api"):
+            produtos = buscar_produtos(obter_sessao(), base, list(dict.fromkeys(ids.values())))
+        encontrados.update((url, produtos[pid]) for url, pid in ids.items() if pid in produtos)
+    return encontrados
+
+def processar_api(urls, saida):
+    # Lotes de 50 URLs viram um GET na API; até workers_api lotes buscados à frente do mapeamento.
+    # O lote é montado nesta thread: o gerador da fronteira/descoberta não é compartilhado
+    from concurrent.futures import ThreadPoolExecutor
+    from koerich.catalog_api import MAX_POR_REQUISICAO
+
+    estagio = obter_estagio_imagens()
+    numeradas = enumerate(urls)
+    lotes = iter(lambda: list(islice(numeradas, MAX_POR_REQUISICAO)), [])
+    barra = tqdm(total=len(urls) if isinstance(urls, list) else None, desc="Processando URLs (API)")
+    pendentes = deque()
+    try:
+        with ThreadPoolExecutor(workers_api, thread_name_prefix="api") as pool:
+            def encher():
+                while len(pendentes) < workers_api:
+                    lote = next(lotes, None)
+                    if lote is None:
+                        return
+                    pendentes.append((lote, pool.submit(buscar_lote_api, lote)))
+
+            encher()
+            while pendentes:
+                lote, futuro = pendentes.popleft()
+                try:
+                    encontrados = futuro.result()
+                except Exception as e:
+                    print(f"⚠️ API de catálogo falhou para {len(lote)} URLs, usando as PDPs: {e}")
+                    encontrados = {}
+                encher()
+                contar("api", len(encontrados))
+                for i, url in lote:
+                    try:
+                        if url in encontrados:
+                            produto, jobs = analisar_api(encontrados[url], url)
+                        else:
+                            # Sem productId na URL ou fora da API: a PDP pelo caminho normal
+                            metricas.contar("api_sem_produto")
+                            html, doc = obter_pagina(url)
+                            produto, jobs = analisar_html(html, url, doc)
+                        linhas, jobs = filtrar_mudancas(url, produto, jobs)
+                        saida.adicionar(i, url, linhas, estagio.enviar(jobs))
+                    except Exception as e:
+                        print(f"❌ Erro ao processar {url}: {e}")
+                        saida.adicionar(i, url)
+                    if hasattr(barra, "update"):
+                        barra.update(1)
+    finally:
+        if hasattr(barra, "close"):
+            barra.close()
+        fechar_renderizador()
+
+def verificar_estatico(html):
+    """Parseia o HTML estático e devolve o documento se ele dispensar o navegador."""
+    doc = medir_documento(DocumentoPDP(html, parser_html))
+    return doc if pagina_completa(doc) else None
+
+def processar_async(urls, args, saida):
+    import asyncio
+    from koerich.crawl_async import CrawlerAsync
+
+    crawler = CrawlerAsync(
+        analisar_html, headers=UA,
+        verificar_estatico=verificar_estatico if modo_fetch == "escalonado" else None,
+        contadores=contadores_fetch,
+        cache=obter_cache_paginas(), replay=modo_replay, metricas=metricas,
+        concorrencia=args.concorrencia, por_host=args.por_host, limitador=obter_limitador(),
+        render_pool=args.render_pool, render_max_navegacoes=render_max_navegacoes,
+        render_bloquear=render_bloquear_recursos, render_espera=render_espera, metricas_render=obter_metricas_render(),
+        wait_selectors=wait_selectors_pdp, timeout_ms=30000,
+    )
+
+    estagio = obter_estagio_imagens()
+
+    async def coletar():
+        barra = tqdm(total=len(urls) if isinstance(urls, list) else None, desc="Processando URLs")
+        async for i, url, resultado, erro in crawler.executar(urls):
+            if erro is not None:
+                print(f"❌ Erro ao processar {url}: {erro}")
+                saida.adicionar(i, url)
+            else:
+                linhas, jobs = filtrar_mudancas(url, *resultado)
+                # enviar pode esperar vaga na fila de imagens; fora do event loop
+                saida.adicionar(i, url, linhas, await asyncio.to_thread(estagio.enviar, jobs))
+            if hasattr(barra, "update"):
+                barra.update(1)
+        if hasattr(barra, "close"):
+            barra.close()
+
+    asyncio.run(coletar())
+
+def buscar_fase(url, fase):
+    """Fetch do modo pipeline; devolve (html, ultima).
+
+    No escalonado a fase 0 é o GET simples (ultima=False: o processo de parse
+    pode recusar a página) e a fase 1, o navegador. Sem navegador, cai no GET.
+    A camada "estatico" só é contada quando o parse aceita a página
+    (`processar_pipeline`); as outras, aqui.
+    """
+    if modo_fetch == "escalonado" and fase == 0:
+        try:
+            return buscar_estatico(url), False
+        except Exception as e:
+            print(f"⚠️ GET simples falhou para {url}: {e}")
+    try:
+        html = buscar_renderizado(url)
+        contar("render")
+        return html, True
+    except Exception as e:
+        metricas.contar("playwright_falhas")
+        print(f"⚠️ Erro com Playwright para {url}: {e}")
+    html = buscar_estatico(url)
+    contar("http_fallback")
+    return html, True
+
+def analisar_em_processo(backend, html, url, ultima):
+    """Parse num processo do pool: None se a página estática não estiver completa.
+
+    Devolve `(produto, jobs, métricas, estatico)`: as métricas registradas
+    neste processo desde a última chamada, para o processo principal mesclar,
+    e se a página aceita foi a do GET simples (ainda não contada).
+    """
+    doc = medir_documento(DocumentoPDP(html, backend))
+    if not ultima and not pagina_completa(doc):
+        return None
+    produto, jobs = analisar_html(html, url, doc)
+    return produto, jobs, metricas.extrair(), not ultima
+
+def processar_pipeline(urls, args, saida):
+    from koerich.pipeline import PipelineProcessos
+
+    pipeline = PipelineProcessos(
+        buscar_fase, partial(analisar_em_processo, parser_html),
+        workers_fetch=args.workers_fetch, workers_parse=args.workers_parse,
+    )
+    estagio = obter_estagio_imagens()
+    barra = tqdm(total=len(urls) if isinstance(urls, list) else None, desc="Processando URLs")
+    try:
+        for i, url, resultado, erro in pipeline.executar(urls):
+            if erro is not None or resultado is None:
+                print(f"❌ Erro ao processar {url}: {erro or 'página incompleta'}")
+                saida.adicionar(i, url)
+            else:
+                produto, jobs, parcial, estatico = resultado
+                metricas.mesclar(parcial)
+                if estatico:
+                    contar("estatico")
+                linhas, jobs = filtrar_mudancas(url, produto, jobs)
+                saida.adicionar(i, url, linhas, estagio.enviar(jobs))
+            if hasattr(barra, "update"):
+                barra.update(1)
+    finally:
+        if hasattr(barra, "close"):
+            barra.close()
+        fechar_renderizador()
+
+def main(argv=None):
+    global renderizador, modo_fetch, workers_imagens, pool_conexoes_imagens, usar_cache_imagens
+    global pos_processar_imagens, normalizar_jpeg, derivados_imagens
+    global usar_cache_paginas, ttl_cache_paginas_h, max_cache_paginas_mb, modo_replay, parser_html
+    global render_bloquear_recursos, render_espera, modo_incremental, exportar_parquet
+    global taxa_por_host, taxa_max_por_host, concorrencia_por_host, limite_adaptativo, trabalho_fronteira
+    global modo_extracao, api_catalogo_base, workers_api
+
+    parser = argparse.ArgumentParser(description="Scraper de PDPs Koerich para planilha VTEX")
+    parser.add_argument("--modo", choices=["sequencial", "async", "pipeline"], default="sequencial",
+                        help="sequencial (uma URL por vez), async (várias PDPs em voo) ou "
+                             "pipeline (fetch em threads, parse em processos)")
+    parser.add_argument("--extracao", choices=["html", "api"], default=modo_extracao,
+                        help="html (baixa e parseia cada PDP) ou api (API de catálogo VTEX, 50 produtos por "
+                             "requisição; PDP só para o que a API não devolver). Com api, --modo é ignorado")
+    parser.add_argument("--api-base", default=api_catalogo_base,
+                        help="origem da API de catálogo (padrão: o host de cada URL), ex.: um mock local")
+    parser.add_argument("--workers-api", type=int, default=workers_api,
+                        help="lotes da API de catálogo buscados em paralelo")
+    parser.add_argument("--fetch", choices=["escalonado", "render"], default=modo_fetch,
+                        help="escalonado (GET simples, Playwright só se faltar dado) ou render (sempre Playwright)")
+    parser.add_argument("--parser", choices=BACKENDS, default=parser_html, help="backend de parse HTML")
+    parser.add_argument("--concorrencia", type=int, default=concorrencia, help="URLs em voo no modo async")
+    parser.add_argument("--por-host", type=int, default=concorrencia_por_host, help="requisições simultâneas por host")
+    parser.add_argument("--taxa", type=float, default=taxa_por_host,
+                        help="requisições/s iniciais por host (0 = só limita a concorrência)")
+    parser.add_argument("--taxa-max", type=float, default=taxa_max_por_host,
+                        help="teto do limitador adaptativo, em requisições/s por host")
+    parser.add_argument("--taxa-fixa", action="store_true",
+                        help="mantém --taxa e --por-host fixos (ainda respeita Retry-After e o circuit breaker)")
+    parser.add_argument("--workers-fetch", type=int, default=workers_fetch, help="threads de fetch no modo pipeline")
+    parser.add_argument("--workers-parse", type=int, default=workers_parse,
+                        help="processos de parse no modo pipeline (padrão: um por núcleo)")
+    parser.add_argument("--render-pool", type=int, default=render_pool_size, help="páginas Playwright reutilizáveis")
+    parser.add_argument("--render-espera", choices=["pronto", "networkidle"], default=render_espera,
+                        help="pronto (JSON-LD/preço no DOM) ou networkidle (espera a rede parar)")
+    parser.add_argument("--render-sem-bloqueio", action="store_true",
+                        help="deixa o navegador carregar imagens, fontes e scripts de analytics")
+    parser.add_argument("--workers-imagens", type=int, default=workers_imagens, help="downloads de imagem simultâneos")
+    parser.add_argument("--pool-conexoes-imagens", type=int, default=pool_conexoes_imagens,
+                        help="conexões HTTP mantidas pela sessão de imagens")
+    parser.add_argument("--sem-pos-imagens", action="store_true",
+                        help="grava as imagens como vieram, sem checar formato, converter nem deduplicar")
+    parser.add_argument("--manter-formato", action="store_true",
+                        help="não converte PNG/WebP para JPEG (só corrige a extensão)")
+    parser.add_argument("--sem-derivadas", action="store_true", help="não gera as imagens nos tamanhos VTEX")
+    parser.add_argument("--sem-cache-imagens", action="store_true",
+                        help="baixa todas as imagens de novo, ignorando o cache por URL/ETag")
+    parser.add_argument("--sem-cache-paginas", action="store_true", help="não lê nem grava o cache de páginas")
+    parser.add_argument("--ttl-cache-paginas", type=float, default=ttl_cache_paginas_h,
+                        help="horas até uma página em cache expirar (0 = nunca)")
+    parser.add_argument("--max-cache-paginas", type=int, default=max_cache_paginas_mb,
+                        help="tamanho máximo do cache de páginas em MB (LRU)")
+    parser.add_argument("--replay", action="store_true",
+                        help="offline: usa só páginas do cache, sem rede nem Playwright (ignora o TTL)")
+    parser.add_argument("--sitemap", action="append", default=[],
+                        help="descobre as PDPs por sitemap/índice (URL ou arquivo .xml/.xml.gz) em vez do CSV")
+    parser.add_argument("--categoria", action="append", default=[],
+                        help="descobre as PDPs pelas páginas de uma listagem de categoria")
+    parser.add_argument("--bloom", type=int, default=0,
+                        help="deduplica a descoberta com filtro de Bloom dimensionado para N URLs")
+    parser.add_argument("--incremental", action="store_true",
+                        help="só grava PDPs que mudaram (preço, nome, imagens, categoria) desde a última visita")
+    parser.add_argument("--max-urls", type=int, default=0,
+                        help="no incremental, revisita só as N URLs com mais chance de ter mudado")
+    parser.add_argument("--prob-minima", type=float, default=0.0,
+                        help="no incremental, pula URLs com chance de mudança abaixo disto (0-1)")
+    parser.add_argument("--parquet", action="store_true",
+                        help="grava as linhas em lotes Parquet e deriva o CSV VTEX deles no fim")
+    parser.add_argument("--dir-dados",
+                        help="pasta com csv/, exports/, cache/ e estado/ no lugar de data/ (ex.: benchmarks)")
+    parser.add_argument("--relatorio",
+                        help="JSON com tempos por etapa, contadores, bytes, retries e latência por host "
+                             "(padrão: exports/relatorio_execucao.json)")
+    parser.add_argument("--prometheus-arquivo",
+                        help="grava as métricas no formato Prometheus (textfile collector) ao fim da execução")
+    parser.add_argument("--prometheus-porta", type=int,
+                        help="expõe /metrics do Prometheus nesta porta durante a execução")
+    parser.add_argument("--prometheus-endereco", default="127.0.0.1",
+                        help="interface do /metrics (0.0.0.0 para o Prometheus de outra máquina)")
+    parser.add_argument("--fronteira",
+                        help="fronteira compartilhada no lugar do CSV: arquivo SQLite ou http://host:porta "
+                             "(ver scripts/fronteira.py para carregar e servir)")
+    parser.add_argument("--worker-id", help="nome deste worker na fronteira (padrão: host-pid)")
+    parser.add_argument("--lote-fronteira", type=int, default=lote_fronteira,
+                        help="URLs reivindicadas por vez na fronteira")
+    parser.add_argument("--lease", type=float, default=lease_fronteira_s,
+                        help="segundos de lease das URLs reivindicadas (renovado por heartbeat)")
+    parser.add_argument("--resume", action="store_true",
+                        help="retoma a execução anterior: mantém o CSV e pula as URLs do checkpoint")
+    args = parser.parse_args(argv)
+    if args.dir_dados:
+        usar_dir_dados(args.dir_dados)
+    modo_fetch = args.fetch
+    workers_imagens = args.workers_imagens
+    pool_conexoes_imagens = args.pool_conexoes_imagens
+    usar_cache_imagens = not args.sem_cache_imagens
+    pos_processar_imagens = not args.sem_pos_imagens
+    normalizar_jpeg = not args.manter_formato
+    if args.sem_derivadas:
+        derivados_imagens = {}
+    usar_cache_paginas = not args.sem_cache_paginas
+    ttl_cache_paginas_h = args.ttl_cache_paginas
+    max_cache_paginas_mb = args.max_cache_paginas
+    modo_replay = args.replay
+    parser_html = args.parser
+    render_bloquear_recursos = not args.render_sem_bloqueio
+    render_espera = args.render_espera
+    modo_incremental = args.incremental
+    exportar_parquet = args.parquet
+    taxa_por_host = args.taxa
+    taxa_max_por_host = max(args.taxa_max, args.taxa)
+    concorrencia_por_host = max(1, args.por_host)
+    limite_adaptativo = not args.taxa_fixa
+    modo_extracao = args.extracao
+    api_catalogo_base = args.api_base
+    workers_api = max(1, args.workers_api)
+    if modo_replay and modo_extracao == "api":
+        print("⚠️ --replay só tem PDPs em cache, não respostas da API: extraindo pelo HTML")
+        modo_extracao = "html"
+    if modo_incremental and not (0 < ttl_cache_paginas_h <= ttl_cache_paginas_incremental_h):
+        # Um cache de 6h esconderia as mudanças de preço de uma execução de hora em hora
+        ttl_cache_paginas_h = ttl_cache_paginas_incremental_h
+
+    if args.prometheus_porta:
+        metricas.servir_prometheus(args.prometheus_porta, args.prometheus_endereco)
+        print(f"📈 Métricas em http://{args.prometheus_endereco}:{args.prometheus_porta}/metrics")
+
+    os.makedirs(output_folder, exist_ok=True)
+    if exportar_parquet:
+        from koerich.export import EscritorParquet, parquet_para_csv
+
+        escritor = EscritorParquet(output_parquet, retomar=args.resume, tamanho_lote=tamanho_lote_parquet,
+                                   ao_concluir=registrar_gravacao)
+    else:
+        escritor = EscritorIncremental(output_csv, retomar=args.resume, ao_concluir=registrar_gravacao)
+    saida = GravacaoOrdenada(escritor, finalizar_linhas, ao_falhar=registrar_falha)
+    if args.fronteira:
+        from koerich.frontier import TrabalhadorFronteira, abrir_fronteira
+
+        trabalho_fronteira = TrabalhadorFronteira(abrir_fronteira(args.fronteira), args.worker_id,
+                                                  args.lote_fronteira, args.lease)
+        print(f"🧭 Fronteira {args.fronteira} como {trabalho_fronteira.dono}: "
+              + ", ".join(f"{k}={v}" for k, v in trabalho_fronteira.fronteira.resumo().items()))
+    urls = fontes_urls(args, escritor.concluidas)
+    # Com fronteira a ordem é de quem reivindica primeiro: não há lista inteira para priorizar
+    if modo_incremental and trabalho_fronteira is None:
+        candidatas = list(urls)
+        urls = obter_indice_mudancas().priorizar(candidatas, args.max_urls or None, args.prob_minima)
+        print(f"🔁 Incremental: {len(urls)} de {len(candidatas)} URLs serão verificadas (mais voláteis primeiro)")
+    if escritor.concluidas:
+        print(f"⏩ Retomando: {len(escritor.concluidas)} URLs já concluídas serão puladas")
+
+    estagio = obter_estagio_imagens()
+    try:
+        while True:
+            if modo_extracao == "api":
+                renderizador = criar_renderizador(args.render_pool)
+                processar_api(urls, saida)
+            elif args.modo == "async":
+                processar_async(urls, args, saida)
+            elif args.modo == "pipeline":
+                renderizador = criar_renderizador(args.render_pool)
+                processar_pipeline(urls, args, saida)
+            else:
+                renderizador = criar_renderizador(args.render_pool)
+                processar_sequencial(urls, saida)
+            saida.descarregar(esperar=True)
+            # O Parquet segura as linhas até fechar um lote: sem isto as URLs desta rodada
+            # não seriam concluídas na fronteira e aguardar_mais esperaria por elas
+            escritor.descarregar()
+            # Fronteira: outra rodada se voltaram URLs (worker que morreu, falha a tentar de novo)
+            if trabalho_fronteira is None or not trabalho_fronteira.aguardar_mais():
+                break
+            print("🧭 Fronteira: URLs voltaram para a fila, nova rodada")
+            saida = GravacaoOrdenada(escritor, finalizar_linhas, ao_falhar=registrar_falha)
+            urls = fontes_urls(args, escritor.concluidas)
+    finally:
+        estagio.fechar()
+        escritor.fechar()
+        if trabalho_fronteira is not None:
+            trabalho_fronteira.fechar()
+        if indice_mudancas is not None:
+            indice_mudancas.fechar()
+        if manifesto_imagens is not None:
+            manifesto_imagens.fechar()
+
+    if exportar_parquet:
+        with metricas.etapa("exportar_csv"):
+            total = parquet_para_csv(output_parquet, output_csv)
+        print(f"\n🧱 Parquet em: {output_parquet} ({total} linhas no total)")
+
+    # Estatísticas
+    print(f"\n✅ Planilha final salva: {output_csv} ({escritor.linhas_gravadas} linhas nesta execução)")
+    print(f"🖼️ Imagens em: {output_folder}")
+    print("📡 Páginas por camada: " + ", ".join(f"{k}={v}" for k, v in sorted(contadores_fetch.items())))
+    resumo_render = obter_metricas_render().resumo()
+    if resumo_render["paginas"]:
+        fases = resumo_render["fases"]
+        print(f"🎭 Render: {sum(resumo_render['paginas'].values())} páginas "
+              f"({resumo_render['paginas'].get('sem_pronto', 0)} sem sinal de pronto), "
+              f"total médio {fases['total']['media_ms']:.0f} ms (p95 {fases['total']['p95_ms']:.0f} ms), "
+              f"navegação {fases['navegacao']['media_ms']:.0f} ms, espera {fases['pronto']['media_ms']:.0f} ms")
+        if resumo_render["bloqueadas"]:
+            print("🚫 Requisições bloqueadas no render: "
+                  + ", ".join(f"{k}={v}" for k, v in sorted(resumo_render["bloqueadas"].items())))
+    if trabalho_fronteira is not None:
+        stats = trabalho_fronteira.estatisticas
+        print(f"🧭 Fronteira: {stats['reivindicadas']} reivindicadas, {stats['concluidas']} concluídas, "
+              f"{stats['falhas']} falhas, {stats['rejeitadas']} rejeitadas (lease perdido), "
+              f"{stats['liberadas']} devolvidas à fila")
+        trabalho_fronteira.fronteira.fechar()
+    if indice_mudancas is not None:
+        stats = indice_mudancas.estatisticas
+        print(f"🔁 Mudanças: {stats['nova']} novas, {stats['mudou']} mudaram, {stats['igual']} iguais")
+    if cache_paginas is not None:
+        stats = cache_paginas.estatisticas
+        print(f"🗄️ Cache de páginas: {stats['hits']} hits, {stats['misses']} misses, {stats['despejos']} despejos")
+        cache_paginas.fechar()
+    if estagio.cache is not None:
+        stats = estagio.cache.estatisticas
+        print(f"🗄️ Cache de imagens: {stats['baixadas']} baixadas, {stats['nao_modificadas']} sem mudança (304), "
+              f"{stats['deduplicadas']} deduplicadas")
+    if estagio.pos is not None:
+        stats = estagio.pos.estatisticas
+        economia = stats["bytes_antes"] - stats["bytes_depois"]
+        print(f"🧹 Imagens: {stats['convertida']} convertidas para JPEG, {stats['renomeada']} com extensão corrigida, "
+              f"{stats['reaproveitada']} reaproveitadas do cache sem reprocessar, "
+              f"{stats['invalida']} inválidas, {stats['duplicada']} quase duplicadas removidas, "
+              f"{stats['derivadas']} derivadas ({economia / 1024 ** 2:.1f} MB a menos)")
+
+    extra = {
+        "modo": args.modo,
+        "extracao": modo_extracao,
+        "linhas_gravadas": escritor.linhas_gravadas,
+        "fetch_por_camada": dict(contadores_fetch),
+        "render": resumo_render,
+        "cache_paginas": dict(cache_paginas.estatisticas) if cache_paginas is not None else None,
+        "cache_imagens": dict(estagio.cache.estatisticas) if estagio.cache is not None else None,
+        "pos_imagens": dict(estagio.pos.estatisticas) if estagio.pos is not None else None,
+        "mudancas": dict(indice_mudancas.estatisticas) if indice_mudancas is not None else None,
+        "limitador": obter_limitador().resumo(),
+        "fronteira": dict(trabalho_fronteira.estatisticas) if trabalho_fronteira is not None else None,
+    }
+    metricas.salvar_json(args.relatorio or relatorio_path, extra)
+    print(f"📈 Relatório da execução: {args.relatorio or relatorio_path}")
+    if args.prometheus_arquivo:
+        metricas.salvar_prometheus(args.prometheus_arquivo)
+
+    if marcas_gravadas:
+        print("\n🏷️ Marcas encontradas:")
+        for marca, count in marcas_gravadas.most_common():
+            marca_id = get_marca_id(marca)
+            print(f"   {marca} (ID: {marca_id}): {count} produtos")
+
+if __name__ == "__main__":
+    main()
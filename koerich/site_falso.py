@@ -0,0 +1,190 @@
+"""Site Koerich falso (HTTP local) para benchmarks offline: PDPs, imagens, latência, erros e 429."""
+import hashlib
+import json
+import math
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from koerich.catalog_api import CAMINHO_BUSCA, MAX_POR_REQUISICAO
+from koerich.fixtures import gerar_pdp_html, gerar_produto_catalogo
+
+HOST_ORIGINAL = "https://www.koerich.com.br"
+
+
+def _png(largura, altura, pixels):
+    """PNG RGB de 8 bits montado só com a stdlib (`pixels` são as linhas já concatenadas)."""
+    def bloco(tipo, dados):
+        return struct.pack(">I", len(dados)) + tipo + dados + struct.pack(">I", zlib.crc32(tipo + dados))
+
+    linha = largura * 3
+    brutos = b"".join(b"\x00" + pixels[y * linha:(y + 1) * linha] for y in range(altura))
+    return (b"\x89PNG\r\n\x1a\n" + bloco(b"IHDR", struct.pack(">IIBBBBB", largura, altura, 8, 2, 0, 0, 0))
+            + bloco(b"IDAT", zlib.compress(brutos, 1)) + bloco(b"IEND", b""))
+
+
+class SiteFalso:
+    """Servidor HTTP em thread que imita a Koerich: `/p/<slug>/<id>` (PDP), `/img/<arquivo>` (imagem)
+    e a API de busca do catálogo (`/api/catalog_system/pub/products/search`).
+
+    - `n_produtos`: PDPs sintéticas (`gerar_pdp_html`), com `n_imagens` cada,
+      também disponíveis na API (`gerar_produto_catalogo`)
+    - `gravadas`: pasta de HTMLs gravados (ex.: `data/fixtures/pdp`), servidos
+      além das sintéticas, com as URLs de imagem reescritas para o site falso
+    - `latencia_ms`/`jitter_ms`: atraso de cada resposta
+    - `taxa_erro`: fração de respostas 503; `taxa_429`: fração de 429 com
+      `Retry-After: retry_after`
+    - `tamanho_imagem`: bytes aproximados de cada imagem, um PNG de ruído
+      determinístico por nome (servido como PNG, como o CDN faz com parte
+      das fotos "jpg")
+
+    Imagens têm ETag e respondem 304 a `If-None-Match`, como o CDN real. A
+    API aceita vários `fq=productId:<id>` e responde 400 a janelas
+    `_from`/`_to` de mais de 50 produtos, como a VTEX. A
+    sorte é de um `random.Random(semente)`: a mesma configuração falha nas
+    mesmas requisições, na mesma ordem de chegada.
+    """
+
+    def __init__(self, n_produtos=200, n_imagens=5, gravadas=None, latencia_ms=0.0, jitter_ms=0.0,
+                 taxa_erro=0.0, taxa_429=0.0, retry_after=1, tamanho_imagem=20 * 1024,
+                 n_recomendacoes=40, n_paragrafos=60, semente=0, endereco="127.0.0.1", porta=0):
+        self.n_produtos = n_produtos
+        self.n_imagens = n_imagens
+        self.gravadas = gravadas
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.taxa_erro = taxa_erro
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.tamanho_imagem = max(1024, int(tamanho_imagem))
+        self.n_recomendacoes = n_recomendacoes
+        self.n_paragrafos = n_paragrafos
+        self.estatisticas = Counter()
+        self._rng = random.Random(semente)
+        self._lock = threading.Lock()
+        self._paginas = {}
+        self._catalogo = {}
+        self._servidor = ThreadingHTTPServer((endereco, porta), self._handler())
+        self._servidor.daemon_threads = True
+        self.base = f"http://{endereco}:{self._servidor.server_address[1]}"
+        self._carregar_paginas()
+
+    def _carregar_paginas(self):
+        for i in range(self.n_produtos):
+            sku = str(5000000 + i)
+            nome, preco = f"Geladeira Sintética {300 + i % 200} Litros Inox {sku}", f"{999 + i % 3000}.90"
+            self._paginas[f"produto-sintetico-{sku}/{sku}"] = gerar_pdp_html(
+                sku=sku, nome=nome, preco=preco, base_imagens=f"{self.base}/img", n_imagens=self.n_imagens,
+                n_recomendacoes=self.n_recomendacoes, n_paragrafos=self.n_paragrafos,
+            ).encode("utf-8")
+            self._catalogo[sku] = gerar_produto_catalogo(
+                sku=sku, nome=nome, preco=preco, base_imagens=f"{self.base}/img", n_imagens=self.n_imagens,
+                link_texto=f"produto-sintetico-{sku}",
+            )
+        if self.gravadas:
+            for nome in sorted(os.listdir(self.gravadas)):
+                if nome.endswith(".html"):
+                    with open(os.path.join(self.gravadas, nome), encoding="utf-8") as f:
+                        html = f.read().replace(HOST_ORIGINAL, self.base)
+                    self._paginas[nome[:-len(".html")]] = html.encode("utf-8")
+
+    def urls(self):
+        return [f"{self.base}/p/{slug}" for slug in self._paginas]
+
+    def buscar_catalogo(self, consulta):
+        """(status, produtos) da API de busca para a query string `consulta`."""
+        params = parse_qs(consulta)
+        ids = [fq.split(":", 1)[1] for fq in params.get("fq", []) if fq.startswith("productId:")]
+        inicio = int(params.get("_from", ["0"])[0])
+        fim = int(params.get("_to", [str(inicio + 9)])[0])
+        if fim < inicio or fim - inicio + 1 > MAX_POR_REQUISICAO:
+            return 400, {"error": f"O intervalo _from/_to deve ter no máximo {MAX_POR_REQUISICAO} produtos"}
+        with self._lock:
+            self.estatisticas["api"] += 1
+        produtos = [self._catalogo[i] for i in dict.fromkeys(ids) if i in self._catalogo]
+        return 200, produtos[inicio:fim + 1]
+
+    def imagem(self, nome):
+        """PNG determinístico de `nome`: ruído não comprime, então o arquivo fica perto de `tamanho_imagem`."""
+        semente = hashlib.blake2b(nome.encode("utf-8"), digest_size=8).digest()
+        lado = max(8, int(math.sqrt(self.tamanho_imagem / 3)))
+        return _png(lado, lado, random.Random(semente).randbytes(lado * lado * 3))
+
+    def _sortear(self):
+        """(atraso em s, status forçado ou None) da próxima requisição."""
+        with self._lock:
+            atraso = max(0.0, self.latencia_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            sorte = self._rng.random()
+        if sorte < self.taxa_429:
+            return atraso, 429
+        if sorte < self.taxa_429 + self.taxa_erro:
+            return atraso, 503
+        return atraso, None
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _responder(self, status, corpo=b"", tipo="text/plain; charset=utf-8", headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(corpo)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                if corpo and self.command != "HEAD":
+                    self.wfile.write(corpo)
+                with site._lock:
+                    site.estatisticas[status] += 1
+
+            def do_GET(self):
+                atraso, forcado = site._sortear()
+                if atraso:
+                    time.sleep(atraso)
+                if forcado == 429:
+                    return self._responder(429, b"Too Many Requests", headers={"Retry-After": str(site.retry_after)})
+                if forcado:
+                    return self._responder(forcado, b"Service Unavailable")
+
+                partes = urlsplit(self.path)
+                caminho = partes.path
+                if caminho == CAMINHO_BUSCA:
+                    status, dados = site.buscar_catalogo(partes.query)
+                    return self._responder(status, json.dumps(dados).encode("utf-8"), "application/json; charset=utf-8")
+                if caminho.startswith("/p/") and caminho[3:].rstrip("/") in site._paginas:
+                    return self._responder(200, site._paginas[caminho[3:].rstrip("/")], "text/html; charset=utf-8")
+                if caminho.startswith("/img/") and len(caminho) > 5:
+                    etag = '"' + hashlib.blake2b(caminho.encode("utf-8"), digest_size=8).hexdigest() + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        return self._responder(304, headers={"ETag": etag})
+                    return self._responder(200, site.imagem(caminho[5:]), "image/png", {"ETag": etag})
+                return self._responder(404, b"Not Found")
+
+            do_HEAD = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def iniciar(self):
+        threading.Thread(target=self._servidor.serve_forever, name="site-falso", daemon=True).start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
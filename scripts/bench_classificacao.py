@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark da classificação por palavra-chave: varredura linear vs regex-trie compilada, por tamanho da lista
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from koerich.classify import Classificador
+
+CONFIG = Path(__file__).resolve().parent.parent / "config" / "classificacao.json"
+
+
+def varredura_linear(palavras, nomes):
+    """O que `detectar_categoria_departamento` fazia: substring de cada palavra, em ordem."""
+    resultado = []
+    for nome in nomes:
+        nome_lower = nome.lower()
+        resultado.append(next((v for p, v in palavras.items() if p in nome_lower), None))
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nomes", type=int, default=20000, help="tamanho da coluna de nomes")
+    parser.add_argument("--palavras", type=int, nargs="+", default=[30, 300, 3000])
+    args = parser.parse_args()
+
+    base = Classificador.de_arquivo(CONFIG)
+    nomes = [f"Geladeira Frost Free {300 + i % 200} Litros Inox Modelo {i}" for i in range(args.nomes)]
+    nomes[::7] = [f"Produto sem categoria conhecida {i}" for i in range(len(nomes[::7]))]
+
+    print(f"🔎 {args.nomes} nomes")
+    for n in args.palavras:
+        extras = {f"termo{i:05d}": ["Eletrodomésticos", "Eletrodomésticos"] for i in range(max(0, n - len(base.palavras_categoria)))}
+        palavras = {**extras, **{k: list(v) for k, v in base.palavras_categoria.items()}}
+        classificador = Classificador(
+            base.departamentos, base.categorias, palavras, base.categoria_padrao, base.marcas,
+            base.marca_id_padrao, base.palavras_marca, base.marca_padrao,
+        )
+        inicio = time.perf_counter()
+        varredura_linear(palavras, nomes)
+        linear = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        classificador.categorias_lote(nomes)
+        compilado = time.perf_counter() - inicio
+        print(f"   {len(palavras):>6} palavras | linear {linear * 1000:8.1f} ms | regex-trie em lote {compilado * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
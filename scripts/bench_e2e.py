@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark ponta a ponta offline: scraper.py contra um site Koerich falso local (URLs/s, imagens/s, CPU, pico de RSS)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from koerich.site_falso import SiteFalso
+
+RAIZ = Path(__file__).resolve().parent.parent
+FIXTURES_PDP = RAIZ / "data" / "fixtures" / "pdp"
+
+
+def executar(dados, opcoes):
+    """Roda o scraper num subprocesso; devolve (código, parede s, CPU s, pico RSS MB, relatório).
+
+    CPU e RSS vêm do `wait4`, então incluem os processos de parse do modo
+    pipeline (filhos do scraper que ele já aguardou).
+    """
+    comando = [sys.executable, str(RAIZ / "scraper.py"), "--dir-dados", str(dados), *opcoes]
+    with open(dados / "bench.log", "a", encoding="utf-8") as log:
+        inicio = time.perf_counter()
+        proc = subprocess.Popen(comando, cwd=RAIZ, stdout=log, stderr=subprocess.STDOUT)
+        _, status, uso = os.wait4(proc.pid, 0)
+        parede = time.perf_counter() - inicio
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    rss_mb = uso.ru_maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024)
+    relatorio_json = dados / "exports" / "relatorio_execucao.json"
+    relatorio = json.loads(relatorio_json.read_text(encoding="utf-8")) if relatorio_json.exists() else {}
+    return proc.returncode, parede, uso.ru_utime + uso.ru_stime, rss_mb, relatorio
+
+
+def resumir(nome, resultado):
+    codigo, parede, cpu, rss_mb, relatorio = resultado
+    urls = sum((relatorio.get("fetch_por_camada") or {}).values())
+    imagens = sum(c["valor"] for c in relatorio.get("contadores", {}).get("imagens", []) if c.get("resultado") == "ok")
+    retries = sum(c["valor"] for c in relatorio.get("contadores", {}).get("http_retries", []))
+    return {
+        "cenario": nome,
+        "codigo_saida": codigo,
+        "parede_s": round(parede, 3),
+        "cpu_s": round(cpu, 3),
+        "pico_rss_mb": round(rss_mb, 1),
+        "urls": urls,
+        "urls_s": round(urls / parede, 2) if parede else 0.0,
+        "imagens": imagens,
+        "imagens_s": round(imagens / parede, 2) if parede else 0.0,
+        "retries": retries,
+        "linhas": relatorio.get("linhas_gravadas", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--produtos", type=int, default=100, help="PDPs sintéticas no site falso")
+    parser.add_argument("--imagens", type=int, default=5, help="imagens por PDP")
+    parser.add_argument("--tamanho-imagem", type=int, default=20, help="KB por imagem")
+    parser.add_argument("--gravadas", action="store_true", help="serve também as PDPs de data/fixtures/pdp")
+    parser.add_argument("--latencia", type=float, default=50.0, help="ms por resposta")
+    parser.add_argument("--jitter", type=float, default=20.0, help="variação da latência (± ms)")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas 503")
+    parser.add_argument("--taxa-429", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--retry-after", type=int, default=0, help="Retry-After (s) dos 429")
+    parser.add_argument("--modos", nargs="+", default=["sequencial", "async", "pipeline"],
+                        choices=["sequencial", "async", "pipeline"])
+    parser.add_argument("--parsers", nargs="+", default=[None], help="backends de parse (padrão: o do scraper)")
+    parser.add_argument("--extracoes", nargs="+", default=["html"], choices=["html", "api"],
+                        help="html (PDP) e/ou api (catálogo VTEX em lotes)")
+    parser.add_argument("--com-cache", action="store_true",
+                        help="repete cada cenário com os caches de página e imagem já preenchidos")
+    parser.add_argument("--taxa", type=float, default=0.0, help="requisições/s por host no scraper (0 desliga)")
+    parser.add_argument("--extra", nargs=argparse.REMAINDER, default=[], help="opções repassadas ao scraper.py")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    site = SiteFalso(
+        n_produtos=args.produtos, n_imagens=args.imagens, gravadas=FIXTURES_PDP if args.gravadas else None,
+        latencia_ms=args.latencia, jitter_ms=args.jitter, taxa_erro=args.taxa_erro, taxa_429=args.taxa_429,
+        retry_after=args.retry_after, tamanho_imagem=args.tamanho_imagem * 1024,
+    )
+    resultados = []
+    with site, tempfile.TemporaryDirectory(prefix="bench_e2e_") as tmp:
+        urls = site.urls()
+        print(f"🧪 Site falso em {site.base}: {len(urls)} PDPs, {args.latencia:.0f}±{args.jitter:.0f} ms, "
+              f"{args.taxa_erro:.0%} 503, {args.taxa_429:.0%} 429")
+        cenarios = [(m, b, e) for m in args.modos for b in args.parsers for e in args.extracoes]
+        for modo, backend, extracao in cenarios:
+            nome = modo + (f"/{backend}" if backend else "") + (f"+{extracao}" if extracao != "html" else "")
+            dados = Path(tmp) / nome.replace("/", "_").replace("+", "_")
+            (dados / "csv").mkdir(parents=True)
+            (dados / "csv" / "produtos_link.csv").write_text("url\n" + "\n".join(urls) + "\n", encoding="utf-8")
+            opcoes = ["--modo", modo, "--taxa", str(args.taxa), *(["--parser", backend] if backend else []),
+                      "--extracao", extracao, *args.extra]
+            rodadas = [("frio", opcoes if args.com_cache else [*opcoes, "--sem-cache-paginas"])]
+            if args.com_cache:
+                rodadas.append(("cache", opcoes))
+            for rodada, opts in rodadas:
+                resumo = resumir(f"{nome} ({rodada})", executar(dados, opts))
+                resultados.append(resumo)
+                falhou = f" ⚠️ saída {resumo['codigo_saida']}" if resumo["codigo_saida"] else ""
+                print(f"   {resumo['cenario']:<28} {resumo['urls_s']:7.2f} URLs/s | {resumo['imagens_s']:8.2f} imagens/s | "
+                      f"CPU {resumo['cpu_s']:6.2f}s | pico RSS {resumo['pico_rss_mb']:6.1f} MB | "
+                      f"{resumo['urls']} URLs em {resumo['parede_s']:.1f}s, {resumo['retries']} retries{falhou}")
+                if falhou:
+                    print("".join((dados / "bench.log").read_text(encoding="utf-8").splitlines(True)[-5:]))
+        print("📡 Respostas do site falso: " + ", ".join(f"{k}={v}" for k, v in sorted(site.estatisticas.items(), key=str)))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
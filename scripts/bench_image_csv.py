@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark do CSV de imagens: listdir + regex + reescrita (antigo) vs manifesto com acréscimo só dos SKUs novos
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from koerich.image_manifest import COLUNAS_CSV, ManifestoImagens, linhas_csv
+
+BASE_URL = "https://raw.githubusercontent.com/thomas-ramirez/imagens-mcassab/main/"
+
+
+def csv_antigo(pasta, saida):
+    """O que o script fazia: lista a pasta inteira, agrupa em memória e reescreve o CSV."""
+    grupos = defaultdict(list)
+    for filename in os.listdir(pasta):
+        m = re.match(r"([a-zA-Z0-9]+)_(\d+)\.(jpg|jpeg|png|webp)", filename, re.IGNORECASE)
+        if m:
+            grupos[m.group(1)].append((int(m.group(2)), filename))
+    with open(saida, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUNAS_CSV)
+        for sku, imagens in grupos.items():
+            writer.writerows(linhas_csv(sku, [nome for _, nome in sorted(imagens)], BASE_URL))
+
+
+def csv_manifesto(manifesto, saida, completo):
+    with open(saida, "w" if completo else "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if completo:
+            writer.writerow(COLUNAS_CSV)
+        for _, sku_vtex, arquivos in manifesto.iterar(so_novos=not completo):
+            writer.writerows(linhas_csv(sku_vtex, arquivos, BASE_URL))
+    manifesto.marcar_exportados()
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--arquivos", type=int, default=500000, help="imagens na pasta")
+    parser.add_argument("--por-sku", type=int, default=5)
+    parser.add_argument("--novos", type=int, default=200, help="SKUs que chegam entre uma geração e outra")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = os.path.join(tmp, "imagens_produtos")
+        os.makedirs(pasta)
+        n_skus = args.arquivos // args.por_sku
+        print(f"📁 Criando {n_skus * args.por_sku} arquivos vazios ({n_skus} SKUs)...")
+        for i in range(n_skus):
+            for j in range(1, args.por_sku + 1):
+                open(os.path.join(pasta, f"{1000000 + i}_{j}.jpg"), "wb").close()
+
+        manifesto = ManifestoImagens(os.path.join(tmp, "imagens.sqlite"))
+        t_import = medir(manifesto.importar_pasta, pasta)
+        t_antigo = medir(csv_antigo, pasta, os.path.join(tmp, "antigo.csv"))
+        saida = os.path.join(tmp, "imagens_spicy.csv")
+        t_completo = medir(csv_manifesto, manifesto, saida, True)
+
+        # Nova execução do scraper: alguns SKUs novos gravados no manifesto
+        for i in range(args.novos):
+            manifesto.registrar(f"N{i:05d}", [f"N{i:05d}_{j}.jpg" for j in range(1, args.por_sku + 1)])
+        t_antigo_2 = medir(csv_antigo, pasta, os.path.join(tmp, "antigo.csv"))
+        t_novos = medir(csv_manifesto, manifesto, saida, False)
+        manifesto.fechar()
+
+    print(f"{'etapa':<42}{'tempo':>10}")
+    print(f"{'importação única da pasta (os.scandir)':<42}{t_import:>9.2f}s")
+    print(f"{'antigo: listdir + regex + reescrita':<42}{t_antigo:>9.2f}s")
+    print(f"{'manifesto: CSV completo':<42}{t_completo:>9.2f}s")
+    print(f"{f'antigo, com {args.novos} SKUs novos':<42}{t_antigo_2:>9.2f}s")
+    print(f"{f'manifesto, acrescentando {args.novos} SKUs':<42}{t_novos:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
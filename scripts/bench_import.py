@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização: import do koerich.scraper, dependências pesadas carregadas e primeiro parse de um worker spawn
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+# O que o scraper.py importava no topo antes de virar pacote com imports sob demanda
+PESADOS = ("pandas", "requests", "bs4", "lxml", "playwright", "pyarrow", "PIL", "tqdm", "httpx", "asyncio")
+
+MEDIR_IMPORT = """
+import sys, time
+inicio = time.perf_counter()
+{codigo}
+fim = time.perf_counter()
+import json
+print(json.dumps({{"ms": (fim - inicio) * 1000, "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def medir_import(codigo, repeticoes):
+    """(mediana em ms, módulos pesados carregados) de `codigo` num interpretador novo a cada repetição."""
+    tempos, pesados = [], []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", MEDIR_IMPORT.format(codigo=codigo, pesados=PESADOS)],
+                               cwd=RAIZ, capture_output=True, text=True, check=True).stdout
+        resultado = json.loads(saida.strip().splitlines()[-1])
+        tempos.append(resultado["ms"])
+        pesados = resultado["pesados"]
+    return statistics.median(tempos), pesados
+
+
+def parse_no_worker(backend, html, url):
+    """Roda no processo spawn: o parse do modo pipeline e o que ele precisou importar."""
+    from koerich import scraper
+
+    resultado = scraper.analisar_em_processo(backend, html, url, True)
+    return len(resultado[0]), [m for m in PESADOS if m in sys.modules]
+
+
+def medir_worker(backend, html, url):
+    """Tempo até o primeiro resultado de um pool spawn novo (subida do processo + import + parse)."""
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+        linhas, pesados = pool.submit(parse_no_worker, backend, html, url).result()
+    return (time.perf_counter() - inicio) * 1000, linhas, pesados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--parser", default=None, help="backend de parse do worker (padrão: o do scraper)")
+    args = parser.parse_args()
+
+    from koerich.parsers import backend_padrao
+
+    backend = args.parser or backend_padrao()
+    fixture = RAIZ / "data" / "fixtures" / "pdp" / "frigobar-midea-4043300.html"
+    html = fixture.read_text(encoding="utf-8")
+
+    print(f"🔎 Mediana de {args.repeticoes} interpretadores novos por medição")
+    print(f"{'import':<48}{'ms':>9}  pesados carregados")
+    casos = [
+        ("import koerich.scraper", "import koerich.scraper"),
+        ("import scraper (atalho na raiz)", "import scraper"),
+        ("dependências que eram importadas no topo", "\n".join(
+            f"try:\n    import {m}\nexcept Exception:\n    pass" for m in
+            ("pandas", "requests", "bs4", "lxml", "playwright.async_api", "pyarrow.parquet", "PIL.Image", "tqdm",
+             "asyncio"))),
+    ]
+    for rotulo, codigo in casos:
+        ms, pesados = medir_import(codigo, args.repeticoes)
+        print(f"{rotulo:<48}{ms:>9.1f}  {', '.join(pesados) or '-'}")
+
+    tempos = []
+    for _ in range(args.repeticoes):
+        ms, linhas, pesados = medir_worker(backend, html, "https://www.koerich.com.br/p/" + fixture.stem)
+        tempos.append(ms)
+    print(f"\n⚙️ Worker spawn até o 1º parse ({backend}, {linhas} linhas): mediana {statistics.median(tempos):.0f} ms")
+    print(f"   Módulos pesados no worker: {', '.join(pesados) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória: linhas VTEX como dicts por variação (antigo) vs Produto/Variacao compactos
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from koerich.records import COLUNAS_FIXAS, Produto
+
+
+def dados_produto(i, n_imagens, tamanho_descricao):
+    sku = str(4000000 + i)
+    nome = f"Geladeira Midea {300 + i % 200} Litros 2 Portas Frost Free Inox {i}"
+    descricao = (f"{nome}. " + "Capacidade, consumo, dimensões e garantia. " * tamanho_descricao)[:tamanho_descricao * 40]
+    imagens = [f"https://www.koerich.com.br/img/{sku}_{j}.jpg" for j in range(1, n_imagens + 1)]
+    return sku, nome, descricao, imagens
+
+
+def linhas_legado(sku, nome, descricao, imagens, variacoes, url):
+    """O que `extrair_produto` montava antes: um dict completo por variação."""
+    produtos = []
+    for tamanho in variacoes:
+        sku_tamanho = f"{sku}_{tamanho}" if tamanho != "ÚNICO" else sku
+        nome_tamanho = f"{nome} - {tamanho}" if tamanho != "ÚNICO" else nome
+        linha = {"_IDSKU": sku_tamanho, "_NomeSKU": nome_tamanho, **COLUNAS_FIXAS}
+        linha.update({
+            "_CodigoReferenciaSKU": sku_tamanho,
+            "_IDProduto": sku,
+            "_NomeProduto": nome,
+            "_BreveDescricaoProduto": (descricao or "")[:200],
+            "_CodigoReferenciaProduto": sku,
+            "_LinkTexto": url.rstrip("/").split("/")[-1],
+            "_DescricaoProduto": descricao or "",
+            "_DataLancamentoProduto": datetime.today().strftime("%d/%m/%Y"),
+            "_TituloSite": nome,
+            "_DescricaoMetaTag": (descricao or "")[:160],
+            "_IDDepartamento": "1", "_NomeDepartamento": "Eletrodomésticos",
+            "_IDCategoria": "5", "_NomeCategoria": "Geladeira",
+            "_IDMarca": "2000009", "_Marca": "Midea",
+            "_Preço": "3299.90",
+            "_BaseUrlImagens": f"https://raw.githubusercontent.com/x/y/main/{sku}",
+            "_ImagensSalvas": ";".join(f"{sku}_{j}.jpg" for j in range(1, len(imagens) + 1)),
+            "_ImagensURLs": ";".join(imagens),
+        })
+        produtos.append(linha)
+    return produtos
+
+
+def produto_compacto(sku, nome, descricao, imagens, variacoes, url):
+    return Produto(
+        sku=sku, nome=nome, descricao=descricao, link_texto=url.rstrip("/").split("/")[-1],
+        data_lancamento=datetime.today().strftime("%d/%m/%Y"),
+        id_departamento="1", departamento="Eletrodomésticos", id_categoria="5", categoria="Geladeira",
+        id_marca="2000009", marca="Midea", preco="3299.90",
+        base_url_imagens=f"https://raw.githubusercontent.com/x/y/main/{sku}", imagens=imagens,
+        variacoes=variacoes, imagens_salvas=";".join(f"{sku}_{j}.jpg" for j in range(1, len(imagens) + 1)),
+    )
+
+
+def medir(construir, args):
+    """Memória retida e pico (MB) e tempo para construir e expandir `args.produtos` produtos."""
+    variacoes = [f"V{j}" for j in range(args.variacoes)]
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    retidos = []
+    for i in range(args.produtos):
+        sku, nome, descricao, imagens = dados_produto(i, args.imagens, args.descricao)
+        retidos.append(construir(sku, nome, descricao, imagens, variacoes, f"https://www.koerich.com.br/p/x/{sku}"))
+    atual, _ = tracemalloc.get_traced_memory()
+    linhas = sum(1 for item in retidos for _ in item)  # expansão na gravação
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return atual / 1024 ** 2, pico / 1024 ** 2, duracao, linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--produtos", type=int, default=20000)
+    parser.add_argument("--variacoes", type=int, default=3, help="variações (linhas) por produto")
+    parser.add_argument("--imagens", type=int, default=6)
+    parser.add_argument("--descricao", type=int, default=40, help="tamanho da descrição (x 40 caracteres)")
+    args = parser.parse_args()
+
+    legado = medir(linhas_legado, args)
+    compacto = medir(produto_compacto, args)
+
+    print(f"📦 {args.produtos} produtos x {args.variacoes} variações = {legado[3]} linhas VTEX")
+    for nome, (atual, pico, duracao, _) in (("Dicts por variação", legado), ("Produto/Variacao", compacto)):
+        print(f"   {nome:<20} retido {atual:8.1f} MB | pico {pico:8.1f} MB | {duracao:6.2f}s")
+    print(f"📉 Memória retida: {(1 - compacto[0] / legado[0]) * 100:.1f}% menor")
+
+
+if __name__ == "__main__":
+    main()
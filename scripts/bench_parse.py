@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark do parse de PDP: código original (BeautifulSoup, artefatos recalculados) vs DocumentoPDP
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from koerich.document import DocumentoPDP
+from koerich.fixtures import gerar_pdp_html
+from koerich.parsers import backends_disponiveis
+
+
+# --- Código original do scraper.py (antes do DocumentoPDP), sem alterações ---
+def get_jsonld(soup):
+    for s in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(s.string)
+            seq = data if isinstance(data, list) else [data]
+            for it in seq:
+                if isinstance(it, dict) and it.get("@type") in ("Product", "Offer", "AggregateOffer"):
+                    return it
+        except:
+            continue
+    return None
+
+def get_next_data(soup):
+    tag = soup.find("script", id="__NEXT_DATA__", type="application/json")
+    if tag:
+        try:
+            return json.loads(tag.string)
+        except:
+            pass
+    return None
+
+def find_images(obj):
+    found = []
+    if isinstance(obj, dict):
+        if "imageUrl" in obj and isinstance(obj["imageUrl"], str):
+            found.append(obj["imageUrl"])
+        if "images" in obj and isinstance(obj["images"], list):
+            for it in obj["images"]:
+                if isinstance(it, dict) and "imageUrl" in it and isinstance(it["imageUrl"], str):
+                    found.append(it["imageUrl"])
+        for v in obj.values():
+            found.extend(find_images(v))
+    elif isinstance(obj, list):
+        for v in obj:
+            found.extend(find_images(v))
+    return found
+
+
+def artefatos_legado(html):
+    """O que o scraper original fazia por página: um parse html.parser e cada artefato recalculado onde era usado."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    get_jsonld(soup) or {}                     # pagina_completa
+    get_next_data(soup) or {}                  # pagina_completa
+    jsonld = get_jsonld(soup) or {}            # analisar_html: dados básicos
+    if not (jsonld.get("offers") or {}).get("price"):
+        soup.get_text(" ", strip=True)         # analisar_html: fallback de preço
+    get_next_data(soup)                        # analisar_html: SKU
+    soup.get_text(" ", strip=True)             # analisar_html: "Ref." no texto
+    get_jsonld(soup)                           # extrair_imagens
+    nd = get_next_data(soup)                   # extrair_imagens
+    if nd:
+        find_images(nd)
+
+
+def artefatos_documento(html, backend):
+    """Os mesmos artefatos pelo DocumentoPDP: um parse e cada artefato calculado uma vez."""
+    doc = DocumentoPDP(html, backend)
+    doc.jsonld
+    doc.produto_next_data
+    doc.texto
+    doc.imagens_next_data
+
+
+def medir(funcao, html, backend, repeticoes):
+    inicio = time.process_time()
+    for _ in range(repeticoes):
+        funcao(html, backend)
+    return (time.process_time() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--recomendacoes", type=int, default=200, help="tamanho do __NEXT_DATA__")
+    parser.add_argument("--paragrafos", type=int, default=400, help="tamanho do texto da página")
+    parser.add_argument("--parser", action="append", help="backend(s) a medir (padrão: todos os instalados)")
+    args = parser.parse_args()
+
+    html = gerar_pdp_html(n_recomendacoes=args.recomendacoes, n_paragrafos=args.paragrafos)
+    print(f"📄 PDP sintética: {len(html) / 1024:.0f} KB")
+
+    legado = medir(lambda h, b: artefatos_legado(h), html, None, args.repeticoes)
+    print(f"\n🐢 Código original (BeautifulSoup html.parser): {legado:8.2f} ms/página")
+
+    for backend in args.parser or backends_disponiveis():
+        so_parse = medir(lambda h, b: DocumentoPDP(h, b).arvore, html, backend, args.repeticoes)
+        documento = medir(artefatos_documento, html, backend, args.repeticoes)
+
+        print(f"\n🔧 Backend: {backend}")
+        print(f"⏱️ Só o parse:               {so_parse:8.2f} ms/página")
+        print(f"⏱️ Artefatos (DocumentoPDP): {documento - so_parse:8.2f} ms/página")
+        print(f"⏱️ Total (DocumentoPDP):     {documento:8.2f} ms/página")
+        print(f"📉 Redução de CPU por página vs código original: {(1 - documento / legado) * 100:.1f}%")
+
+if __name__ == "__main__":
+    main()
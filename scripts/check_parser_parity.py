@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Verifica se todos os backends de parse geram as mesmas linhas VTEX para as mesmas PDPs
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from koerich import scraper
+from koerich.page_cache import CachePaginas
+from koerich.parsers import backends_disponiveis
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / 'data' / 'fixtures' / 'pdp'
+
+
+def carregar_paginas(pasta_fixtures, pasta_cache=None):
+    """(url, html) das fixtures salvas e, opcionalmente, das páginas do cache."""
+    for arquivo in sorted(Path(pasta_fixtures).glob("*.html")):
+        # O id numérico no fim do nome do arquivo faz o papel do id no fim da URL
+        url = f"https://www.koerich.com.br/p/{arquivo.stem.rsplit('-', 1)[0]}/{arquivo.stem.rsplit('-', 1)[-1]}"
+        yield url, arquivo.read_text(encoding="utf-8")
+    if pasta_cache:
+        cache = CachePaginas(pasta_cache)
+        try:
+            for url, _, html in cache.entradas():
+                yield url, html
+        finally:
+            cache.fechar()
+
+
+def extrair(html, url, backend):
+    doc = scraper.DocumentoPDP(html, backend)
+    produto, jobs = scraper.analisar_html(html, url, doc)
+    return list(produto), jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", default=str(FIXTURES_DIR), help="pasta com PDPs salvas (*.html)")
+    parser.add_argument("--cache-paginas", default=None,
+                        help="também compara as páginas do cache de páginas (ex.: data/cache/paginas)")
+    parser.add_argument("--referencia", default="html.parser", help="backend usado como referência")
+    args = parser.parse_args()
+
+    backends = backends_disponiveis()
+    if args.referencia not in backends:
+        print(f"❌ Backend de referência indisponível: {args.referencia}")
+        sys.exit(2)
+    outros = [b for b in backends if b != args.referencia]
+    print(f"🔍 Referência: {args.referencia} | Comparando: {', '.join(outros) or '(nenhum outro instalado)'}")
+
+    total, divergencias = 0, 0
+    for url, html in carregar_paginas(args.fixtures, args.cache_paginas):
+        total += 1
+        esperado = extrair(html, url, args.referencia)
+        for backend in outros:
+            obtido = extrair(html, url, backend)
+            if obtido == esperado:
+                continue
+            divergencias += 1
+            print(f"\n❌ {backend} diverge em {url}")
+            for i, (a, b) in enumerate(zip(esperado[0], obtido[0])):
+                for campo in a:
+                    if a.get(campo) != b.get(campo):
+                        print(f"   linha {i} {campo}: {a.get(campo)!r} != {b.get(campo)!r}")
+            if len(esperado[0]) != len(obtido[0]):
+                print(f"   número de linhas: {len(esperado[0])} != {len(obtido[0])}")
+            if esperado[1] != obtido[1]:
+                print(f"   imagens: {esperado[1]} != {obtido[1]}")
+
+    print(f"\n📊 {total} páginas, {divergencias} divergências")
+    sys.exit(1 if divergencias else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Descobre URLs de PDP da Koerich por sitemaps e categorias e grava o CSV de entrada do scraper
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+
+from koerich.discovery import ConjuntoVistos, FiltroBloom, descobrir
+
+SITEMAP_KOERICH = "https://www.koerich.com.br/sitemap.xml"
+UA = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+                    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sitemap", action="append", default=[],
+                        help=f"sitemap ou índice (URL, .xml ou .xml.gz local); padrão: {SITEMAP_KOERICH}")
+    parser.add_argument("--categoria", action="append", default=[], help="URL de listagem de categoria")
+    parser.add_argument("--bloom", type=int, default=0,
+                        help="usa filtro de Bloom dimensionado para N URLs (catálogos muito grandes)")
+    parser.add_argument("--saida", default="data/csv/produtos_link.csv", help="CSV com a coluna 'url'")
+    args = parser.parse_args()
+
+    sitemaps = args.sitemap or ([] if args.categoria else [SITEMAP_KOERICH])
+    vistos = FiltroBloom(args.bloom) if args.bloom else ConjuntoVistos()
+    sessao = requests.Session()
+    sessao.headers.update(UA)
+
+    def buscar_html(url):
+        r = sessao.get(url, timeout=30)
+        r.raise_for_status()
+        return r.text
+
+    inicio = time.perf_counter()
+    total = 0
+    with open(args.saida, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["url"])
+        for url in descobrir(sitemaps, args.categoria, buscar_html, vistos, sessao):
+            escritor.writerow([url])
+            total += 1
+
+    print(f"✅ {total} URLs de produto em {args.saida} ({time.perf_counter() - inicio:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Fronteira compartilhada do crawl: carrega URLs, serve o SQLite por HTTP para outros hosts e mostra o andamento
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from koerich.frontier import abrir_fronteira, servir_fronteira
+
+RAIZ = Path(__file__).resolve().parent.parent
+FRONTEIRA_PADRAO = str(RAIZ / "data" / "estado" / "fronteira.sqlite")
+
+
+def carregar(args, fronteira):
+    from koerich import scraper
+
+    if args.sitemap or args.categoria:
+        from koerich.discovery import ConjuntoVistos, FiltroBloom, descobrir
+
+        vistos = FiltroBloom(args.bloom) if args.bloom else ConjuntoVistos()
+        urls = descobrir(args.sitemap, args.categoria, scraper.buscar_estatico, vistos, scraper.obter_sessao())
+    else:
+        urls = scraper.ler_urls(args.csv)
+    novas = fronteira.adicionar(urls)
+    print(f"📥 {novas} URLs novas na fronteira")
+
+
+def mostrar(fronteira):
+    resumo = fronteira.resumo()
+    total = sum(resumo.values())
+    print(f"🧭 {total} URLs: " + ", ".join(f"{k}={v}" for k, v in resumo.items()))
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fronteira", default=FRONTEIRA_PADRAO, help="arquivo SQLite ou http://host:porta")
+    parser.add_argument("--max-tentativas", type=int, default=3,
+                        help="tentativas (incluindo leases vencidos) antes de a URL ir para 'falhou'")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_carregar = sub.add_parser("carregar", help="enfileira URLs do CSV de entrada ou de sitemaps/categorias")
+    p_carregar.add_argument("--csv", default=str(RAIZ / "data" / "csv" / "produtos_link.csv"))
+    p_carregar.add_argument("--sitemap", action="append", default=[])
+    p_carregar.add_argument("--categoria", action="append", default=[])
+    p_carregar.add_argument("--bloom", type=int, default=0)
+
+    p_servir = sub.add_parser("servir", help="expõe a fronteira por HTTP para workers em outras máquinas")
+    p_servir.add_argument("--porta", type=int, default=8765)
+    p_servir.add_argument("--endereco", default="127.0.0.1",
+                          help="interface de escuta; sem autenticação, use 0.0.0.0 só em rede confiável")
+    p_servir.add_argument("--intervalo", type=float, default=30, help="segundos entre os resumos impressos")
+
+    sub.add_parser("status", help="contagem de URLs por estado")
+    sub.add_parser("reenfileirar", help="devolve à fila as URLs com lease vencido")
+    args = parser.parse_args()
+
+    fronteira = abrir_fronteira(args.fronteira, args.max_tentativas)
+    try:
+        if args.comando == "carregar":
+            carregar(args, fronteira)
+            mostrar(fronteira)
+        elif args.comando == "servir":
+            servidor = servir_fronteira(fronteira, args.porta, args.endereco)
+            print(f"🌐 Fronteira em http://{args.endereco}:{args.porta} "
+                  f"(workers: python3 scraper.py --fronteira http://<host>:{args.porta})")
+            try:
+                while True:
+                    mostrar(fronteira)
+                    time.sleep(args.intervalo)
+            except KeyboardInterrupt:
+                servidor.shutdown()
+        elif args.comando == "status":
+            mostrar(fronteira)
+        else:
+            print(f"🔁 {fronteira.reenfileirar_expirados()} leases vencidos devolvidos à fila")
+    finally:
+        fronteira.fechar()
+
+
+if __name__ == "__main__":
+    main()
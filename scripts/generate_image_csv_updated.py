@@ -1,106 +1,84 @@
-import os
+#!/usr/bin/env python3
+"""
+Gera o CSV de imagens VTEX (imagens_spicy.csv) a partir do manifesto SKU → imagens gravado pelo scraper
+"""
+
+import argparse
 import csv
-import re
+import sys
+import time
 from pathlib import Path
-from collections import defaultdict
 
-# Caminho para a pasta onde estão as imagens
-folder_path = Path.cwd() / 'data' / 'exports' / 'imagens_produtos'
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from koerich.image_manifest import COLUNAS_CSV, ManifestoImagens, linhas_csv
 
+RAIZ = Path(__file__).resolve().parent.parent
 # Hash do commit usado nas URLs (atualizar quando necessário)
-commit_hash = "main"  # ou usar um hash específico se necessário
-base_url = f"https://raw.githubusercontent.com/thomas-ramirez/imagens-mcassab/{commit_hash}/"
+COMMIT_HASH = "main"
+BASE_URL = f"https://raw.githubusercontent.com/thomas-ramirez/imagens-mcassab/{COMMIT_HASH}/"
 
-# Mapeamento de SKUIDs com letras para números
-# Vou usar números sequenciais começando de 9999999 para evitar conflitos
-sku_mapping = {
-    '09025': '9999999',  # Primeiro SKUID com letras
-    # Adicione mais mapeamentos conforme necessário
-}
 
-# Dicionário para agrupar imagens por SKUID
-skuid_images = defaultdict(list)
+def escrever(caminho, manifesto, base_url, so_novos):
+    """Escreve (ou acrescenta, com `so_novos`) as linhas direto do manifesto; devolve (SKUs, linhas)."""
+    skus = linhas = 0
+    with open(caminho, "a" if so_novos else "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if not so_novos:
+            writer.writerow(COLUNAS_CSV)
+        for _, sku_vtex, arquivos in manifesto.iterar(so_novos=so_novos):
+            rows = linhas_csv(sku_vtex, arquivos, base_url)
+            writer.writerows(rows)
+            skus += 1
+            linhas += len(rows)
+    return skus, linhas
 
-# Contador para SKUIDs não mapeados
-next_sku_number = 9999998
 
-# Percorre todos os arquivos da pasta
-for filename in os.listdir(folder_path):
-    if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-        match = re.match(r"([a-zA-Z0-9]+)_(\d+)\.(jpg|jpeg|png)", filename, re.IGNORECASE)
-        if match:
-            original_skuid = match.group(1)
-            image_number = int(match.group(2))
-            
-            # Aplicar mapeamento se necessário
-            if original_skuid in sku_mapping:
-                skuid = sku_mapping[original_skuid]
-            elif re.search(r'[a-zA-Z]', original_skuid):
-                # Se contém letras e não está mapeado, criar novo número
-                if original_skuid not in sku_mapping:
-                    sku_mapping[original_skuid] = str(next_sku_number)
-                    next_sku_number -= 1
-                skuid = sku_mapping[original_skuid]
-            else:
-                skuid = original_skuid
-            
-            url = f"{base_url}{filename}"
-            skuid_images[skuid].append((image_number, url, filename))
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--imagens", default=str(RAIZ / "data" / "exports" / "imagens_produtos"))
+    parser.add_argument("--manifesto", default=str(RAIZ / "data" / "estado" / "imagens.sqlite"),
+                        help="manifesto gravado pelo scraper (data/estado/imagens.sqlite)")
+    parser.add_argument("--saida", help="CSV gerado (padrão: imagens_spicy.csv ao lado da pasta de imagens)")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--varrer", action="store_true",
+                        help="também registra imagens da pasta que o manifesto não conhece (uma passada de os.scandir)")
+    parser.add_argument("--completo", action="store_true", help="reescreve o CSV inteiro em vez de só acrescentar")
+    args = parser.parse_args()
 
-# Criar linhas do CSV no novo formato
-rows = []
-for skuid, images in skuid_images.items():
-    # Ordenar imagens por número
-    images.sort(key=lambda x: x[0])
-    
-    # Criar linhas para cada imagem
-    for i, (image_number, url, filename) in enumerate(images):
-        is_main = (i == 0)  # Primeira imagem é a principal
-        
-        # Determinar label e name baseado na posição
-        if i == 0:
-            label = "primeira"
-            name = "primeira"
-        elif i == 1:
-            label = "segunda"
-            name = "segunda"
-        elif i == 2:
-            label = "terceira"
-            name = "terceira"
-        elif i == 3:
-            label = "quarta"
-            name = "quarta"
-        elif i == 4:
-            label = "quinta"
-            name = "quinta"
-        else:
-            label = f"{i+1}ª"
-            name = f"{i+1}ª"
-        
-        rows.append([skuid, str(is_main), label, name, url])
+    saida = Path(args.saida) if args.saida else Path(args.imagens).parent / "imagens_spicy.csv"
+    inicio = time.perf_counter()
+    manifesto = ManifestoImagens(args.manifesto)
+    try:
+        vazio = next(manifesto.iterar(), None) is None
+        if args.varrer or vazio:
+            if vazio:
+                print("📂 Manifesto vazio: importando as imagens já existentes na pasta")
+            importados = manifesto.importar_pasta(args.imagens)
+            print(f"📂 {importados} SKUs novos encontrados em {args.imagens}")
 
-# ✅ Salvar o CSV na pasta exports
-csv_path = folder_path.parent / 'imagens_spicy.csv'
-with open(csv_path, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.writer(file)
-    writer.writerow(['_IDSKU', 'IsMain', 'Label', 'Name', 'url'])
-    writer.writerows(rows)
+        novos, alterados = manifesto.pendentes()
+        # Galeria alterada muda linhas já escritas: aí o CSV é refeito (ainda em streaming)
+        completo = args.completo or alterados > 0 or not saida.exists()
+        if not completo and not novos:
+            print(f"✅ Nada novo: {saida} já está em dia")
+            return
+        saida.parent.mkdir(parents=True, exist_ok=True)
+        skus, linhas = escrever(saida, manifesto, args.base_url, so_novos=not completo)
+        manifesto.marcar_exportados()
+        mapeamentos = manifesto.mapeamentos()
+    finally:
+        manifesto.fechar()
 
-print(f"✅ CSV criado com sucesso em: {csv_path}")
-print(f"📁 Pasta das imagens: {folder_path}")
-print(f"🔗 Base URL: {base_url}")
-print(f"📊 Total de SKUIDs processados: {len(skuid_images)}")
-print(f"📊 Total de imagens: {len(rows)}")
+    acao = "CSV reescrito" if completo else "Linhas acrescentadas"
+    print(f"✅ {acao} em: {saida} ({time.perf_counter() - inicio:.1f}s)")
+    print(f"🔗 Base URL: {args.base_url}")
+    print(f"📊 SKUIDs escritos: {skus} ({alterados} com galeria alterada)")
+    print(f"📊 Imagens escritas: {linhas}")
+    print(f"\n🔄 Mapeamentos de SKUIDs com letras: {len(mapeamentos)}")
+    for original, mapped in list(mapeamentos.items())[:10]:
+        print(f"  {original} → {mapped}")
 
-# Mostrar mapeamentos aplicados
-print("\n🔄 Mapeamentos de SKUIDs aplicados:")
-for original, mapped in sku_mapping.items():
-    print(f"  {original} → {mapped}")
 
-# Mostrar alguns exemplos
-print("\n📋 Exemplos de conversão:")
-for i, row in enumerate(rows[:10]):
-    print(f"  {row[0]} | {row[1]} | {row[2]} | {row[3]} | {row[4].split('/')[-1]}")
-    if i == 9:
-        print("  ...")
-        break
+if __name__ == "__main__":
+    main()
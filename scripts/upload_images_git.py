@@ -1,77 +1,82 @@
 #!/usr/bin/env python3
 """
-Script para fazer upload das imagens usando Git diretamente
+Publicação incremental das imagens: só envia o que mudou desde a última publicação (git, S3 ou pasta)
 """
 
-import os
+import argparse
 import subprocess
-import shutil
+import sys
 from pathlib import Path
 
-def upload_images_git():
-    """
-    Faz upload das imagens usando Git
-    """
-    # Configurações
-    repo_url = "https://github.com/thomas-ramirez/imagens-mcassab.git"
-    images_folder = Path.cwd() / 'data' / 'exports' / 'imagens_produtos'
-    temp_repo = Path.cwd() / 'temp_imagens_repo'
-    
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from koerich.publish import DestinoGit, DestinoPasta, DestinoS3, ManifestoPublicacao, publicar
+
+RAIZ = Path(__file__).resolve().parent.parent
+REPO_URL = "https://github.com/thomas-ramirez/imagens-mcassab.git"
+URL_BASE = "https://raw.githubusercontent.com/thomas-ramirez/imagens-mcassab/main/"
+
+
+def criar_destino(args):
+    if args.destino == "s3":
+        if not args.bucket:
+            raise SystemExit("❌ --bucket é obrigatório com --destino s3")
+        return DestinoS3(args.bucket, args.prefixo, args.endpoint_url, workers=args.workers)
+    if args.destino == "pasta":
+        if not args.pasta_destino:
+            raise SystemExit("❌ --pasta-destino é obrigatório com --destino pasta")
+        return DestinoPasta(args.pasta_destino)
+    return DestinoGit(args.repo, args.copia_git, args.branch, args.prefixo, autor=args.autor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--destino", choices=["git", "s3", "pasta"], default="git")
+    parser.add_argument("--imagens", default=str(RAIZ / "data" / "exports" / "imagens_produtos"))
+    parser.add_argument("--manifesto", default=str(RAIZ / "data" / "estado" / "publicacao.sqlite"),
+                        help="hashes já publicados por destino")
+    parser.add_argument("--lote", type=int, default=500, help="arquivos por commit/lote de upload")
+    parser.add_argument("--prefixo", default="", help="subpasta no repositório ou prefixo das chaves no bucket")
+    parser.add_argument("--remover-ausentes", action="store_true",
+                        help="apaga do destino o que foi publicado e não existe mais localmente")
+    parser.add_argument("--simular", action="store_true", help="só mostra quantos arquivos seriam enviados")
+    git = parser.add_argument_group("git")
+    git.add_argument("--repo", default=REPO_URL)
+    git.add_argument("--branch", default="main")
+    git.add_argument("--copia-git", default=str(RAIZ / "data" / "estado" / "publicacao_git"),
+                     help="cópia de trabalho rasa e esparsa, mantida entre publicações")
+    git.add_argument("--autor", help='autor dos commits, "Nome <email>" (padrão: config do git)')
+    s3 = parser.add_argument_group("s3")
+    s3.add_argument("--bucket")
+    s3.add_argument("--endpoint-url", help="endpoint compatível com S3 (MinIO, R2, LocalStack)")
+    s3.add_argument("--workers", type=int, default=8, help="uploads simultâneos")
+    s3.add_argument("--pasta-destino", help="destino 'pasta': diretório que faz o papel do bucket")
+    args = parser.parse_args()
+
+    try:
+        destino = criar_destino(args)
+    except RuntimeError as e:
+        raise SystemExit(f"❌ {e}")
+    manifesto = ManifestoPublicacao(args.manifesto)
+    print(f"🚀 Publicando {args.imagens} em {destino.identificador}")
     try:
-        # Criar diretório temporário
-        if temp_repo.exists():
-            shutil.rmtree(temp_repo)
-        temp_repo.mkdir()
-        
-        print(f"📁 Diretório temporário criado: {temp_repo}")
-        
-        # Clonar o repositório
-        print("🔗 Clonando repositório...")
-        subprocess.run([
-            'git', 'clone', repo_url, str(temp_repo)
-        ], check=True)
-        
-        # Copiar imagens para o repositório
-        print("📁 Copiando imagens...")
-        for filename in os.listdir(images_folder):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-                src = images_folder / filename
-                dst = temp_repo / filename
-                shutil.copy2(src, dst)
-        
-        # Contar imagens copiadas
-        image_count = len([f for f in os.listdir(temp_repo) if f.lower().endswith(('.jpg', '.jpeg', '.png'))])
-        print(f"📊 {image_count} imagens copiadas")
-        
-        # Adicionar, commit e push
-        os.chdir(temp_repo)
-        
-        print("📝 Adicionando arquivos...")
-        subprocess.run(['git', 'add', '.'], check=True)
-        
-        print("💾 Fazendo commit...")
-        subprocess.run([
-            'git', 'commit', '-m', f'Add {image_count} images from Spicy scraper'
-        ], check=True)
-        
-        print("🚀 Fazendo push...")
-        subprocess.run(['git', 'push', 'origin', 'main'], check=True)
-        
-        print(f"\n🎉 Upload concluído com sucesso!")
-        print(f"📊 Total de imagens enviadas: {image_count}")
-        print(f"🔗 Repositório: {repo_url}")
-        print(f"🔗 URLs base: https://raw.githubusercontent.com/thomas-ramirez/imagens-mcassab/main/")
-        
+        stats = publicar(args.imagens, destino, manifesto, args.lote, args.remover_ausentes, args.simular)
     except subprocess.CalledProcessError as e:
-        print(f"❌ Erro no Git: {e}")
-    except Exception as e:
-        print(f"❌ Erro: {e}")
+        print(f"❌ Erro no Git: {e}\n{e.stderr}")
+        sys.exit(1)
     finally:
-        # Limpar diretório temporário
-        if temp_repo.exists():
-            shutil.rmtree(temp_repo)
-            print("🧹 Diretório temporário removido")
+        manifesto.fechar()
+
+    if args.simular:
+        print(f"🔎 {stats['novos']} imagens novas ou alteradas, {stats['ausentes']} publicadas que não existem mais")
+        return
+    print(f"\n🎉 Publicação concluída: {stats['enviados']} imagens ({stats['bytes'] / 1024 ** 2:.1f} MB)"
+          f", {stats['removidos']} removidas")
+    if not stats["enviados"] and not stats["removidos"]:
+        print("✅ Nada mudou desde a última publicação")
+    if args.destino == "git" and args.repo == REPO_URL:
+        print(f"🔗 URLs base: {URL_BASE}")
+
 
 if __name__ == "__main__":
-    print("🚀 Iniciando upload das imagens via Git...")
-    upload_images_git()
+    main()
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+FIXTURES_PDP = RAIZ / "data" / "fixtures" / "pdp"
@@ -0,0 +1,57 @@
+"""Extração pela API de catálogo: as mesmas linhas VTEX que o parse da PDP do mesmo produto."""
+import pytest
+import requests
+
+from koerich import scraper
+from koerich.catalog_api import MAX_POR_REQUISICAO, buscar_produtos, campos_produto, id_produto_da_url
+from koerich.fixtures import gerar_pdp_html, gerar_produto_catalogo
+from koerich.site_falso import SiteFalso
+
+PRODUTOS = {
+    "padrao": {},
+    "sem-variacao": {"sku": "4043301", "variacoes": ()},
+    "outra-marca": {"sku": "4043302", "nome": "Geladeira LG 400 Litros Inox", "marca": "LG", "preco": "4599.00"},
+}
+
+
+@pytest.mark.parametrize("url,esperado", [
+    ("https://www.koerich.com.br/p/frigobar-midea/4043300", "4043300"),
+    ("https://www.koerich.com.br/p/frigobar-midea/4043300/?utm=x", "4043300"),
+    ("https://www.koerich.com.br/p/frigobar-midea-4043300", None),
+    ("https://www.koerich.com.br/p/frigobar-midea/MRC06B2", None),
+])
+def test_id_produto_da_url(url, esperado):
+    assert id_produto_da_url(url) == esperado
+
+
+@pytest.mark.parametrize("parametros", PRODUTOS.values(), ids=PRODUTOS.keys())
+def test_api_gera_as_mesmas_linhas_que_a_pdp(parametros):
+    sku = parametros.get("sku", "4043300")
+    url = f"https://www.koerich.com.br/p/produto/{sku}"
+    produto_html, jobs_html = scraper.analisar_html(gerar_pdp_html(**parametros), url)
+    produto_api, jobs_api = scraper.analisar_api(gerar_produto_catalogo(**parametros), url)
+    assert list(produto_api) == list(produto_html)
+    assert jobs_api == jobs_html
+
+
+def test_campos_produto():
+    campos = campos_produto(gerar_produto_catalogo(n_imagens=7))
+    assert campos["sku"] == "4043300"
+    assert (campos["departamento"], campos["categoria"]) == ("Eletrodomésticos", "Frigobar")
+    assert campos["preco"] == "1299.90"
+    assert campos["variacoes"] == ["110V", "220V"]
+    assert len(campos["imagens"]) == 5
+
+
+def test_busca_em_lote_no_site_falso():
+    with SiteFalso(n_produtos=60) as site, requests.Session() as sessao:
+        ids = [str(5000000 + i) for i in range(MAX_POR_REQUISICAO - 1)] + ["9999999"]
+        produtos = buscar_produtos(sessao, site.base, ids)
+        assert sorted(produtos) == sorted(ids[:-1])
+        assert site.estatisticas["api"] == 1
+
+        with pytest.raises(ValueError):
+            buscar_produtos(sessao, site.base, ids + ["5000059"])
+        resposta = sessao.get(site.base + "/api/catalog_system/pub/products/search",
+                              params={"fq": "productId:5000000", "_from": 0, "_to": MAX_POR_REQUISICAO})
+        assert resposta.status_code == 400
@@ -0,0 +1,103 @@
+"""Fronteira compartilhada: leases que vencem voltam para a fila; Parquet não trava o fim da rodada."""
+import csv
+import subprocess
+import sys
+import time
+
+import pytest
+
+from conftest import RAIZ
+from koerich.frontier import FronteiraMemoria, FronteiraSQLite, TrabalhadorFronteira, abrir_fronteira
+
+URLS = [f"https://www.koerich.com.br/p/produto-{i}/{4043300 + i}" for i in range(4)]
+
+
+@pytest.fixture(params=["sqlite", "memoria"])
+def fronteira(request, tmp_path):
+    f = FronteiraSQLite(str(tmp_path / "fronteira.sqlite")) if request.param == "sqlite" else FronteiraMemoria()
+    f.adicionar(URLS)
+    yield f
+    f.fechar()
+
+
+def test_lease_vencido_volta_para_a_fila(fronteira):
+    assert sorted(fronteira.reivindicar("w1", 10, 0.05)) == sorted(URLS)
+    assert fronteira.resumo()["em_andamento"] == len(URLS)
+    time.sleep(0.1)
+    fronteira.reenfileirar_expirados()
+    assert fronteira.resumo()["pendente"] == len(URLS)
+
+    # Outro worker pega as URLs; o resultado atrasado do primeiro não vale mais
+    assert sorted(fronteira.reivindicar("w2", 10, 60)) == sorted(URLS)
+    assert fronteira.concluir("w1", [(URLS[0], True, None)]) == 0
+    assert fronteira.concluir("w2", [(u, True, None) for u in URLS]) == len(URLS)
+    assert fronteira.resumo()["concluida"] == len(URLS)
+
+
+def test_heartbeat_mantem_o_lease(fronteira):
+    fronteira.reivindicar("w1", 10, 0.05)
+    assert sorted(fronteira.renovar("w1", URLS, 60)) == sorted(URLS)
+    time.sleep(0.1)
+    fronteira.reenfileirar_expirados()
+    assert fronteira.resumo()["em_andamento"] == len(URLS)
+
+
+def test_url_falha_depois_de_max_tentativas(fronteira):
+    for _ in range(fronteira.max_tentativas):
+        assert fronteira.reivindicar("w1", 10, 0.01)
+        time.sleep(0.05)
+        fronteira.reenfileirar_expirados()
+    assert fronteira.resumo()["falhou"] == len(URLS)
+    assert fronteira.reivindicar("w1", 10, 60) == []
+
+
+def test_liberar_nao_gasta_tentativa(fronteira):
+    fronteira.reivindicar("w1", 10, 60)
+    assert fronteira.liberar("w1", URLS) == len(URLS)
+    for _ in range(fronteira.max_tentativas - 1):
+        fronteira.reivindicar("w1", 10, 0.01)
+        time.sleep(0.05)
+        fronteira.reenfileirar_expirados()
+    assert fronteira.resumo()["pendente"] == len(URLS)
+
+
+def test_aguardar_mais_ignora_leases_do_proprio_worker():
+    fronteira = FronteiraMemoria()
+    fronteira.adicionar(URLS)
+    trabalho = TrabalhadorFronteira(fronteira, "w1", lote=10, lease_s=60)
+    try:
+        urls = list(trabalho.urls())
+        trabalho.concluir(urls[0])
+        # As outras ainda estão com este worker (ex.: presas num buffer): não há outro por quem esperar
+        inicio = time.monotonic()
+        assert trabalho.aguardar_mais() is False
+        assert time.monotonic() - inicio < 1
+    finally:
+        trabalho.fechar()
+    assert fronteira.resumo() == {"pendente": len(URLS) - 1, "em_andamento": 0, "concluida": 1, "falhou": 0}
+
+
+def test_fronteira_com_parquet_termina_e_conclui_tudo(tmp_path):
+    pytest.importorskip("pyarrow")
+    from koerich.site_falso import SiteFalso
+
+    caminho = str(tmp_path / "fronteira.sqlite")
+    dados = tmp_path / "dados"
+    with SiteFalso(n_produtos=4, n_imagens=1, tamanho_imagem=1024) as site:
+        fronteira = abrir_fronteira(caminho)
+        fronteira.adicionar(site.urls())
+        fronteira.fechar()
+        proc = subprocess.run(
+            [sys.executable, str(RAIZ / "scraper.py"), "--dir-dados", str(dados), "--fronteira", caminho,
+             "--parquet", "--sem-pos-imagens", "--sem-cache-paginas"],
+            cwd=RAIZ, capture_output=True, text=True, timeout=120,
+        )
+    assert proc.returncode == 0, proc.stdout[-2000:] + proc.stderr[-2000:]
+
+    fronteira = abrir_fronteira(caminho)
+    try:
+        assert fronteira.resumo() == {"pendente": 0, "em_andamento": 0, "concluida": 4, "falhou": 0}
+    finally:
+        fronteira.fechar()
+    with open(dados / "exports" / "produtos_vtex.csv", encoding="utf-8-sig", newline="") as f:
+        assert len(list(csv.DictReader(f))) == 8
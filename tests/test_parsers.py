@@ -0,0 +1,47 @@
+"""Paridade entre backends de parse: as mesmas linhas VTEX e imagens para as mesmas PDPs."""
+import pytest
+
+from conftest import FIXTURES_PDP
+from koerich import scraper
+from koerich.fixtures import gerar_pdp_html
+from koerich.parsers import backends_disponiveis
+
+REFERENCIA = "html.parser"
+OUTROS = [b for b in backends_disponiveis() if b != REFERENCIA]
+
+
+def paginas():
+    """(url, html): variações sintéticas de `gerar_pdp_html` e as PDPs gravadas em data/fixtures/pdp."""
+    yield "https://www.koerich.com.br/p/sintetica/4043300", gerar_pdp_html()
+    yield "https://www.koerich.com.br/p/sem-variacao/4043301", gerar_pdp_html(sku="4043301", variacoes=())
+    yield "https://www.koerich.com.br/p/marca-lg/4043302", gerar_pdp_html(
+        sku="4043302", nome="Geladeira LG 400 Litros Inox", marca="LG", n_imagens=8)
+    yield "https://www.koerich.com.br/p/so-html/4043303", gerar_pdp_html(
+        sku="4043303", com_jsonld=False, com_next_data=False)
+    for arquivo in sorted(FIXTURES_PDP.glob("*.html")):
+        slug, _, id_produto = arquivo.stem.rpartition("-")
+        yield f"https://www.koerich.com.br/p/{slug}/{id_produto}", arquivo.read_text(encoding="utf-8")
+
+
+PAGINAS = list(paginas())
+
+
+def extrair(html, url, backend):
+    produto, jobs = scraper.analisar_html(html, url, scraper.DocumentoPDP(html, backend))
+    return list(produto), jobs
+
+
+@pytest.mark.skipif(not OUTROS, reason="só html.parser instalado")
+@pytest.mark.parametrize("backend", OUTROS)
+@pytest.mark.parametrize("url,html", PAGINAS, ids=[url.rsplit("/", 2)[-2] for url, _ in PAGINAS])
+def test_backend_gera_as_mesmas_linhas(backend, url, html):
+    assert extrair(html, url, backend) == extrair(html, url, REFERENCIA)
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+def test_fixture_sintetica_extraida_por_completo(backend):
+    url, html = PAGINAS[0]
+    linhas, jobs = extrair(html, url, backend)
+    assert [l["_IDSKU"] for l in linhas] == ["4043300_110V", "4043300_220V"]
+    assert linhas[0]["_Preço"] == "1299.90"
+    assert [arquivo for _, arquivo in jobs] == [f"4043300_{i}.jpg" for i in range(1, 6)]
@@ -0,0 +1,48 @@
+"""Modo pipeline: parse em processos, fase do navegador para páginas estáticas incompletas."""
+from functools import partial
+
+from koerich import scraper
+from koerich.fixtures import gerar_pdp_html
+from koerich.pipeline import PipelineProcessos
+
+COMPLETA = gerar_pdp_html()
+# Sem JSON-LD nem __NEXT_DATA__: o GET simples não basta, como numa PDP que só monta no navegador
+INCOMPLETA = gerar_pdp_html(com_jsonld=False, com_next_data=False)
+URL = "https://www.koerich.com.br/p/frigobar-midea/4043300"
+
+
+def test_parse_recusa_estatica_incompleta():
+    assert scraper.analisar_em_processo("html.parser", INCOMPLETA, URL, False) is None
+
+
+def test_parse_informa_se_a_pagina_aceita_era_estatica():
+    produto, jobs, _, estatico = scraper.analisar_em_processo("html.parser", COMPLETA, URL, False)
+    assert estatico and produto.sku == "4043300" and len(jobs) == 5
+    *_, estatico = scraper.analisar_em_processo("html.parser", INCOMPLETA, URL, True)
+    assert not estatico
+
+
+def buscar_falso(incompletas, chamadas, url, fase):
+    """Fase 0 = GET simples (incompleto para `incompletas`), fase 1 = "navegador" com a página inteira."""
+    chamadas.append((url, fase))
+    if fase == 0:
+        return (INCOMPLETA if url in incompletas else COMPLETA), False
+    return COMPLETA, True
+
+
+def test_pipeline_processa_todas_e_escala_so_as_incompletas():
+    urls = [f"https://www.koerich.com.br/p/produto-{i}/{4043300 + i}" for i in range(6)]
+    incompletas = set(urls[::2])
+    chamadas = []
+    pipeline = PipelineProcessos(partial(buscar_falso, incompletas, chamadas),
+                                 partial(scraper.analisar_em_processo, "html.parser"),
+                                 workers_fetch=2, workers_parse=2)
+    resultados = {i: (url, resultado, erro) for i, url, resultado, erro in pipeline.executar(urls)}
+
+    assert sorted(resultados) == list(range(len(urls)))
+    for i, (url, resultado, erro) in resultados.items():
+        assert erro is None and url == urls[i]
+        produto, _, _, estatico = resultado
+        assert len(list(produto)) == 2
+        assert estatico == (url not in incompletas)
+    assert sorted(u for u, fase in chamadas if fase == 1) == sorted(incompletas)